@@ -2,12 +2,14 @@
 
 import os
 import sys
+import tracemalloc
 from pathlib import Path
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from ldraw import config
+from ldraw.part import Part
 from ldraw.parts import Parts
 from ldraw.pieces import Piece
 from ldraw.geometry import Matrix, Vector
@@ -72,8 +74,23 @@ def test_geometry_operations():
     return matrices, vectors
 
 
+def measure_bytes_per_parsed_line(paths):
+    """Measure the memory held by the objects of parsed part files, per line."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    parsed = [list(Part(path).objects) for path in paths]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    lines = sum(len(objects) for objects in parsed)
+    return held / lines, lines
+
+
 if __name__ == "__main__":
     print("Starting memory profiling...")
+
+    library = Path(__file__).parent.parent / "tests" / "test_ldraw2" / "ldraw"
+    per_line, lines = measure_bytes_per_parsed_line(sorted(library.rglob("*.dat")))
+    print("\n%.1f bytes per parsed line (%i lines)" % (per_line, lines))
     
     print("\\nProfiling parts loading...")
     parts_result = test_parts_loading()
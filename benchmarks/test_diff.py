@@ -0,0 +1,45 @@
+"""Benchmark tests for diffing models."""
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.diff import diff_models
+from ldraw.scene import PieceArray
+
+PIECE_COUNT = 100000
+
+
+@pytest.fixture(scope="module")
+def models():
+    """Create a dense model of 100k plates, and the same model moved 5 LDU."""
+    red = Colour(4, "Red", "#C91A09", 255, [])
+    old = PieceArray()
+    old.bulk_append(
+        [
+            (20 * (i % 100), -8 * ((i // 100) % 100), 20 * (i // 10000))
+            for i in range(PIECE_COUNT)
+        ],
+        red,
+        "3024",
+    )
+    new = PieceArray()
+    new.bulk_append(
+        [(x + 5, y, z) for x, y, z in zip(*[iter(old.positions)] * 3, strict=True)],
+        red,
+        "3024",
+    )
+    return old, new
+
+
+def test_diff_unchanged(benchmark, models):
+    """Benchmark diffing a model with itself, as a baseline."""
+    old, _ = models
+    benchmark.pedantic(diff_models, args=(old, old), rounds=3)
+    benchmark.extra_info["pieces"] = PIECE_COUNT
+
+
+def test_diff_whole_model_moved(benchmark, models):
+    """Benchmark diffing a model with every piece moved."""
+    diff = benchmark.pedantic(diff_models, args=models, rounds=3)
+    benchmark.extra_info["pieces"] = PIECE_COUNT
+    benchmark.extra_info["moved"] = len(diff.moved)
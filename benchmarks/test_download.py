@@ -0,0 +1,88 @@
+"""Benchmark tests for downloading a library archive."""
+
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ldraw.downloads import fetch
+
+CONTENT_SIZE = 1 << 21
+# Bytes per second of each connection, as a remote server would allow.
+CONNECTION_RATE = 1 << 23
+BLOCK_SIZE = 1 << 15
+
+
+class _ThrottledHandler(BaseHTTPRequestHandler):
+    """Serves the content of its server in ranges, at CONNECTION_RATE."""
+
+    def do_HEAD(self) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(self.server.content)))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        content = self.server.content
+        start, end = 0, len(content) - 1
+        requested = self.headers.get("Range")
+        if requested is not None:
+            first, _, last = requested.removeprefix("bytes=").partition("-")
+            start, end = int(first), int(last or end)
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header(
+                "Content-Range",
+                "bytes %i-%i/%i" % (start, end, len(content)),
+            )
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        for offset in range(start, end + 1, BLOCK_SIZE):
+            self.wfile.write(content[offset : min(offset + BLOCK_SIZE, end + 1)])
+            time.sleep(BLOCK_SIZE / CONNECTION_RATE)
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture(scope="module")
+def url():
+    """Serve an archive over a local, throttled HTTP server."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ThrottledHandler)
+    httpd.daemon_threads = True
+    httpd.content = bytes(range(256)) * (CONTENT_SIZE // 256)
+    thread = threading.Thread(
+        target=httpd.serve_forever,
+        kwargs={"poll_interval": 0.01},
+        daemon=True,
+    )
+    thread.start()
+    yield "http://127.0.0.1:%i/complete.zip" % httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _fetch(benchmark, url, destination, segments) -> None:
+    def setup():
+        destination.unlink(missing_ok=True)
+
+    benchmark.pedantic(
+        fetch,
+        args=(url, destination),
+        kwargs={"segments": segments},
+        setup=setup,
+        rounds=5,
+    )
+
+
+def test_fetch_single_stream(benchmark, url, tmp_path) -> None:
+    """Benchmark downloading over one connection."""
+    _fetch(benchmark, url, tmp_path / "complete.zip", 1)
+
+
+def test_fetch_segments(benchmark, url, tmp_path) -> None:
+    """Benchmark downloading four ranges at once."""
+    _fetch(benchmark, url, tmp_path / "complete.zip", 4)
@@ -0,0 +1,59 @@
+"""Benchmark tests for building minifigures."""
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.figure import FigureTemplate, Person, Pose, place_figures
+from ldraw.geometry import Identity, Vector, YAxis
+
+FIGURE_COUNT = 1000
+
+
+@pytest.fixture
+def crowd():
+    """Create positions and orientations of a crowd."""
+    positions = [Vector(40 * (i % 40), 0, 40 * (i // 40)) for i in range(FIGURE_COUNT)]
+    orientations = [Identity().rotate(90 * (i % 4), YAxis) for i in range(FIGURE_COUNT)]
+    return positions, orientations
+
+
+def test_person_crowd(benchmark, crowd):
+    """Benchmark building a crowd with Person methods."""
+    yellow = Colour(14, "Yellow", "#F2CD37", 255, [])
+    blue = Colour(1, "Blue", "#0055BF", 255, [])
+
+    def build():
+        for position, matrix in zip(*crowd, strict=True):
+            person = Person(position, matrix)
+            person.head(yellow, 20)
+            person.torso(blue)
+            person.hips(blue)
+            person.left_arm(blue, 30)
+            person.left_hand(yellow)
+            person.right_arm(blue, -30)
+            person.right_hand(yellow)
+            person.left_leg(blue, 10)
+            person.right_leg(blue, -10)
+
+    benchmark(build)
+
+
+def test_template_crowd(benchmark, crowd):
+    """Benchmark building the same crowd from a FigureTemplate."""
+    yellow = Colour(14, "Yellow", "#F2CD37", 255, [])
+    blue = Colour(1, "Blue", "#0055BF", 255, [])
+    template = FigureTemplate(
+        {
+            "head": yellow,
+            "torso": blue,
+            "hips": blue,
+            "left arm": blue,
+            "left hand": yellow,
+            "right arm": blue,
+            "right hand": yellow,
+            "left leg": blue,
+            "right leg": blue,
+        },
+        pose=Pose(head=20, left_arm=30, right_arm=-30, left_leg=10, right_leg=-10),
+    )
+    benchmark(place_figures, template, *crowd)
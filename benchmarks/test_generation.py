@@ -0,0 +1,26 @@
+"""Benchmark tests for generating library modules."""
+
+import pytest
+
+from ldraw.generation.parts import write_section
+
+PART_COUNT = 20000
+
+
+@pytest.fixture
+def section():
+    """Create a section as large as the biggest ones of the LDraw library."""
+    return {
+        "Brick 1 x %i Pattern %i" % (i % 16 + 1, i): "p%05i" % i
+        for i in range(PART_COUNT)
+    }
+
+
+def test_write_section_mustache(benchmark, section, tmp_path) -> None:
+    """Benchmark rendering a section with the mustache template."""
+    benchmark(write_section, tmp_path / "section.py", section, "mustache")
+
+
+def test_write_section_native(benchmark, section, tmp_path) -> None:
+    """Benchmark emitting a section without a template."""
+    benchmark(write_section, tmp_path / "section.py", section, "native")
@@ -0,0 +1,48 @@
+"""Benchmark tests for loading models."""
+
+import io
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.geometry import Identity, YAxis
+from ldraw.loader import load_ldr
+from ldraw.scene import PieceArray
+from ldraw.writer import write_ldr
+
+LINE_COUNT = 100000
+
+
+@pytest.fixture(scope="module")
+def model_text():
+    """Write a model of 100k bricks with a few distinct rotations."""
+    scene = PieceArray()
+    scene.bulk_append(
+        [(20 * (i % 100), -24 * (i // 100), 0) for i in range(LINE_COUNT)],
+        Colour(4, "Red", "#C91A09", 255, []),
+        "3005",
+        [Identity().rotate(90 * (i % 4), YAxis) for i in range(LINE_COUNT)],
+    )
+    out = io.StringIO()
+    write_ldr(scene, out)
+    return out.getvalue()
+
+
+def test_load_group(benchmark, model_text):
+    """Benchmark loading a model into Pieces."""
+    benchmark.pedantic(
+        load_ldr,
+        setup=lambda: ((io.StringIO(model_text),), {}),
+        rounds=3,
+    )
+    benchmark.extra_info["lines"] = LINE_COUNT
+
+
+def test_load_piece_array(benchmark, model_text):
+    """Benchmark loading a model into a PieceArray."""
+    benchmark.pedantic(
+        load_ldr,
+        setup=lambda: ((io.StringIO(model_text),), {"columnar": True}),
+        rounds=3,
+    )
+    benchmark.extra_info["lines"] = LINE_COUNT
@@ -0,0 +1,53 @@
+"""Benchmark tests for writing models."""
+
+import io
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.geometry import Identity, Vector, YAxis
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+from ldraw.writer import write_ldr
+
+PIECE_COUNT = 20000
+
+
+@pytest.fixture
+def model():
+    """Create a wall of bricks with a few distinct rotations."""
+    group = Group()
+    colour = Colour(4, "Red", "#C91A09", 255, [])
+    for i in range(PIECE_COUNT):
+        Piece(
+            colour,
+            Vector(20 * (i % 100), -24 * (i // 100), 0),
+            Identity().rotate(90 * (i % 4), YAxis),
+            "3005",
+            group=group,
+        )
+    return group
+
+
+def _lines_per_second(benchmark, count):
+    benchmark.extra_info["lines"] = count
+    benchmark.extra_info["lines_per_second"] = count / benchmark.stats.stats.mean
+
+
+def test_group_repr(benchmark, model):
+    """Benchmark serializing a group with repr, as a baseline."""
+    benchmark(repr, model)
+    _lines_per_second(benchmark, PIECE_COUNT)
+
+
+def test_write_group(benchmark, model):
+    """Benchmark writing a group with the buffered writer."""
+    benchmark(lambda: write_ldr(model, io.StringIO()))
+    _lines_per_second(benchmark, PIECE_COUNT)
+
+
+def test_write_piece_array(benchmark, model):
+    """Benchmark writing a columnar scene with the buffered writer."""
+    scene = PieceArray.from_pieces(model)
+    benchmark(lambda: write_ldr(scene, io.StringIO()))
+    _lines_per_second(benchmark, PIECE_COUNT)
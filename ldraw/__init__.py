@@ -18,14 +18,36 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import importlib
 import sys
 
-from ldraw.downloads import download
-from ldraw.generation import generate
 from ldraw.imports import LibraryImporter
 
 __all__ = ["download", "generate"]
 
+# download() and generate() need requests, pystache and the parts parser,
+# which are slow to import: their modules are imported on first use.
+_LAZY_ATTRIBUTES = {"download": "ldraw.downloads", "generate": "ldraw.generation"}
+
+# Importing the ldraw.generate module, as ldraw.downloads does, would set it
+# as the generate attribute; it is imported now and the name left to
+# __getattr__.
+importlib.import_module("ldraw.generate")
+del globals()["generate"]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
 # Modern import hook registration: use an instance, not the class
 library_importer_instance = LibraryImporter()
 if not any(isinstance(hook, LibraryImporter) for hook in sys.meta_path):
@@ -0,0 +1,410 @@
+"""Bounding volume hierarchy over the pieces of a scene.
+
+The hierarchy is built from the world-space bounding box of each Piece,
+computed from the bounding box of its part. It answers box-overlap pair
+queries and ray casts in logarithmic time, and can be refitted in place
+when pieces move.
+"""
+
+from ldraw.errors import PartError
+from ldraw.geometry import Vector
+from ldraw.lines import Line, OptionalLine, Quadrilateral, Triangle
+from ldraw.pieces import Piece
+
+LEAF_SIZE = 4
+
+
+class BoundingBox:
+    """an axis-aligned bounding box."""
+
+    def __init__(self, minimum: Vector, maximum: Vector):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __repr__(self):
+        return "<BoundingBox: (%s) (%s)>" % (self.minimum.repr, self.maximum.repr)
+
+    def __eq__(self, other):
+        if not isinstance(other, BoundingBox):
+            return False
+        return self.minimum == other.minimum and self.maximum == other.maximum
+
+    def __hash__(self):
+        return hash((self.minimum, self.maximum))
+
+    @classmethod
+    def from_points(cls, points):
+        """Return the smallest box containing all the points."""
+        xs, ys, zs = zip(*((p.x, p.y, p.z) for p in points), strict=True)
+        return cls(Vector(min(xs), min(ys), min(zs)), Vector(max(xs), max(ys), max(zs)))
+
+    @property
+    def center(self):
+        """Return the center of the box."""
+        return 0.5 * (self.minimum + self.maximum)
+
+    def union(self, other):
+        """Return the smallest box containing both boxes."""
+        return BoundingBox(
+            Vector(
+                min(self.minimum.x, other.minimum.x),
+                min(self.minimum.y, other.minimum.y),
+                min(self.minimum.z, other.minimum.z),
+            ),
+            Vector(
+                max(self.maximum.x, other.maximum.x),
+                max(self.maximum.y, other.maximum.y),
+                max(self.maximum.z, other.maximum.z),
+            ),
+        )
+
+    def overlaps(self, other, tolerance=0.0):
+        """Check if the boxes overlap by more than tolerance along every axis."""
+        return _overlaps(_as_tuple(self), _as_tuple(other), tolerance)
+
+    def transform(self, position, matrix):
+        """Return the box containing this box moved by a position and matrix."""
+        return _as_box(_transform(_as_tuple(self), position, matrix))
+
+
+def _as_tuple(box):
+    return (
+        box.minimum.x,
+        box.minimum.y,
+        box.minimum.z,
+        box.maximum.x,
+        box.maximum.y,
+        box.maximum.z,
+    )
+
+
+def _as_box(values):
+    return BoundingBox(Vector(*values[:3]), Vector(*values[3:]))
+
+
+def _transform(box, position, matrix):
+    # Transform the center, and grow the half extents by the absolute
+    # values of the matrix, which bounds the eight transformed corners.
+    cx, cy, cz = (box[0] + box[3]) / 2, (box[1] + box[4]) / 2, (box[2] + box[5]) / 2
+    ex, ey, ez = (box[3] - box[0]) / 2, (box[4] - box[1]) / 2, (box[5] - box[2]) / 2
+    r = matrix.rows
+    wx = r[0][0] * cx + r[0][1] * cy + r[0][2] * cz + position.x
+    wy = r[1][0] * cx + r[1][1] * cy + r[1][2] * cz + position.y
+    wz = r[2][0] * cx + r[2][1] * cy + r[2][2] * cz + position.z
+    hx = abs(r[0][0]) * ex + abs(r[0][1]) * ey + abs(r[0][2]) * ez
+    hy = abs(r[1][0]) * ex + abs(r[1][1]) * ey + abs(r[1][2]) * ez
+    hz = abs(r[2][0]) * ex + abs(r[2][1]) * ey + abs(r[2][2]) * ez
+    return (wx - hx, wy - hy, wz - hz, wx + hx, wy + hy, wz + hz)
+
+
+def _union(a, b):
+    return (
+        min(a[0], b[0]),
+        min(a[1], b[1]),
+        min(a[2], b[2]),
+        max(a[3], b[3]),
+        max(a[4], b[4]),
+        max(a[5], b[5]),
+    )
+
+
+def _overlaps(a, b, tolerance):
+    return (
+        a[0] < b[3] - tolerance
+        and b[0] < a[3] - tolerance
+        and a[1] < b[4] - tolerance
+        and b[1] < a[4] - tolerance
+        and a[2] < b[5] - tolerance
+        and b[2] < a[5] - tolerance
+    )
+
+
+def _ray_entry(box, origin, inverse):
+    """Return the distance at which a ray enters a box, or None (slab test)."""
+    t_min = 0.0
+    t_max = float("inf")
+    for axis in range(3):
+        o = origin[axis]
+        if inverse[axis] is None:
+            if o < box[axis] or o > box[axis + 3]:
+                return None
+            continue
+        t1 = (box[axis] - o) * inverse[axis]
+        t2 = (box[axis + 3] - o) * inverse[axis]
+        if t1 > t2:
+            t1, t2 = t2, t1
+        t_min = max(t_min, t1)
+        t_max = min(t_max, t2)
+        if t_min > t_max:
+            return None
+    return t_min
+
+
+class PartBounds:
+    """Local bounding boxes of parts, computed from a Parts catalog and cached.
+
+    Sub-files are flattened recursively; references to files missing from
+    the library are ignored. Parts without any geometry have a None box.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        self._boxes = {}
+
+    def __getitem__(self, code):
+        code = code.upper()
+        try:
+            return self._boxes[code]
+        except KeyError:
+            pass
+        box = self._compute(code)
+        self._boxes[code] = box
+        return box
+
+    def _compute(self, code):
+        try:
+            part = self.parts.part(code=code)
+            if part is None:
+                return None
+            objects = list(part.objects)
+        except (PartError, OSError):
+            return None
+        bounds = None
+        for obj in objects:
+            if isinstance(obj, Piece):
+                sub_box = self[obj.part]
+                if sub_box is None:
+                    continue
+                box = _transform(_as_tuple(sub_box), obj.position, obj.matrix)
+            elif isinstance(obj, OptionalLine):
+                box = _as_tuple(BoundingBox.from_points([obj.point1, obj.point2]))
+            elif isinstance(obj, (Line, Triangle, Quadrilateral)):
+                box = _as_tuple(BoundingBox.from_points(obj.points))
+            else:
+                continue
+            bounds = box if bounds is None else _union(bounds, box)
+        return None if bounds is None else _as_box(bounds)
+
+
+class BVH:
+    # pylint: disable=too-many-instance-attributes
+    """a bounding volume hierarchy over pieces.
+
+    bounds maps part codes to local BoundingBox objects (a PartBounds, or
+    a plain dict); a None box is treated as a point at the piece position.
+    """
+
+    def __init__(self, pieces, bounds, leaf_size=LEAF_SIZE):
+        self.pieces = list(pieces)
+        self.bounds = bounds
+        self.leaf_size = leaf_size
+        self._index = {piece: i for i, piece in enumerate(self.pieces)}
+        self._boxes = [self._piece_box(piece) for piece in self.pieces]
+
+        # Nodes are stored in pre-order, so a parent always has a smaller
+        # index than its children; leaves own a slice of self._order.
+        self._node_boxes = []
+        self._node_children = []
+        self._node_slices = []
+        self._node_parent = []
+        self._leaf_of = [0] * len(self.pieces)
+        self._order = list(range(len(self.pieces)))
+        if self.pieces:
+            centers = [
+                [box[axis] + box[axis + 3] for box in self._boxes] for axis in range(3)
+            ]
+            self._build(0, len(self._order), -1, centers)
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def _piece_box(self, piece):
+        position, matrix = piece.world_transform()
+        local = self.bounds[piece.part]
+        if local is None:
+            return (position.x, position.y, position.z) * 2
+        return _transform(_as_tuple(local), position, matrix)
+
+    def _build(self, start, end, parent, centers):
+        node = len(self._node_boxes)
+        self._node_boxes.append(None)
+        self._node_parent.append(parent)
+        self._node_children.append(None)
+        self._node_slices.append((start, end))
+        indices = self._order[start:end]
+
+        if end - start <= self.leaf_size:
+            box = self._boxes[indices[0]]
+            for i in indices:
+                self._leaf_of[i] = node
+                box = _union(box, self._boxes[i])
+            self._node_boxes[node] = box
+            return node
+
+        # Median split along the axis where the centers are most spread.
+        spreads = []
+        for axis_centers in centers:
+            values = [axis_centers[i] for i in indices]
+            spreads.append(max(values) - min(values))
+        axis = spreads.index(max(spreads))
+        indices.sort(key=centers[axis].__getitem__)
+        self._order[start:end] = indices
+        middle = (start + end) // 2
+        left = self._build(start, middle, node, centers)
+        right = self._build(middle, end, node, centers)
+        self._node_children[node] = (left, right)
+        self._node_boxes[node] = _union(self._node_boxes[left], self._node_boxes[right])
+        return node
+
+    def box(self, piece):
+        """Return the world bounding box of a piece in the hierarchy."""
+        return _as_box(self._boxes[self._index[piece]])
+
+    def refit(self, pieces=None):
+        """Update the hierarchy after pieces moved.
+
+        Only the given pieces and their ancestors are recomputed; without
+        arguments every box is refreshed. The tree topology is kept, so
+        queries stay correct but may slow down after very large moves.
+        """
+        if pieces is None:
+            self._boxes = [self._piece_box(piece) for piece in self.pieces]
+            nodes = range(len(self._node_boxes))
+        else:
+            nodes = set()
+            for piece in pieces:
+                i = self._index[piece]
+                self._boxes[i] = self._piece_box(piece)
+                node = self._leaf_of[i]
+                while node != -1 and node not in nodes:
+                    nodes.add(node)
+                    node = self._node_parent[node]
+        for node in sorted(nodes, reverse=True):
+            children = self._node_children[node]
+            if children is None:
+                start, end = self._node_slices[node]
+                box = self._boxes[self._order[start]]
+                for i in self._order[start + 1 : end]:
+                    box = _union(box, self._boxes[i])
+            else:
+                box = _union(
+                    self._node_boxes[children[0]],
+                    self._node_boxes[children[1]],
+                )
+            self._node_boxes[node] = box
+
+    def _leaf_items(self, node):
+        start, end = self._node_slices[node]
+        return self._order[start:end]
+
+    def query(self, box, tolerance=0.0):
+        """Return the pieces whose boxes overlap a BoundingBox."""
+        found = []
+        if not self.pieces:
+            return found
+        target = _as_tuple(box)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if not _overlaps(self._node_boxes[node], target, tolerance):
+                continue
+            children = self._node_children[node]
+            if children is None:
+                found.extend(
+                    self.pieces[i]
+                    for i in self._leaf_items(node)
+                    if _overlaps(self._boxes[i], target, tolerance)
+                )
+            else:
+                stack.extend(children)
+        return found
+
+    def overlapping_pairs(self, tolerance=0.0):
+        """Return the pairs of pieces whose boxes overlap.
+
+        Boxes that merely touch, or overlap by no more than tolerance,
+        are not reported.
+        """
+        pairs = []
+        if not self.pieces:
+            return pairs
+        boxes = self._boxes
+        stack = [(0, 0)]
+        while stack:
+            a, b = stack.pop()
+            children_a = self._node_children[a]
+            children_b = self._node_children[b]
+            if a == b:
+                if children_a is None:
+                    items = self._leaf_items(a)
+                    for n, i in enumerate(items):
+                        pairs.extend(
+                            (i, j)
+                            for j in items[n + 1 :]
+                            if _overlaps(boxes[i], boxes[j], tolerance)
+                        )
+                else:
+                    left, right = children_a
+                    stack.extend([(left, left), (right, right), (left, right)])
+                continue
+            if not _overlaps(self._node_boxes[a], self._node_boxes[b], tolerance):
+                continue
+            if children_a is None and children_b is None:
+                pairs.extend(
+                    (i, j)
+                    for i in self._leaf_items(a)
+                    for j in self._leaf_items(b)
+                    if _overlaps(boxes[i], boxes[j], tolerance)
+                )
+            elif children_b is None or (
+                children_a is not None and self._leaf_count(a) >= self._leaf_count(b)
+            ):
+                stack.extend((child, b) for child in children_a)
+            else:
+                stack.extend((a, child) for child in children_b)
+        return [
+            (self.pieces[min(i, j)], self.pieces[max(i, j)]) for i, j in sorted(pairs)
+        ]
+
+    def _leaf_count(self, node):
+        start, end = self._node_slices[node]
+        return end - start
+
+    def ray_cast(self, origin, direction):
+        """Return the nearest piece whose box is hit by a ray, and the distance.
+
+        The distance is measured in units of direction; None is returned
+        when the ray misses every piece.
+        """
+        if not self.pieces:
+            return None
+        o = (origin.x, origin.y, origin.z)
+        inverse = tuple(
+            None if d == 0 else 1.0 / d for d in (direction.x, direction.y, direction.z)
+        )
+        best = None
+        best_t = float("inf")
+        t = _ray_entry(self._node_boxes[0], o, inverse)
+        stack = [] if t is None else [(t, 0)]
+        while stack:
+            t, node = stack.pop()
+            if t >= best_t:
+                continue
+            children = self._node_children[node]
+            if children is None:
+                for i in self._leaf_items(node):
+                    t = _ray_entry(self._boxes[i], o, inverse)
+                    if t is not None and t < best_t:
+                        best, best_t = i, t
+                continue
+            hits = [
+                (t, child)
+                for child in children
+                if (t := _ray_entry(self._node_boxes[child], o, inverse)) is not None
+            ]
+            # Visit the nearest child first, it is pushed last.
+            hits.sort(reverse=True)
+            stack.extend(hits)
+        if best is None:
+            return None
+        return self.pieces[best], best_t
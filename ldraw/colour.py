@@ -18,10 +18,24 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import re
+
+from ldraw.errors import FrozenColourError, InvalidColourError
+
+# Direct colours, written 0x2RRGGBB in LDraw files, have these codes.
+DIRECT_COLOURS = range(0x2000000, 0x3000000)
+DIRECT_COLOUR_TOKEN = re.compile("0x2[0-9A-F]{6}", flags=re.IGNORECASE)
+
 
 class Colour:
     # pylint: disable=too-many-arguments, too-few-public-methods
-    """a Colour, uniquely identified by a code."""
+    """a Colour, uniquely identified by a code.
+
+    Colours cannot be changed once made, since the same instance is
+    shared by all the lines and pieces of that colour.
+    """
+
+    __slots__ = ("alpha", "code", "colour_attributes", "name", "rgb")
 
     def __init__(
         self,
@@ -31,11 +45,24 @@ class Colour:
         alpha=None,
         colour_attributes=None,
     ):
-        self.code = code
-        self.name = name
-        self.rgb = rgb
-        self.alpha = alpha
-        self.colour_attributes = colour_attributes
+        set_attribute = object.__setattr__
+        set_attribute(self, "code", code)
+        set_attribute(self, "name", name)
+        set_attribute(self, "rgb", rgb)
+        set_attribute(self, "alpha", alpha)
+        set_attribute(self, "colour_attributes", colour_attributes)
+
+    def __setattr__(self, name, value):
+        raise FrozenColourError(self, name)
+
+    def __delattr__(self, name):
+        raise FrozenColourError(self, name)
+
+    def __reduce__(self):
+        return (
+            Colour,
+            (self.code, self.name, self.rgb, self.alpha, self.colour_attributes),
+        )
 
     def __eq__(self, other):
         if isinstance(other, Colour):
@@ -44,3 +71,17 @@ class Colour:
 
     def __hash__(self):
         return hash(self.code)
+
+
+def direct_colour(token: str) -> Colour:
+    """Return the Colour of a 0x2RRGGBB direct colour."""
+    if not DIRECT_COLOUR_TOKEN.fullmatch(token):
+        raise InvalidColourError(token)
+    return Colour(int(token, 16), rgb="#" + token[3:], alpha=255)
+
+
+def colour_text(code: int) -> str:
+    """Return a colour code as written in LDraw files."""
+    if code in DIRECT_COLOURS:
+        return "0x%07X" % code
+    return "%i" % code
@@ -1,9 +1,11 @@
-"""takes care of reading and writing a configuration in config.yml."""
+"""takes care of reading and writing a configuration in config.yml.
 
-import argparse
-import os
+yaml and argparse are imported when a configuration is read or written,
+since ldraw.imports, and so every "import ldraw", needs this module.
+"""
 
-import yaml
+import functools
+import os
 
 from ldraw.dirs import get_cache_dir, get_config_dir, get_data_dir
 from ldraw.errors import InvalidConfigFileError
@@ -15,20 +17,28 @@ def is_valid_config_file(parser, arg):  # noqa: ARG001
     """Validate that the given config file exists and is valid YAML."""
     if not os.path.exists(arg):
         raise FileNotFoundError(arg)
+    import yaml  # noqa: PLC0415
+
     with open(arg) as f:
         if yaml.load(f, Loader=yaml.SafeLoader) is None:
             raise InvalidConfigFileError(arg)
     return arg
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--config", type=lambda x: is_valid_config_file(parser, x))
+@functools.cache
+def get_parser():
+    """Return the parser of the --config argument, made when first needed."""
+    import argparse  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=lambda x: is_valid_config_file(parser, x))
+    return parser
 
 
 def get_config(config_file: str | None = None) -> str:
     """Get the path to the configuration file, either from arguments or default."""
     if config_file is None:
-        args, unknown = parser.parse_known_args()
+        args, unknown = get_parser().parse_known_args()
         return args.config if args.config is not None else CONFIG_FILE
     return config_file
 
@@ -38,11 +48,14 @@ class Config:
 
     ldraw_library_path: str
     generated_path: str
+    in_memory: bool
 
     def __init__(
         self,
         ldraw_library_path: str | None = None,
         generated_path: str | None = None,
+        *,
+        in_memory: bool = False,
     ):
         self.ldraw_library_path = (
             ldraw_library_path
@@ -54,10 +67,14 @@ class Config:
             if generated_path is not None
             else os.path.join(get_data_dir(), "generated")
         )
+        # Build ldraw.library in memory instead of importing generated files.
+        self.in_memory = in_memory
 
     @classmethod
     def load(cls, config_file=None):
         """Load configuration from YAML file or create default configuration."""
+        import yaml  # noqa: PLC0415
+
         config_path = get_config(config_file)
 
         try:
@@ -68,15 +85,22 @@ class Config:
                     ldraw_library_path=cfg.get("ldraw_library_path"),
                     # pyrefly: ignore  # missing-attribute  # noqa: ERA001
                     generated_path=cfg.get("generated_path"),
+                    # pyrefly: ignore  # missing-attribute  # noqa: ERA001
+                    in_memory=bool(cfg.get("in_memory", False)),
                 )
         except FileNotFoundError:
             return cls()
 
     def __str__(self):
-        return f"Config({self.ldraw_library_path=}, {self.generated_path=})"
+        return (
+            f"Config({self.ldraw_library_path=}, {self.generated_path=}, "
+            f"{self.in_memory=})"
+        )
 
     def write(self, config_file=None):
         """Write the config to config.yml."""
+        import yaml  # noqa: PLC0415
+
         config_path = get_config(config_file=config_file)
 
         with open(config_path, "w") as _config_file:
@@ -85,4 +109,6 @@ class Config:
                 written["ldraw_library_path"] = self.ldraw_library_path
             if self.generated_path is not None:
                 written["generated_path"] = self.generated_path
+            if self.in_memory:
+                written["in_memory"] = True
             yaml.dump(written, _config_file)
@@ -0,0 +1,277 @@
+"""Stud and anti-stud connectivity between pieces.
+
+Connection points are extracted from the primitives a part references:
+studs come from stud primitives, anti-studs from the open underside of
+hollow box primitives and from stud tubes. They are cached per part in
+local coordinates, then matched in world space with a SpatialHash.
+"""
+
+from ldraw.errors import PartError
+from ldraw.pieces import Piece
+from ldraw.spatial import SpatialHash
+
+STUD_SPACING = 20.0
+
+# Primitives whose origin is the base of a stud pointing up (-Y).
+STUD_PRIMITIVES = {
+    "STUD",
+    "STUD2",
+    "STUD2A",
+    "STUD6",
+    "STUD6A",
+    "STUD10",
+    "STUD15",
+}
+# Tubes between four studs of a 2-wide part; the receiving positions are
+# at the open bottom of the tube (y=-4), around it, facing into the part.
+TUBE_PRIMITIVES = {"STUD4", "STUD4A", "STUD4O"}
+TUBE_ANTI_STUDS = (
+    (10.0, -4.0, 10.0),
+    (10.0, -4.0, -10.0),
+    (-10.0, -4.0, 10.0),
+    (-10.0, -4.0, -10.0),
+)
+# Boxes without their y=0 face, used for the hollow underside of bricks,
+# plates and tiles.
+HOLLOW_PRIMITIVES = {"BOX5"}
+
+UP = (0.0, -1.0, 0.0)
+DOWN = (0.0, 1.0, 0.0)
+
+
+def _primitive_name(code):
+    return code.replace("/", "\\").rsplit("\\", 1)[-1].upper()
+
+
+def _apply(position, matrix, point):
+    r = matrix.rows
+    x, y, z = point
+    return (
+        r[0][0] * x + r[0][1] * y + r[0][2] * z + position.x,
+        r[1][0] * x + r[1][1] * y + r[1][2] * z + position.y,
+        r[2][0] * x + r[2][1] * y + r[2][2] * z + position.z,
+    )
+
+
+def _direction(matrix, direction):
+    r = matrix.rows
+    x, y, z = direction
+    dx = r[0][0] * x + r[0][1] * y + r[0][2] * z
+    dy = r[1][0] * x + r[1][1] * y + r[1][2] * z
+    dz = r[2][0] * x + r[2][1] * y + r[2][2] * z
+    length = (dx * dx + dy * dy + dz * dz) ** 0.5
+    return (dx / length, dy / length, dz / length)
+
+
+def _hollow_anti_studs(matrix):
+    """Return the receiving positions on the open face of a hollow box."""
+    r = matrix.rows
+    # World half extents of the box along its local x and z axes.
+    size_x = (r[0][0] ** 2 + r[1][0] ** 2 + r[2][0] ** 2) ** 0.5
+    size_z = (r[0][2] ** 2 + r[1][2] ** 2 + r[2][2] ** 2) ** 0.5
+    count_x = max(1, round(2 * size_x / STUD_SPACING))
+    count_z = max(1, round(2 * size_z / STUD_SPACING))
+    return [
+        (
+            (i - (count_x - 1) / 2) * STUD_SPACING / size_x,
+            0.0,
+            (k - (count_z - 1) / 2) * STUD_SPACING / size_z,
+        )
+        for i in range(count_x)
+        for k in range(count_z)
+    ]
+
+
+class ConnectionPoints:
+    """Studs and anti-studs of a part, in the part's coordinates.
+
+    Each point is a (position, direction) pair of (x, y, z) tuples; a stud
+    points from its base towards its tip, an anti-stud into its cavity, so
+    a stud fits an anti-stud with the same direction at the same position.
+    """
+
+    def __init__(self, studs=None, anti_studs=None):
+        self.studs = studs if studs is not None else []
+        self.anti_studs = anti_studs if anti_studs is not None else []
+
+    def __repr__(self):
+        return "<ConnectionPoints: %i studs, %i anti-studs>" % (
+            len(self.studs),
+            len(self.anti_studs),
+        )
+
+    def transform(self, position, matrix):
+        """Return these connection points moved by a position and matrix."""
+        # Parts use very few distinct directions, transform each only once.
+        directions = {}
+
+        def moved(points):
+            result = []
+            for point, direction in points:
+                try:
+                    moved_direction = directions[direction]
+                except KeyError:
+                    moved_direction = _direction(matrix, direction)
+                    directions[direction] = moved_direction
+                result.append((_apply(position, matrix, point), moved_direction))
+            return result
+
+        return ConnectionPoints(moved(self.studs), moved(self.anti_studs))
+
+
+class PartConnections:
+    """Connection points of parts, computed from a Parts catalog and cached.
+
+    Sub-files are flattened recursively until a connection primitive is
+    reached; references to files missing from the library are ignored.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+        self._points = {}
+
+    def __getitem__(self, code):
+        code = code.upper()
+        try:
+            return self._points[code]
+        except KeyError:
+            pass
+        points = self._compute(code)
+        self._points[code] = points
+        return points
+
+    def _compute(self, code):
+        points = ConnectionPoints()
+        name = _primitive_name(code)
+        if name in STUD_PRIMITIVES:
+            points.studs.append(((0.0, 0.0, 0.0), UP))
+            return points
+        if name in TUBE_PRIMITIVES:
+            points.anti_studs.extend((point, DOWN) for point in TUBE_ANTI_STUDS)
+            return points
+        try:
+            part = self.parts.part(code=code)
+            if part is None:
+                return points
+            objects = list(part.objects)
+        except (PartError, OSError):
+            return points
+        for obj in objects:
+            if not isinstance(obj, Piece):
+                continue
+            if _primitive_name(obj.part) in HOLLOW_PRIMITIVES:
+                cavity = _direction(obj.matrix, DOWN)
+                if cavity[1] < 0:
+                    points.anti_studs.extend(
+                        (_apply(obj.position, obj.matrix, point), cavity)
+                        for point in _hollow_anti_studs(obj.matrix)
+                    )
+                continue
+            sub_points = self[obj.part].transform(obj.position, obj.matrix)
+            points.studs.extend(sub_points.studs)
+            points.anti_studs.extend(sub_points.anti_studs)
+        # Tubes and hollow boxes often describe the same receiving positions.
+        points.anti_studs = list(
+            {
+                tuple(round(c, 3) for c in point + direction): (point, direction)
+                for point, direction in points.anti_studs
+            }.values(),
+        )
+        return points
+
+
+class ConnectionGraph:
+    """an undirected graph of the pieces attached to each other."""
+
+    def __init__(self, pieces):
+        self.pieces = list(pieces)
+        self._index = {piece: i for i, piece in enumerate(self.pieces)}
+        self._adjacency = [set() for _ in self.pieces]
+
+    def __len__(self):
+        return len(self.pieces)
+
+    def connect(self, piece1, piece2):
+        """Record that two pieces are attached."""
+        i = self._index[piece1]
+        j = self._index[piece2]
+        if i != j:
+            self._adjacency[i].add(j)
+            self._adjacency[j].add(i)
+
+    def connected(self, piece1, piece2):
+        """Check if two pieces are directly attached."""
+        return self._index[piece2] in self._adjacency[self._index[piece1]]
+
+    def neighbours(self, piece):
+        """Return the pieces directly attached to a piece."""
+        return [self.pieces[j] for j in sorted(self._adjacency[self._index[piece]])]
+
+    @property
+    def edges(self):
+        """Return the attached pairs of pieces."""
+        return [
+            (self.pieces[i], self.pieces[j])
+            for i, adjacent in enumerate(self._adjacency)
+            for j in sorted(adjacent)
+            if i < j
+        ]
+
+    def _reachable(self, starts):
+        seen = set(starts)
+        stack = list(starts)
+        while stack:
+            i = stack.pop()
+            for j in self._adjacency[i]:
+                if j not in seen:
+                    seen.add(j)
+                    stack.append(j)
+        return seen
+
+    def components(self):
+        """Return the sub-assemblies, as lists of pieces attached together."""
+        seen = set()
+        components = []
+        for i in range(len(self.pieces)):
+            if i in seen:
+                continue
+            component = self._reachable([i])
+            seen |= component
+            components.append([self.pieces[j] for j in sorted(component)])
+        return components
+
+    def floating(self, anchors):
+        """Return the pieces not attached, even indirectly, to any anchor piece."""
+        reachable = self._reachable([self._index[piece] for piece in anchors])
+        return [piece for i, piece in enumerate(self.pieces) if i not in reachable]
+
+
+def connection_graph(pieces, connections, tolerance=0.5):
+    """Compute which pieces are attached through studs and anti-studs.
+
+    connections maps part codes to ConnectionPoints (a PartConnections, or
+    a plain dict). A stud and an anti-stud connect when their positions
+    are within tolerance and they point the same way.
+    """
+    graph = ConnectionGraph(pieces)
+    anti_studs = SpatialHash(max(4 * tolerance, 1.0))
+    studs = []
+    for piece in graph.pieces:
+        position, matrix = piece.world_transform()
+        points = connections[piece.part].transform(position, matrix)
+        for point in points.anti_studs:
+            anti_studs.insert(point[0], (piece, point[1]))
+        studs.extend((piece, point) for point in points.studs)
+
+    for piece, (point, direction) in studs:
+        for _, (other, other_direction) in anti_studs.near(point, tolerance):
+            if other is piece:
+                continue
+            alignment = (
+                direction[0] * other_direction[0]
+                + direction[1] * other_direction[1]
+                + direction[2] * other_direction[2]
+            )
+            if alignment > 0.99:
+                graph.connect(piece, other)
+    return graph
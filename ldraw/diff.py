@@ -0,0 +1,212 @@
+"""Differences between two versions of a model.
+
+Every piece is reduced to a canonical key: its part, colour code, and
+position and matrix rounded to a number of digits. The keys of each model
+are counted in a multiset, so that finding the pieces added and removed
+is linear in the number of pieces. Removed and added pieces of the same
+part and colour that are close to each other are then paired as moved,
+using a SpatialHash.
+"""
+
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from ldraw.colour import Colour
+from ldraw.geometry import Matrix, Vector
+from ldraw.loader import load_ldr
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+from ldraw.spatial import SpatialHash
+
+DIGITS = 3
+MOVE_RADIUS = 100.0
+# Moved pieces are searched from their new position outwards, a stud at
+# a time, so that pieces moved a little are paired in a few lookups.
+MOVE_CELL_SIZE = 20.0
+# Number of distinct coordinates or matrices rounded before the caches
+# are cleared.
+CACHE_SIZE = 1 << 16
+
+
+class _Quantizer:
+    """Rounds coordinates and matrices, caching the values seen before.
+
+    Models on a stud grid repeat the same coordinates and a few matrices
+    over and over, and a dict lookup is much faster than rounding.
+    """
+
+    def __init__(self, digits: int):
+        self.digits = digits
+        self._numbers = {}
+        self._matrices = {}
+
+    def number(self, value: float) -> float:
+        try:
+            return self._numbers[value]
+        except KeyError:
+            if len(self._numbers) >= CACHE_SIZE:
+                self._numbers.clear()
+            # Adding 0.0 turns -0.0 into 0.0, so that both give the same key.
+            rounded = self._numbers[value] = round(value, self.digits) + 0.0
+            return rounded
+
+    def matrix(self, values, key) -> tuple:
+        try:
+            return self._matrices[key]
+        except KeyError:
+            if len(self._matrices) >= CACHE_SIZE:
+                self._matrices.clear()
+            number = self.number
+            rounded = self._matrices[key] = tuple(number(v) for v in values)
+            return rounded
+
+
+def canonical_keys(model, digits=DIGITS):
+    """Yield the canonical key of each piece of a model.
+
+    model is a Group, a PieceArray, an iterable of Pieces, or the path of
+    an LDR file. A key is a (part, colour code, x, y, z, 9 matrix values)
+    tuple, in world coordinates.
+    """
+    quantizer = _Quantizer(digits)
+    number, rounded_matrix = quantizer.number, quantizer.matrix
+    if isinstance(model, (str, Path)):
+        model = load_ldr(model, columnar=True)
+    if isinstance(model, PieceArray):
+        positions, matrices = model.positions, model.matrices
+        colours, parts, part_codes = model.colours, model.parts, model.part_codes
+        for i in range(len(model)):
+            matrix = matrices[9 * i : 9 * i + 9]
+            yield (
+                part_codes[parts[i]],
+                colours[i],
+                number(positions[3 * i]),
+                number(positions[3 * i + 1]),
+                number(positions[3 * i + 2]),
+                *rounded_matrix(matrix, matrix.tobytes()),
+            )
+        return
+    if isinstance(model, Group):
+        model = model.all_pieces()
+    for piece in model:
+        position, matrix = piece.world_transform()
+        rows = matrix.rows
+        values = (*rows[0], *rows[1], *rows[2])
+        yield (
+            piece.part,
+            piece.colour.code,
+            number(position.x),
+            number(position.y),
+            number(position.z),
+            *rounded_matrix(values, values),
+        )
+
+
+def key_piece(key) -> Piece:
+    """Return a new Piece for a canonical key."""
+    values = key[5:14]
+    return Piece(
+        Colour(key[1]),
+        Vector(*key[2:5]),
+        Matrix([list(values[0:3]), list(values[3:6]), list(values[6:9])]),
+        key[0],
+    )
+
+
+class ModelDiff:
+    """the differences between an old and a new version of a model.
+
+    added and removed are lists of canonical keys, and moved a list of
+    (old key, new key) pairs; unchanged counts the pieces found in both.
+    """
+
+    def __init__(self, added, removed, moved, unchanged):
+        self.added = added
+        self.removed = removed
+        self.moved = moved
+        self.unchanged = unchanged
+
+    def __repr__(self):
+        return "<ModelDiff: %i added, %i removed, %i moved, %i unchanged>" % (
+            len(self.added),
+            len(self.removed),
+            len(self.moved),
+            self.unchanged,
+        )
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.moved)
+
+    @property
+    def added_pieces(self):
+        """Return new Pieces for the added keys."""
+        return [key_piece(key) for key in self.added]
+
+    @property
+    def removed_pieces(self):
+        """Return new Pieces for the removed keys."""
+        return [key_piece(key) for key in self.removed]
+
+    @property
+    def moved_pieces(self):
+        """Return (old, new) pairs of new Pieces for the moved keys."""
+        return [(key_piece(old), key_piece(new)) for old, new in self.moved]
+
+
+def _pair_moves(removed, added, radius):
+    """Pair each added key with the nearest removed key of its part and colour."""
+    by_kind = defaultdict(list)
+    for key in removed:
+        by_kind[key[:2]].append(key)
+    indices = {}
+    for kind, keys in by_kind.items():
+        index = SpatialHash(MOVE_CELL_SIZE)
+        for i, key in enumerate(keys):
+            index.insert(key[2:5], i)
+        indices[kind] = (index, keys)
+
+    paired = set()
+    moved = []
+    unmatched = []
+    for key in added:
+        kind = key[:2]
+        if kind not in indices:
+            unmatched.append(key)
+            continue
+        index, keys = indices[kind]
+        nearest = index.nearest(key[2:5], radius)
+        if nearest is None:
+            unmatched.append(key)
+            continue
+        point, best = nearest
+        paired.add((kind, best))
+        index.remove(point, best)
+        moved.append((keys[best], key))
+
+    still_removed = [
+        key
+        for kind, (_, keys) in indices.items()
+        for i, key in enumerate(keys)
+        if (kind, i) not in paired
+    ]
+    return moved, still_removed, unmatched
+
+
+def diff_models(old, new, digits=DIGITS, move_radius=MOVE_RADIUS) -> ModelDiff:
+    """Compare two versions of a model.
+
+    old and new are anything canonical_keys() accepts. Pieces are equal
+    when their keys, rounded to digits, are equal. A removed and an added
+    piece of the same part and colour, at most move_radius apart, are
+    reported as moved; set move_radius to 0 to report only additions and
+    removals.
+    """
+    old_keys = Counter(canonical_keys(old, digits))
+    new_keys = Counter(canonical_keys(new, digits))
+    removed = list((old_keys - new_keys).elements())
+    added = list((new_keys - old_keys).elements())
+    unchanged = sum((old_keys & new_keys).values())
+    moved = []
+    if move_radius > 0 and removed and added:
+        moved, removed, added = _pair_moves(removed, added, move_radius)
+    return ModelDiff(added, removed, moved, unchanged)
@@ -1,14 +1,31 @@
-"""LDraw library file download and extraction functionality."""
+"""LDraw library file download and extraction functionality.
 
+Files are downloaded to a .part file next to their destination, renamed
+once complete, so that an interrupted download is never mistaken for a
+complete file: it is resumed with a Range request the next time. Large
+files served in ranges are downloaded in several ranges at once, over a
+pool of connections.
+"""
+
+import hashlib
 import logging
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http import HTTPStatus
 from pathlib import Path
 
 import requests
+import requests.adapters
 from progress.bar import Bar
 
 from ldraw.dirs import get_cache_dir
 from ldraw.download_updates import get_latest_release_id
+from ldraw.errors import (
+    ChecksumMismatchError,
+    IncompleteDownloadError,
+    UnexpectedRangeError,
+)
 from ldraw.generate import generate_parts_lst
 
 logger = logging.getLogger(__name__)
@@ -16,6 +33,12 @@ logger = logging.getLogger(__name__)
 COMPLETE_VERSION = "complete"
 LDRAW_URL = "https://library.ldraw.org/library/updates"
 cache_ldraw = Path(get_cache_dir())
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_TIMEOUT = 60
+PART_SUFFIX = ".part"
+SEGMENTS_SUFFIX = ".segments"
+DOWNLOAD_SEGMENTS = 4
+MIN_SEGMENT_SIZE = 1 << 18
 
 
 def unpack_version(version_zip: Path, version: str) -> Path:
@@ -30,45 +53,295 @@ def unpack_version(version_zip: Path, version: str) -> Path:
     return destination
 
 
-def _download(url: str, filename: str, chunk_size=1024) -> Path:
-    retrieved = cache_ldraw / filename
-    if retrieved.exists():
-        return retrieved
+def _content_range(response) -> tuple[str, str]:
+    # "bytes 100-199/200" gives ("100-199", "200").
+    unit, _, rest = response.headers.get("content-range", "").partition(" ")
+    if unit != "bytes":
+        return "", ""
+    span, _, total = rest.partition("/")
+    return span, total
+
+
+def _sha256(path: Path, chunk_size: int) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _receive(response, partial: Path, offset: int, chunk_size: int, progress):
+    """Append the content of a response to a part file at an offset.
+
+    Returns the size of the file, and the size expected, or None.
+    """
+    length = response.headers.get("content-length")
+    expected = offset + int(length) if length is not None else None
+    with partial.open("ab" if offset else "wb") as f:
+        for data in response.iter_content(chunk_size=chunk_size):
+            offset += f.write(data)
+            if progress is not None:
+                progress(offset, expected)
+    return offset, expected
+
+
+def _stream(session, url: str, partial: Path, chunk_size: int, progress) -> None:
+    """Download a URL to a part file over one connection, resuming from its size."""
+    offset = partial.stat().st_size if partial.exists() else 0
+    # Sizes and ranges are those of the content as sent, so it must not be
+    # compressed on the way.
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = "bytes=%i-" % offset
+
+    with session.get(
+        url,
+        headers=headers,
+        stream=True,
+        timeout=DOWNLOAD_TIMEOUT,
+    ) as response:
+        span, total = _content_range(response)
+        status = response.status_code
+        if status == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE and offset:
+            if total == str(offset):
+                # The part is complete.
+                return
+            # The part is not of the same file: start again.
+            partial.unlink()
+            _stream(session, url, partial, chunk_size, progress)
+            return
+        response.raise_for_status()
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            if not span.startswith("%i-" % offset):
+                raise UnexpectedRangeError(url, "%i-" % offset)
+        else:
+            # The server sent the whole file.
+            offset = 0
+        size, expected = _receive(response, partial, offset, chunk_size, progress)
+
+    if expected is not None and size != expected:
+        if size > expected:
+            partial.unlink()
+        raise IncompleteDownloadError(url, size, expected)
+
+
+def _ranged_size(session, url: str) -> tuple[str, int | None]:
+    """Return the URL of a file after redirects, and its size if served in ranges."""
+    with session.head(
+        url,
+        headers={"Accept-Encoding": "identity"},
+        allow_redirects=True,
+        timeout=DOWNLOAD_TIMEOUT,
+    ) as response:
+        length = response.headers.get("content-length", "")
+        if (
+            not response.ok
+            or response.headers.get("accept-ranges") != "bytes"
+            or not length.isdigit()
+        ):
+            return response.url, None
+        return response.url, int(length)
+
+
+def segment_ranges(size: int, segments: int) -> list[tuple[int, int]]:
+    """Split a size into at most segments inclusive (start, end) byte ranges."""
+    step = max(-(-size // segments), 1)
+    return [(start, min(start + step, size) - 1) for start in range(0, size, step)]
 
-    response = requests.get(url, stream=True)  # noqa: S113
 
-    with open(retrieved, "wb") as file:
-        file.writelines(response.iter_content(chunk_size=chunk_size))
+class _Segments:
+    """a file downloaded in ranges, each written at its offset in the file."""
 
-    return retrieved
+    def __init__(self, session, url: str, path: Path, size: int, progress):
+        self.session = session
+        self.url = url
+        self.path = path
+        self.size = size
+        self.progress = progress
+        self._received = 0
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
 
+    def cancel(self) -> None:
+        """Stop the ranges being downloaded at their next chunk."""
+        self._cancelled.set()
 
-def _download_progress(url: str, filename: str, chunk_size=1024) -> Path:
+    def fetch(self, segment: tuple[int, int], chunk_size: int) -> None:
+        if self._cancelled.is_set():
+            return
+        start, end = segment
+        span = "%i-%i" % (start, end)
+        headers = {"Accept-Encoding": "identity", "Range": "bytes=" + span}
+        with self.session.get(
+            self.url,
+            headers=headers,
+            stream=True,
+            timeout=DOWNLOAD_TIMEOUT,
+        ) as response:
+            response.raise_for_status()
+            if response.status_code != HTTPStatus.PARTIAL_CONTENT or (
+                _content_range(response)[0] != span
+            ):
+                raise UnexpectedRangeError(self.url, span)
+            size = 0
+            with self.path.open("r+b") as f:
+                f.seek(start)
+                for data in response.iter_content(chunk_size=chunk_size):
+                    if self._cancelled.is_set():
+                        return
+                    size += f.write(data)
+                    self._count(len(data))
+        if size != end - start + 1:
+            raise IncompleteDownloadError(self.url, size, end - start + 1)
+
+    def _count(self, size: int) -> None:
+        with self._lock:
+            self._received += size
+            if self.progress is not None:
+                self.progress(self._received, self.size)
+
+
+def _fetch_segments(segments: _Segments, count: int, chunk_size: int) -> None:
+    with segments.path.open("wb") as f:
+        f.truncate(segments.size)
+    try:
+        with ThreadPoolExecutor(count) as executor:
+            futures = [
+                executor.submit(segments.fetch, segment, chunk_size)
+                for segment in segment_ranges(segments.size, count)
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                # Do not wait for the other ranges to complete.
+                segments.cancel()
+                for future in futures:
+                    future.cancel()
+                raise
+    except BaseException:
+        # A file with holes cannot be resumed.
+        segments.path.unlink(missing_ok=True)
+        raise
+
+
+def _session(connections: int):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=connections)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch(  # noqa: PLR0913
+    url: str,
+    destination,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    *,
+    sha256=None,
+    progress=None,
+    segments=1,
+) -> Path:
+    """Download a URL to a path, resuming an interrupted download.
+
+    The content is written to the destination with PART_SUFFIX added, and
+    renamed to the destination once its size matches the Content-Length,
+    and its SHA-256 matches sha256 if given. A destination that exists is
+    complete, and returned as is. progress, if given, is called with the
+    number of bytes received so far and the total, or None if unknown.
+
+    With segments above 1, a file served in ranges is downloaded in up to
+    that many ranges at once, of at least MIN_SEGMENT_SIZE, into a file
+    with SEGMENTS_SUFFIX added. If a range fails, the others are stopped
+    and that file is removed. A part left by an interrupted download is
+    resumed over one connection.
+    """
+    destination = Path(destination)
+    if destination.exists():
+        return destination
+    partial = destination.with_name(destination.name + PART_SUFFIX)
+
+    with _session(segments) as session:
+        size = None
+        if segments > 1 and not partial.exists():
+            url, size = _ranged_size(session, url)
+        count = min(segments, (size or 0) // MIN_SEGMENT_SIZE)
+        if count > 1:
+            partial = destination.with_name(destination.name + SEGMENTS_SUFFIX)
+            _fetch_segments(
+                _Segments(session, url, partial, size, progress),
+                count,
+                chunk_size,
+            )
+        else:
+            _stream(session, url, partial, chunk_size, progress)
+
+    if sha256 is not None:
+        checksum = _sha256(partial, chunk_size)
+        if checksum != sha256.lower():
+            partial.unlink()
+            raise ChecksumMismatchError(url, checksum, sha256)
+    partial.replace(destination)
+    return destination
+
+
+def _download(
+    url: str,
+    filename: str,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    segments=DOWNLOAD_SEGMENTS,
+) -> Path:
+    return fetch(url, cache_ldraw / filename, chunk_size, segments=segments)
+
+
+def _download_progress(
+    url: str,
+    filename: str,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    segments=DOWNLOAD_SEGMENTS,
+) -> Path:
     retrieved = cache_ldraw / filename
     if retrieved.exists():
         print(f"File {retrieved} already exists")
         return retrieved
 
-    response = requests.get(url, stream=True)  # noqa: S113
-    total = int(response.headers.get("content-length", 0))
-    bar = Bar(f"Downloading {url} ...", max=total)
+    bar = Bar(f"Downloading {url} ...")
 
-    with open(retrieved, "wb") as file:
-        for data in response.iter_content(chunk_size=chunk_size):
-            size = file.write(data)
-            bar.next(size)
+    def progress(received, total):
+        if total is not None:
+            bar.max = total
+        bar.goto(received)
+
+    try:
+        return fetch(
+            url,
+            retrieved,
+            chunk_size,
+            progress=progress,
+            segments=segments,
+        )
+    finally:
+        bar.finish()
 
-    bar.finish()
-    return retrieved
 
+def download(
+    *,
+    show_progress: bool = True,
+    version: str = COMPLETE_VERSION,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    segments: int = DOWNLOAD_SEGMENTS,
+) -> str:
+    """Download and unpack an LDraw library version, generating parts.lst file.
 
-def download(*, show_progress: bool = True, version: str = COMPLETE_VERSION) -> str:
-    """Download and unpack an LDraw library version, generating parts.lst file."""
+    The archive is downloaded in up to segments ranges at once. An
+    interrupted download is resumed when download() is called again.
+    """
     filename = f"{version}.zip"
+    url = f"{LDRAW_URL}/{filename}"
     retrieved = (
-        _download_progress(f"{LDRAW_URL}/{filename}", filename)
+        _download_progress(url, filename, chunk_size, segments)
         if show_progress
-        else _download(f"{LDRAW_URL}/{filename}", filename)
+        else _download(url, filename, chunk_size, segments)
     )
 
     version_dir = unpack_version(retrieved, version)
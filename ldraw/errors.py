@@ -34,6 +34,56 @@ class InvalidLineDataError(PartError, ValueError):
         )
 
 
+class InvalidColourError(PartError, ValueError):
+    """A colour is neither a code nor a 0x2RRGGBB direct colour."""
+
+    def __init__(self, token: str):
+        super().__init__(f"Invalid colour {token}")
+
+
+class GroupCycleError(ValueError):
+    """A group cannot be added to itself or to one of its subgroups."""
+
+    def __init__(self):
+        super().__init__("A group cannot be added to itself or to its subgroups.")
+
+
+class SubmodelCycleError(PartError):
+    """A submodel must not reference itself, even indirectly."""
+
+    def __init__(self, name: str):
+        super().__init__(f"Submodel {name} references itself.")
+        self.name = name
+
+
+class FigureCountError(ValueError):
+    """Batches of figures need one position, template and orientation each."""
+
+    def __init__(self):
+        super().__init__("Templates, positions and orientations differ in length.")
+
+
+class ColourCodeError(ValueError):
+    """A colour must have an integer code to be stored by code."""
+
+    def __init__(self, colour):
+        super().__init__(f"Colour {colour!r} has no integer code.")
+
+
+class FrozenColourError(AttributeError):
+    """Colours are shared, and cannot be changed."""
+
+    def __init__(self, colour, name: str):
+        super().__init__(f"Cannot change {name} of colour {colour.code!r}.")
+
+
+class ColumnLengthError(ValueError):
+    """Bulk data for a PieceArray must have one value per piece."""
+
+    def __init__(self):
+        super().__init__("Positions, colours, parts and matrices differ in length.")
+
+
 class CouldNotDetermineLatestVersionError(Exception):
     """Could not determine the latest parts list version."""
 
@@ -41,6 +91,31 @@ class CouldNotDetermineLatestVersionError(Exception):
         super().__init__("Could not determine the latest parts list version.")
 
 
+class DownloadError(Exception):
+    """Could not download a file."""
+
+
+class IncompleteDownloadError(DownloadError):
+    """A download ended before all of its content was received."""
+
+    def __init__(self, url: str, size: int, expected: int):
+        super().__init__(f"Received {size} of {expected} bytes from {url}.")
+
+
+class UnexpectedRangeError(DownloadError):
+    """A server did not send the range of bytes requested."""
+
+    def __init__(self, url: str, span: str):
+        super().__init__(f"{url} did not send bytes {span}.")
+
+
+class ChecksumMismatchError(DownloadError):
+    """A downloaded file does not have the checksum expected."""
+
+    def __init__(self, url: str, checksum: str, expected: str):
+        super().__init__(f"The file from {url} has SHA-256 {checksum}, not {expected}.")
+
+
 class ModuleImportError(ImportError):
     """Could not import a module."""
 
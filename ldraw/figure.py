@@ -19,10 +19,22 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 # pylint: disable=missing-docstring
-from ldraw.geometry import Identity, Matrix, Vector, XAxis, YAxis, ZAxis
+from functools import lru_cache
+
+from ldraw.errors import FigureCountError
+from ldraw.geometry import Identity, Matrix, Vector, XAxis, YAxis, ZAxis, as_matrix
 from ldraw.pieces import Piece
 
 
+@lru_cache(maxsize=1024)
+def rotation(angle, axis):
+    """Return the matrix of a rotation around an axis, shared between calls.
+
+    The matrix must not be modified in place.
+    """
+    return Identity().rotate(angle, axis)
+
+
 def dependent_piece(dep):
     """Mark a piece method as dependent on another piece existing."""
 
@@ -72,7 +84,7 @@ class Person:
         piece = Piece(
             colour,
             self.position + displacement,
-            self.matrix * Identity().rotate(angle, YAxis),
+            self.matrix * rotation(angle, YAxis),
             part,
             self.group,
         )
@@ -131,9 +143,7 @@ class Person:
         piece = Piece(
             colour,
             self.position + displacement,
-            self.matrix
-            * Identity().rotate(-10, ZAxis)
-            * Identity().rotate(angle, XAxis),
+            self.matrix * rotation(-10, ZAxis) * rotation(angle, XAxis),
             part,
             self.group,
         )
@@ -145,11 +155,7 @@ class Person:
         """Add a left hand piece to the figure's left arm."""
         # Displacement from left hand
         displacement = left_arm.position + left_arm.matrix * Vector(4, 17, -9)
-        matrix = (
-            left_arm.matrix
-            * Identity().rotate(40, XAxis)
-            * Identity().rotate(angle, ZAxis)
-        )
+        matrix = left_arm.matrix * rotation(40, XAxis) * rotation(angle, ZAxis)
         piece = Piece(colour, displacement, matrix, part, self.group)
         self.pieces_info["left hand"] = piece
         return piece
@@ -161,11 +167,7 @@ class Person:
             return None
         # Displacement from left hand
         displacement = left_hand.position + left_hand.matrix * displacement
-        matrix = (
-            left_hand.matrix
-            * Identity().rotate(10, XAxis)
-            * Identity().rotate(angle, YAxis)
-        )
+        matrix = left_hand.matrix * rotation(10, XAxis) * rotation(angle, YAxis)
         return Piece(colour, displacement, matrix, part, self.group)
 
     def right_arm(self, colour, angle=0, part=ArmRight):
@@ -174,9 +176,7 @@ class Person:
         piece = Piece(
             colour,
             self.position + displacement,
-            self.matrix
-            * Identity().rotate(10, ZAxis)
-            * Identity().rotate(angle, XAxis),
+            self.matrix * rotation(10, ZAxis) * rotation(angle, XAxis),
             part,
             self.group,
         )
@@ -188,11 +188,7 @@ class Person:
         """Add a right hand piece to the figure's right arm."""
         # Displacement from right arm
         displacement = right_arm.position + right_arm.matrix * Vector(-4, 17, -9)
-        matrix = (
-            right_arm.matrix
-            * Identity().rotate(40, XAxis)
-            * Identity().rotate(angle, ZAxis)
-        )
+        matrix = right_arm.matrix * rotation(40, XAxis) * rotation(angle, ZAxis)
         piece = Piece(colour, displacement, matrix, part, self.group)
         self.pieces_info["right hand"] = piece
         return piece
@@ -204,11 +200,7 @@ class Person:
             return None
         # Displacement from right hand
         displacement = right_hand.position + right_hand.matrix * displacement
-        matrix = (
-            right_hand.matrix
-            * Identity().rotate(10, XAxis)
-            * Identity().rotate(angle, YAxis)
-        )
+        matrix = right_hand.matrix * rotation(10, XAxis) * rotation(angle, YAxis)
         return Piece(colour, displacement, matrix, part, self.group)
 
     def left_leg(self, colour, angle=0, part=LegLeft):
@@ -217,7 +209,7 @@ class Person:
         piece = Piece(
             colour,
             self.position + displacement,
-            self.matrix * Identity().rotate(angle, XAxis),
+            self.matrix * rotation(angle, XAxis),
             part,
             self.group,
         )
@@ -231,7 +223,7 @@ class Person:
             return None
         # Displacement from left leg
         displacement = left_leg.position + left_leg.matrix * Vector(10, 28, 0)
-        matrix = left_leg.matrix * Identity().rotate(angle, YAxis)
+        matrix = left_leg.matrix * rotation(angle, YAxis)
         return Piece(colour, displacement, matrix, part, self.group)
 
     def right_leg(self, colour, angle=0, part=LegRight):
@@ -240,7 +232,7 @@ class Person:
         piece = Piece(
             colour,
             self.position + displacement,
-            self.matrix * Identity().rotate(angle, XAxis),
+            self.matrix * rotation(angle, XAxis),
             part,
             self.group,
         )
@@ -254,5 +246,148 @@ class Person:
             return None
         # Displacement from right leg
         displacement = right_leg.position + right_leg.matrix * Vector(-10, 28, 0)
-        matrix = right_leg.matrix * Identity().rotate(angle, YAxis)
+        matrix = right_leg.matrix * rotation(angle, YAxis)
         return Piece(colour, displacement, matrix, part, self.group)
+
+
+# Number of orientations a FigureTemplate keeps transforms for.
+ORIENTATION_CACHE_SIZE = 1024
+BODY_PARTS = {
+    "head": Head,
+    "torso": Torso,
+    "hips": Hips,
+    "left arm": ArmLeft,
+    "left hand": Hand,
+    "right arm": ArmRight,
+    "right hand": Hand,
+    "left leg": LegLeft,
+    "right leg": LegRight,
+}
+
+
+class Pose:
+    """the angles of the limbs of a minifigure.
+
+    The position and matrix of each body part relative to the torso are
+    computed once, with the same construction as Person, and kept in
+    transforms, by the names used in BODY_PARTS; "hat" is placed like
+    the head.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        head=0,
+        left_arm=0,
+        left_hand=0,
+        right_arm=0,
+        right_hand=0,
+        left_leg=0,
+        right_leg=0,
+    ):
+        self.angles = (
+            head,
+            left_arm,
+            left_hand,
+            right_arm,
+            right_hand,
+            left_leg,
+            right_leg,
+        )
+        person = Person()
+        pieces = {
+            "head": person.head(None, head),
+            "hat": person.hat(None),
+            "torso": person.torso(None),
+            "hips": person.hips(None),
+            "left arm": person.left_arm(None, left_arm),
+            "left hand": person.left_hand(None, left_hand),
+            "right arm": person.right_arm(None, right_arm),
+            "right hand": person.right_hand(None, right_hand),
+            "left leg": person.left_leg(None, left_leg),
+            "right leg": person.right_leg(None, right_leg),
+        }
+        self.transforms = {
+            name: (piece.position, piece.matrix) for name, piece in pieces.items()
+        }
+
+    def __repr__(self):
+        return "<Pose: %r>" % (self.angles,)
+
+
+class FigureTemplate:
+    """a minifigure with given colours, parts and pose, ready to be placed.
+
+    colours maps the names of the body parts to place to their colours;
+    parts overrides the parts of BODY_PARTS, and is needed for a "hat".
+    The transforms of the body parts are computed once per orientation
+    the template is placed with.
+    """
+
+    def __init__(self, colours, parts=None, pose=None):
+        parts = {**BODY_PARTS, **(parts or {})}
+        pose = pose if pose is not None else Pose()
+        self.pose = pose
+        self.items = [
+            (colour, parts[name], *pose.transforms[name])
+            for name, colour in colours.items()
+        ]
+        self._oriented = {}
+
+    def _orient(self, matrix):
+        try:
+            return self._oriented[matrix]
+        except KeyError:
+            if len(self._oriented) >= ORIENTATION_CACHE_SIZE:
+                self._oriented.clear()
+            oriented = [
+                (colour, part, matrix * position, matrix * piece_matrix)
+                for colour, part, position, piece_matrix in self.items
+            ]
+            self._oriented[matrix] = oriented
+            return oriented
+
+    def place(self, position, matrix=None, group=None):
+        """Return new Pieces for a figure with its torso at a position.
+
+        matrix, a Matrix or a Quaternion, orients the figure; it is the
+        identity if None. The pieces are added to group, if given. Each
+        piece has a Matrix of its own, which can be changed in place.
+        """
+        items = self.items if matrix is None else self._orient(as_matrix(matrix))
+        return [
+            Piece(
+                colour,
+                position + offset,
+                Matrix([row[:] for row in piece_matrix.rows]),
+                part,
+                group,
+            )
+            for colour, part, offset, piece_matrix in items
+        ]
+
+
+def place_figures(templates, positions, orientations=None, group=None):
+    """Place many minifigures, and return all their new Pieces.
+
+    templates is a FigureTemplate used for every figure, or a sequence
+    with one template per figure; orientations is None, or a sequence
+    with one Matrix, Quaternion or None per figure. Figures sharing a
+    template and an orientation reuse the same precomputed transforms.
+    """
+    count = len(positions)
+    if isinstance(templates, FigureTemplate):
+        templates = [templates] * count
+    if orientations is None:
+        orientations = [None] * count
+    if not len(templates) == len(orientations) == count:
+        raise FigureCountError
+    pieces = []
+    for template, position, orientation in zip(
+        templates,
+        positions,
+        orientations,
+        strict=True,
+    ):
+        pieces.extend(template.place(position, orientation, group))
+    return pieces
@@ -1,62 +1,120 @@
 """Module tasked with generating python files for the ldraw.library namespace."""
 
 import hashlib
+import json
 import logging
 import os
 import shutil
 from pathlib import Path
 
 from ldraw.config import Config
+from ldraw.generation.archive import pack_library
+from ldraw.generation.bytecode import compile_library
 from ldraw.generation.colours import gen_colours
-from ldraw.generation.parts import gen_parts
+from ldraw.generation.parts import MANIFEST_NAME, gen_parts
 from ldraw.parts import Parts
-from ldraw.resources import _get_resource, _get_resource_content
-from ldraw.utils import ensure_exists
+from ldraw.resources import _get_resource_content
+from ldraw.utils import ensure_exists, write_if_changed
 
 logger = logging.getLogger("ldraw")
 
 
-def generate(config: Config, *, force=False):
-    """Generate the library from configuration."""
+def generate(  # noqa: PLR0913
+    config: Config,
+    *,
+    force=False,
+    workers=None,
+    emitter="native",
+    lazy=False,
+    bytecode=False,
+    archive=None,
+):
+    """Generate the library from configuration.
+
+    Only the modules whose inputs changed since the last generation are
+    written again, unless force is set, when the library is rebuilt from
+    scratch. workers is the number of processes generating the parts
+    modules, by default one per CPU. emitter is "native", which formats
+    the modules directly, or "mustache", which renders the templates; both
+    give the same files. If lazy is True, the parts modules are small
+    stubs reading their parts from tables when they are used, see
+    ldraw.lazy. If bytecode is True, the modules are then compiled to
+    checked hash based pycs, see ldraw.generation.bytecode. If archive is
+    a path, the library is then packed into it, see
+    ldraw.generation.archive; set generated_path to the archive to use it.
+    """
     generated_library_path = os.path.join(config.generated_path, "library")
     ensure_exists(generated_library_path)
 
     hash_path = Path(generated_library_path) / "__hash__"
+    manifest_path = Path(generated_library_path) / MANIFEST_NAME
 
     library_path = Path(config.ldraw_library_path)
 
     parts_lst = library_path / "ldraw" / "parts.lst"
     md5_parts_lst = hashlib.md5(parts_lst.read_bytes()).hexdigest()
+    # The modules also depend on how they are written.
+    generation_hash = "%s %s%s" % (md5_parts_lst, emitter, " lazy" if lazy else "")
 
     if hash_path.exists():
         md5 = hash_path.read_text()
-        if md5 == md5_parts_lst and not force:
+        if md5 == generation_hash and not force:
             logger.error(
                 "Path %s already generated (checksums match)",
                 generated_library_path,
             )
+            finish(config, workers, bytecode=bytecode, archive=archive)
             return
 
-    # pyrefly: ignore  # deprecated  # noqa: ERA001
-    shutil.rmtree(generated_library_path)
-    ensure_exists(generated_library_path)
+    manifest = read_manifest(manifest_path)
+    # Until the new manifest is written, modules may not match the old one.
+    manifest_path.unlink(missing_ok=True)
+    if force or manifest is None:
+        # pyrefly: ignore  # deprecated  # noqa: ERA001
+        shutil.rmtree(generated_library_path)
+        ensure_exists(generated_library_path)
+        manifest = {}
 
     parts = Parts(parts_lst)
 
     library__init__ = os.path.join(generated_library_path, "__init__.py")
-
-    with open(library__init__, "w") as library__init__:
-        library__init__.write(LIBRARY_INIT)
-
-    shutil.copy(
-        _get_resource("ldraw-license.txt"),
+    write_if_changed(library__init__, LIBRARY_INIT)
+    write_if_changed(
         os.path.join(generated_library_path, "license.txt"),
+        _get_resource_content("ldraw-license.txt"),
+    )
+
+    gen_colours(parts, generated_library_path, emitter)
+    manifest = gen_parts(
+        parts,
+        generated_library_path,
+        workers,
+        manifest,
+        emitter,
+        lazy=lazy,
     )
 
-    gen_colours(parts, generated_library_path)
-    gen_parts(parts, generated_library_path)
+    manifest_path.write_text(json.dumps(manifest, indent=1))
+    hash_path.write_text(generation_hash)
+
+    finish(config, workers, bytecode=bytecode, archive=archive)
+
+
+def finish(config: Config, workers=None, *, bytecode=False, archive=None):
+    """Compile and pack a generated library, as asked to generate()."""
+    if bytecode:
+        compile_library(os.path.join(config.generated_path, "library"), workers)
+    if archive is not None:
+        pack_library(config.generated_path, archive)
+
 
-    hash_path.write_text(md5_parts_lst)
+def read_manifest(manifest_path: Path) -> dict | None:
+    """Return the manifest of a generated library, or None if unreadable."""
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
 
 
 LIBRARY_INIT = _get_resource_content(os.path.join("templates", "ldraw__init__"))
@@ -0,0 +1,56 @@
+"""Packing of a generated library into a single archive.
+
+The archive holds the files of the library, and a checked hash based pyc
+next to each module, so that ldraw.imports.LibraryArchive can run the
+modules without compiling them. Pointing generated_path at the archive
+makes deployment one file, and imports read it through an index made
+when it is opened instead of probing the filesystem.
+"""
+
+import importlib.util
+import marshal
+import os
+import zipfile
+from pathlib import Path
+
+from ldraw.generation.bytecode import CHECKED_HASH_FLAGS
+
+
+def pyc_content(source: bytes, filename: str) -> bytes:
+    """Return a checked hash based pyc of a module source."""
+    code = compile(source, filename, "exec", dont_inherit=True)
+    return b"".join(
+        (
+            importlib.util.MAGIC_NUMBER,
+            CHECKED_HASH_FLAGS.to_bytes(4, "little"),
+            importlib.util.source_hash(source),
+            marshal.dumps(code),
+        ),
+    )
+
+
+def pack_library(generated_path, archive_path) -> int:
+    """Pack the library of generated_path into a zip archive.
+
+    Bytecode caches are left out, a pyc is compiled for each module. The
+    archive is written next to archive_path, then moved in place. Returns
+    the number of modules packed.
+    """
+    print("Packing ldraw.library into %s..." % archive_path)
+    generated_path = Path(generated_path)
+    archive_path = Path(archive_path)
+    partial = archive_path.with_name(archive_path.name + ".partial")
+    modules = 0
+    with zipfile.ZipFile(partial, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted((generated_path / "library").rglob("*")):
+            if not path.is_file() or "__pycache__" in path.parts:
+                continue
+            name = path.relative_to(generated_path).as_posix()
+            content = path.read_bytes()
+            archive.writestr(name, content)
+            if path.suffix == ".py":
+                filename = os.path.join(archive_path, name)
+                archive.writestr(name + "c", pyc_content(content, filename))
+                modules += 1
+    partial.replace(archive_path)
+    return modules
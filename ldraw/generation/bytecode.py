@@ -0,0 +1,67 @@
+"""Ahead of time compilation of a generated library.
+
+The generated modules are byte-compiled to checked hash based pycs (PEP
+552), which stay valid as long as the source has the same hash, whatever
+its modification time. They survive copying the library into an image,
+and an interpreter that cannot write __pycache__ at runtime still finds
+them, instead of compiling every section it imports.
+"""
+
+import importlib.util
+import os
+import py_compile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from ldraw.generation.exceptions import BytecodeCompilationError
+
+# The flags of the header of a checked hash based pyc.
+CHECKED_HASH_FLAGS = 0b11
+
+
+def is_compiled(source: Path) -> bool:
+    """Return whether a module has an up to date checked hash based pyc."""
+    try:
+        with Path(importlib.util.cache_from_source(str(source))).open("rb") as f:
+            header = f.read(16)
+    except OSError:
+        return False
+    return (
+        header[:4] == importlib.util.MAGIC_NUMBER
+        and int.from_bytes(header[4:8], "little") == CHECKED_HASH_FLAGS
+        and header[8:16] == importlib.util.source_hash(source.read_bytes())
+    )
+
+
+def compile_module(source: Path) -> None:
+    """Write the checked hash based pyc of a module."""
+    py_compile.compile(
+        str(source),
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+    )
+
+
+def compile_library(library_path, workers: int | None = None) -> int:
+    """Byte-compile the modules of a generated library that need it.
+
+    Modules are compiled by up to workers processes, by default one per
+    CPU. Returns the number of modules compiled.
+    """
+    print("Compiling ldraw.library...")
+    sources = [
+        source
+        for source in sorted(Path(library_path).rglob("*.py"))
+        if not is_compiled(source)
+    ]
+    workers = workers if workers is not None else os.cpu_count() or 1
+    try:
+        if workers <= 1 or len(sources) <= 1:
+            for source in sources:
+                compile_module(source)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(sources))) as pool:
+                list(pool.map(compile_module, sources))
+    except py_compile.PyCompileError as error:
+        raise BytecodeCompilationError(error.file) from error
+    return len(sources)
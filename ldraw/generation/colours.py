@@ -1,35 +1,78 @@
 """Called by ldraw.library_gen to generate the ldraw/library/colours.py file."""
 
-import codecs
+import html
 import os
 
 import pystache
 
+from ldraw.generation.exceptions import UnknownEmitterError
 from ldraw.resources import _get_resource_content
-from ldraw.utils import camel, clean
+from ldraw.utils import camel, clean, write_if_changed
 
 
-def gen_colours(parts, library_path):
-    """Generate a colours.py from library data."""
+def gen_colours(parts, library_path, emitter="native"):
+    """Generate a colours.py from library data.
+
+    emitter is "native" or "mustache", as for gen_parts().
+    """
     print("Generating ldraw.library.colours...")
 
-    colours_str = colours_module_content(parts)
+    if emitter == "native":
+        colours_str = emit_colours_module(parts)
+    elif emitter == "mustache":
+        colours_str = colours_module_content(parts)
+    else:
+        raise UnknownEmitterError(emitter)
     colours_py = os.path.join(library_path, "colours.py")
-    with codecs.open(colours_py, "w", encoding="utf-8") as generated_file:
-        generated_file.write(colours_str)
+    write_if_changed(colours_py, colours_str)
 
 
 def colours_module_content(parts):
     """Generate the contents of the colours.py module from parts data."""
-    colours_mustache = _get_resource_content(
-        os.path.join("templates", "colours.mustache"),
-    )
-    colours_template = pystache.parse(colours_mustache)
+    colours_template = pystache.parse(COLOURS_MUSTACHE)
     context = {"colours": [get_c_dict(c) for c in parts.colours_by_name.values()]}
     context["colours"].sort(key=lambda r: r["code"])
     return pystache.render(colours_template, context=context)
 
 
+def _text(value, *, escape=True):
+    # How pystache renders a value, escaped for {{ }} but not for {{{ }}}.
+    text = "" if value is None else str(value)
+    return html.escape(text, quote=True) if escape else text
+
+
+def emit_colours_module(parts):
+    """Generate the same contents as colours_module_content(), without a template."""
+    colours = sorted(
+        (get_c_dict(c) for c in parts.colours_by_name.values()),
+        key=lambda r: r["code"],
+    )
+    lines = [COLOURS_HEADER]
+    lines.extend(
+        '%s = Colour(%s, "%s", "%s", %s, %s)\n'
+        % (
+            _text(c["name"]),
+            _text(c["code"]),
+            _text(c["name"], escape=False),
+            _text(c["rgb"], escape=False),
+            _text(c["alpha"]),
+            _text(c["colour_attributes"], escape=False),
+        )
+        for c in colours
+    )
+    lines.append("\nColoursByCode = {\n")
+    lines.extend(
+        "    %s: %s,\n" % (_text(c["code"]), _text(c["name"])) for c in colours
+    )
+    lines.append("}\n\nColoursByName = {\n")
+    lines.extend(
+        '    "%s": %s,\n' % (_text(c["full_name"], escape=False), _text(c["name"]))
+        for c in colours
+    )
+    lines.append("}\n")
+    return "".join(lines)
+
+
 def get_c_dict(colour):
     """Get a dict from a Colour object."""
     return {
@@ -40,3 +83,8 @@ def get_c_dict(colour):
         "rgb": colour.rgb,
         "colour_attributes": colour.colour_attributes,
     }
+
+
+COLOURS_MUSTACHE = _get_resource_content(os.path.join("templates", "colours.mustache"))
+# The literal text before the colours, written as is by emit_colours_module().
+COLOURS_HEADER = COLOURS_MUSTACHE[: COLOURS_MUSTACHE.index("{{# colours }}")]
@@ -7,3 +7,11 @@ class NoLibrarySelectedError(Exception):
 
 class UnwritableOutputError(Exception):
     """Exception raised when output directory is not writable."""
+
+
+class UnknownEmitterError(Exception):
+    """Exception raised when an unknown code emitter is selected."""
+
+
+class BytecodeCompilationError(Exception):
+    """Exception raised when a generated module cannot be compiled."""
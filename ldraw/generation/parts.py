@@ -1,30 +1,126 @@
 #!/usr/bin/env python
-"""Generates the ldraw.library.parts namespace."""
+"""Generates the ldraw.library.parts namespace.
+
+Each section module only depends on its own parts, so sections are
+rendered in a pool of worker processes; the output does not depend on
+the order they finish in. A manifest of the hashes of the parts of each
+section lets a regeneration rewrite only the sections that changed.
+"""
+
+import hashlib
+import importlib.util
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import pystache
 from attridict import AttriDict
 from progress.bar import Bar
 
+from ldraw.generation.exceptions import UnknownEmitterError
+from ldraw.lazy import TABLE_SUFFIX, table_content
 from ldraw.parts import PartError, Parts
 from ldraw.resources import _get_resource_content
-from ldraw.utils import camel, clean
+from ldraw.utils import camel, clean, write_if_changed
 
 SECTION_SEP = "#|#"
+# Name of the file, in the generated library, with the hashes of the
+# inputs of the generated modules.
+MANIFEST_NAME = "__manifest__"
+# Ways of writing the modules: "native" formats the lines directly, and
+# "mustache" renders the templates with pystache.
+EMITTERS = ("native", "mustache")
+WRITE_BUFFER_SIZE = 1 << 16
+# Added to the hashes of the modules generated with lazy=True.
+LAZY_MARK = "#lazy"
+
+
+def gen_parts(  # noqa: PLR0913
+    parts: Parts,
+    library_path: str,
+    workers: int | None = None,
+    manifest: dict | None = None,
+    emitter: str = "native",
+    *,
+    lazy: bool = False,
+) -> dict:
+    """Generate the ldraw.library.parts namespace modules.
 
+    Sections are rendered by up to workers processes, by default one per
+    CPU; with workers=1 everything runs in this process. emitter is one
+    of EMITTERS. If lazy is True, each module is a stub reading its parts
+    from a table, see ldraw.lazy.
 
-def gen_parts(parts: Parts, library_path: str) -> None:
-    """Generate the ldraw.library.parts namespace modules."""
+    manifest maps the paths of the modules generated before, relative to
+    library_path, to the hash of their inputs. Sections whose module
+    exists with the same hash are not written again, and modules that are
+    no longer generated are removed. Returns the manifest of this run.
+    """
+    if emitter not in EMITTERS:
+        raise UnknownEmitterError(emitter)
     print("Generating ldraw.library.parts, this might take a long time...")
-    parts_dir = Path(library_path) / "parts"
+    library = Path(library_path)
+    parts_dir = library / "parts"
     parts_dir.mkdir(parents=True, exist_ok=True)
 
-    recursive_gen_parts(parts.parts, parts_dir)
+    tasks = []
+    inits = {}
+    recursive_gen_parts(parts.parts, parts_dir, tasks, inits, lazy=lazy)
+
+    previous = manifest or {}
+    new_manifest = {}
+
+    def record(path: Path, digest: str) -> bool:
+        # Add a module to the manifest, and return whether to write it.
+        paths = [path]
+        if lazy:
+            # Stubs and tables are not the same modules as without lazy.
+            digest = inputs_hash([LAZY_MARK, digest])
+            paths.append(path.with_suffix(TABLE_SUFFIX))
+        stale = False
+        for p in paths:
+            key = p.relative_to(library).as_posix()
+            new_manifest[key] = digest
+            stale = stale or previous.get(key) != digest or not p.exists()
+        return stale
+
+    changed = []
+    for parts_py, section_parts in tasks:
+        if record(parts_py, section_hash(section_parts)):
+            changed.append((parts_py, section_parts))
+    for parts__init__, sections in inits.items():
+        record(parts__init__, inputs_hash(sections))
+        if lazy:
+            write_if_changed(
+                parts__init__.with_suffix(TABLE_SUFFIX),
+                table_content(
+                    pair
+                    for name, section_parts in sections.items()
+                    if name != ""
+                    for pair in section_names(section_parts)
+                ),
+            )
+
+    remove_stale_modules(library, set(previous) - set(new_manifest))
+    write_sections(changed, workers, emitter, lazy=lazy)
+    return dict(sorted(new_manifest.items()))
 
 
-def recursive_gen_parts(parts_parts: AttriDict, directory: Path):
-    """Recursively generate parts modules for nested part categories."""
+def recursive_gen_parts(
+    parts_parts: AttriDict,
+    directory: Path,
+    tasks=None,
+    inits=None,
+    *,
+    lazy=False,
+):
+    """Recursively generate parts modules for nested part categories.
+
+    If tasks is a list, the (path, section parts) of the section modules
+    are appended to it instead of being written. If inits is a dict, the
+    paths of the __init__ modules are added to it, with their sections.
+    """
     for name, value in list(parts_parts.items()):
         if isinstance(value, AttriDict):
             recurse = False
@@ -35,7 +131,7 @@ def recursive_gen_parts(parts_parts: AttriDict, directory: Path):
             if recurse:
                 subdir = directory / name
                 subdir.mkdir(parents=True, exist_ok=True)
-                recursive_gen_parts(value, subdir)
+                recursive_gen_parts(value, subdir, tasks, inits, lazy=lazy)
 
     sections = {
         name: value
@@ -43,45 +139,159 @@ def recursive_gen_parts(parts_parts: AttriDict, directory: Path):
         if not isinstance(value, AttriDict)
     }
 
-    module_parts = {}
     for section_name, section_parts in sections.items():
         if section_name == "":
             continue
-        for desc, code in section_parts.items():
-            module_parts[desc] = code  # noqa: PERF403
-
         parts_py = directory / f"{section_name}.py"
-        part_str = section_content(section_parts, section_name)
-        parts_py.write_text(part_str)
+        if tasks is None:
+            write_section(parts_py, section_parts, lazy=lazy)
+        else:
+            tasks.append((parts_py, dict(section_parts)))
+
+    parts__init__ = generate_parts__init__(
+        directory=directory,
+        sections=sections,
+        lazy=lazy,
+    )
+    if inits is not None:
+        inits[parts__init__] = sections
+
+
+def inputs_hash(lines) -> str:
+    """Return the MD5 of a collection of lines, in any order."""
+    return hashlib.md5("\n".join(sorted(lines)).encode("utf-8")).hexdigest()
+
+
+def section_hash(section_parts) -> str:
+    """Return the hash of the (description, code) pairs of a section."""
+    return inputs_hash(
+        "%s\t%s" % (description, code) for description, code in section_parts.items()
+    )
 
-    generate_parts__init__(directory=directory, sections=sections)
 
+def remove_stale_modules(library: Path, keys) -> None:
+    """Remove modules no longer generated, their pycs, and empty directories."""
+    for key in sorted(keys, reverse=True):
+        module = library / key
+        module.unlink(missing_ok=True)
+        if module.suffix == ".py":
+            Path(importlib.util.cache_from_source(str(module))).unlink(
+                missing_ok=True,
+            )
+        directory = module.parent
+        while (
+            directory.is_dir()
+            and directory != library
+            and not any(path.suffix == ".py" for path in directory.iterdir())
+        ):
+            # Only bytecode caches are left.
+            shutil.rmtree(directory)
+            directory = directory.parent
 
-def generate_parts__init__(directory, sections):
-    """Generate __init__.py to make submodules in ldraw.library.parts."""
-    parts__init__str = parts__init__content(sections)
+
+def write_section(
+    parts_py: Path,
+    section_parts,
+    emitter: str = "native",
+    *,
+    lazy: bool = False,
+) -> int:
+    """Write the module of a section, and return its number of parts."""
+    if lazy:
+        parts_py.with_suffix(TABLE_SUFFIX).write_bytes(
+            table_content(section_names(section_parts)),
+        )
+        write_if_changed(parts_py, LAZY_SECTION)
+    elif emitter == "native":
+        emit_section(parts_py, section_parts)
+    elif emitter == "mustache":
+        parts_py.write_text(
+            section_content(section_parts),
+            encoding="utf-8",
+        )
+    else:
+        raise UnknownEmitterError(emitter)
+    return len(section_parts)
+
+
+def write_sections(
+    tasks,
+    workers: int | None = None,
+    emitter="native",
+    *,
+    lazy=False,
+) -> None:
+    """Write section modules, in parallel, with one overall progress bar."""
+    workers = workers if workers is not None else os.cpu_count() or 1
+    progress_bar = Bar("parts", max=sum(len(parts) for _, parts in tasks))
+    if workers <= 1 or len(tasks) <= 1:
+        for parts_py, section_parts in tasks:
+            progress_bar.next(
+                write_section(parts_py, section_parts, emitter, lazy=lazy),
+            )
+    else:
+        # The largest sections first, so that they do not finish last.
+        tasks = sorted(tasks, key=lambda task: len(task[1]), reverse=True)
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [
+                pool.submit(write_section, parts_py, section_parts, emitter, lazy=lazy)
+                for parts_py, section_parts in tasks
+            ]
+            for future in as_completed(futures):
+                progress_bar.next(future.result())
+    progress_bar.finish()
+
+
+def section_names(section_parts):
+    """Yield the (class name, code) of the parts of a section, in module order.
+
+    Descriptions are unique, so this is the order of section_content().
+    """
+    for description, code in sorted(section_parts.items()):
+        yield clean(camel(description)), code
+
+
+def emit_section(parts_py: Path, section_parts) -> None:
+    """Write the module of a section without a template.
+
+    The output is the same as section_content(), but the lines are
+    written as they are formatted, through a buffered file.
+    """
+    with parts_py.open("w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(PARTS_HEADER)
+        f.writelines(
+            '%s = "%s"\n' % (class_name, code)
+            for class_name, code in section_names(section_parts)
+        )
+
+
+def generate_parts__init__(directory, sections, *, lazy=False):
+    """Generate __init__.py to make submodules in ldraw.library.parts.
+
+    Returns its path; the file is only written if its content changed.
+    """
+    parts__init__str = parts__init__content(sections, lazy=lazy)
 
     parts__init__ = directory / "__init__.py"
     parts__init__.parent.mkdir(parents=True, exist_ok=True)
-    parts__init__.write_text(parts__init__str)
+    write_if_changed(parts__init__, parts__init__str)
+    return parts__init__
 
 
-def parts__init__content(sections):
+def parts__init__content(sections, *, lazy=False):
     """Generate the content for __init__.py files in parts modules."""
     sections = [
         {"module_name": module_name} for module_name in sections if module_name != ""
     ]
-    return pystache.render(PARTS__INIT__TEMPLATE, context={"sections": sections})
+    template = PARTS_LAZY__INIT__TEMPLATE if lazy else PARTS__INIT__TEMPLATE
+    return pystache.render(template, context={"sections": sections})
 
 
-def section_content(section_parts, section_key):
+def section_content(section_parts):
     """Generate the content for a section of parts."""
-    parts_list = []
-    progress_bar = Bar("section %s ..." % str(section_key), max=len(section_parts))
-    for description in section_parts:
-        parts_list.append(get_part_dict(section_parts, description))
-        progress_bar.next()
-    progress_bar.finish()
+    parts_list = [
+        get_part_dict(section_parts, description) for description in section_parts
+    ]
     parts_list = [x for x in parts_list if x != {}]
     parts_list.sort(key=lambda o: o["description"])
     return pystache.render(PARTS_TEMPLATE, context={"parts": parts_list})
@@ -90,9 +300,14 @@ def section_content(section_parts, section_key):
 PARTS__INIT__TEMPLATE = pystache.parse(
     _get_resource_content(os.path.join("templates", "parts__init__.mustache")),
 )
-PARTS_TEMPLATE = pystache.parse(
-    _get_resource_content(os.path.join("templates", "parts.mustache")),
+PARTS_LAZY__INIT__TEMPLATE = pystache.parse(
+    _get_resource_content(os.path.join("templates", "parts_lazy__init__.mustache")),
 )
+LAZY_SECTION = _get_resource_content(os.path.join("templates", "parts_lazy.mustache"))
+PARTS_MUSTACHE = _get_resource_content(os.path.join("templates", "parts.mustache"))
+PARTS_TEMPLATE = pystache.parse(PARTS_MUSTACHE)
+# The literal text before the parts, written as is by emit_section().
+PARTS_HEADER = PARTS_MUSTACHE[: PARTS_MUSTACHE.index("{{# parts }}")]
 
 
 def get_part_dict(parts_parts, description):
@@ -83,6 +83,8 @@ def _rows_multiplication(r1, r2):
 class Matrix:
     """a transformation matrix."""
 
+    __slots__ = ("rows",)
+
     def __init__(self, rows):
         self.rows = rows
 
@@ -199,6 +201,8 @@ def Identity():  # noqa: N802
 class Vector:
     """a Vector in 3D."""
 
+    __slots__ = ("x", "y", "z")
+
     def __init__(self, x, y, z):
         self.x, self.y, self.z = x, y, z
 
@@ -289,6 +293,8 @@ class Vector:
 class Vector2D:
     """a Vector in 2D."""
 
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y):
         self.x, self.y = x, y
 
@@ -348,6 +354,202 @@ class Vector2D:
         return self.x * other.x + self.y * other.y
 
 
+class Quaternion:
+    """a rotation quaternion.
+
+    Quaternions compose with a single Hamilton product and interpolate
+    smoothly with slerp, which makes them convenient for chaining many
+    rotations before converting back to a Matrix.
+    """
+
+    __slots__ = ("w", "x", "y", "z")
+
+    def __init__(self, w=1.0, x=0.0, y=0.0, z=0.0):
+        self.w, self.x, self.y, self.z = w, x, y, z
+
+    def __repr__(self):
+        return "<Quaternion: (%f, %f, %f, %f)>" % (self.w, self.x, self.y, self.z)
+
+    def __hash__(self):
+        return hash((self.w, self.x, self.y, self.z))
+
+    def __eq__(self, other):
+        if not isinstance(other, Quaternion):
+            return False
+        return (
+            self.w == other.w
+            and self.x == other.x
+            and self.y == other.y
+            and self.z == other.z
+        )
+
+    def __neg__(self):
+        return Quaternion(-self.w, -self.x, -self.y, -self.z)
+
+    def __mul__(self, other):
+        if isinstance(other, Quaternion):
+            w1, x1, y1, z1 = self.w, self.x, self.y, self.z
+            w2, x2, y2, z2 = other.w, other.x, other.y, other.z
+            return Quaternion(
+                w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+                w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+                w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+                w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2,
+            )
+        if isinstance(other, Vector):
+            # v' = v + 2w(q x v) + 2q x (q x v), avoids building the matrix
+            w, x, y, z = self.w, self.x, self.y, self.z
+            tx = 2 * (y * other.z - z * other.y)
+            ty = 2 * (z * other.x - x * other.z)
+            tz = 2 * (x * other.y - y * other.x)
+            return Vector(
+                other.x + w * tx + y * tz - z * ty,
+                other.y + w * ty + z * tx - x * tz,
+                other.z + w * tz + x * ty - y * tx,
+            )
+        raise MatrixError
+
+    @classmethod
+    def from_axis_angle(cls, angle, axis, units=Degrees):
+        """Return the quaternion of a rotation by an angle around an axis.
+
+        The handedness matches Matrix.rotate, so that
+        Quaternion.from_axis_angle(a, axis).to_matrix() equals
+        Identity().rotate(a, axis).
+        """
+        if units == Degrees:
+            angle = angle / 180.0 * math.pi
+        c = math.cos(angle / 2.0)
+        s = math.sin(angle / 2.0)
+        if axis == XAxis:
+            return cls(c, s, 0.0, 0.0)
+        if axis == YAxis:
+            # Matrix.rotate uses the transposed form for the Y axis.
+            return cls(c, 0.0, -s, 0.0)
+        if axis == ZAxis:
+            return cls(c, 0.0, 0.0, s)
+        raise MatrixError
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Return the quaternion of a rotation Matrix.
+
+        The matrix is expected to be a proper rotation (orthonormal, with
+        a determinant of 1); scaling and mirroring are not representable.
+        """
+        r = matrix.rows
+        trace = r[0][0] + r[1][1] + r[2][2]
+        if trace > 0:
+            s = 2.0 * math.sqrt(trace + 1.0)
+            quaternion = cls(
+                0.25 * s,
+                (r[2][1] - r[1][2]) / s,
+                (r[0][2] - r[2][0]) / s,
+                (r[1][0] - r[0][1]) / s,
+            )
+        elif r[0][0] > r[1][1] and r[0][0] > r[2][2]:
+            s = 2.0 * math.sqrt(1.0 + r[0][0] - r[1][1] - r[2][2])
+            quaternion = cls(
+                (r[2][1] - r[1][2]) / s,
+                0.25 * s,
+                (r[0][1] + r[1][0]) / s,
+                (r[0][2] + r[2][0]) / s,
+            )
+        elif r[1][1] > r[2][2]:
+            s = 2.0 * math.sqrt(1.0 + r[1][1] - r[0][0] - r[2][2])
+            quaternion = cls(
+                (r[0][2] - r[2][0]) / s,
+                (r[0][1] + r[1][0]) / s,
+                0.25 * s,
+                (r[1][2] + r[2][1]) / s,
+            )
+        else:
+            s = 2.0 * math.sqrt(1.0 + r[2][2] - r[0][0] - r[1][1])
+            quaternion = cls(
+                (r[1][0] - r[0][1]) / s,
+                (r[0][2] + r[2][0]) / s,
+                (r[1][2] + r[2][1]) / s,
+                0.25 * s,
+            )
+        return quaternion.normalized()
+
+    def rotate(self, angle, axis, units=Degrees):
+        """Rotate the quaternion by an angle around an axis."""
+        return self * Quaternion.from_axis_angle(angle, axis, units)
+
+    def copy(self):
+        """Make a copy of this quaternion."""
+        return Quaternion(self.w, self.x, self.y, self.z)
+
+    def conjugate(self):
+        """Return the conjugate, which is the inverse rotation of a unit quaternion."""
+        return Quaternion(self.w, -self.x, -self.y, -self.z)
+
+    def dot(self, other):
+        """Dot product."""
+        return self.w * other.w + self.x * other.x + self.y * other.y + self.z * other.z
+
+    def __abs__(self):
+        return (self.w**2 + self.x**2 + self.y**2 + self.z**2) ** 0.5
+
+    def normalized(self):
+        """Return a unit quaternion with the same orientation."""
+        _length = abs(self)
+        return Quaternion(
+            self.w / _length,
+            self.x / _length,
+            self.y / _length,
+            self.z / _length,
+        )
+
+    def to_matrix(self):
+        """Return the rotation Matrix of this quaternion."""
+        w, x, y, z = self.w, self.x, self.y, self.z
+        return Matrix(
+            [
+                [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)],
+                [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)],
+                [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)],
+            ],
+        )
+
+    def slerp(self, other, t):
+        """Spherical linear interpolation from this quaternion to another.
+
+        t=0 returns this orientation and t=1 the other one; the shortest
+        path is always taken.
+        """
+        cos_theta = self.dot(other)
+        if cos_theta < 0.0:
+            other = -other
+            cos_theta = -cos_theta
+        if cos_theta > 0.9995:
+            # Nearly parallel, fall back to a normalized linear interpolation.
+            return Quaternion(
+                self.w + t * (other.w - self.w),
+                self.x + t * (other.x - self.x),
+                self.y + t * (other.y - self.y),
+                self.z + t * (other.z - self.z),
+            ).normalized()
+        theta = math.acos(cos_theta)
+        sin_theta = math.sin(theta)
+        a = math.sin((1 - t) * theta) / sin_theta
+        b = math.sin(t * theta) / sin_theta
+        return Quaternion(
+            a * self.w + b * other.w,
+            a * self.x + b * other.x,
+            a * self.y + b * other.y,
+            a * self.z + b * other.z,
+        )
+
+
+def as_matrix(transform):
+    """Return a Matrix for a transform given as a Matrix or a Quaternion."""
+    if isinstance(transform, Quaternion):
+        return transform.to_matrix()
+    return transform
+
+
 class CoordinateSystem:
     """3D coordinate system representation."""
 
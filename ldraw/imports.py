@@ -1,25 +1,194 @@
 """Dynamic import system for LDraw library modules."""
 
+import contextlib
+import importlib
+import importlib.machinery
 import importlib.util
 import logging
+import marshal
 import os
 import sys
+import threading
+import time
+import weakref
 
 from ldraw.config import Config
 from ldraw.errors import CouldNotFindModuleError, CouldNotLoadSpecError
 
 VIRTUAL_MODULE = "ldraw.library"
+# A generated_path with this suffix is an archive made by
+# ldraw.generation.archive.pack_library().
+ARCHIVE_SUFFIX = ".zip"
 
 logger = logging.getLogger("ldraw")
 
 
-def load_lib(library_path, fullname):
+class LibraryArchive:
+    """a generated library packed in a zip archive, and the loader of its modules.
+
+    The names of the entries are indexed once, when the archive is opened,
+    so that modules are found without touching the filesystem. Modules
+    are run from the pycs of the archive when they were compiled by the
+    same version of Python, and compiled from their source otherwise.
+    """
+
+    def __init__(self, path: str):
+        # Only needed for archives, and slow to import.
+        import zipfile  # noqa: PLC0415
+
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._lock = threading.Lock()
+        names = set(self._zip.namelist())
+        self.modules = {}
+        for name in names:
+            if not name.endswith(".py"):
+                continue
+            dotted = name.removesuffix(".py").replace("/", ".")
+            if dotted.endswith(".__init__"):
+                self.modules["ldraw." + dotted.removesuffix(".__init__")] = (name, True)
+            else:
+                self.modules["ldraw." + dotted] = (name, False)
+
+    def __repr__(self):
+        return "<LibraryArchive: %s, %i modules>" % (self.path, len(self.modules))
+
+    def _read(self, name: str) -> bytes:
+        # ZipFile is not safe to read from several threads at once.
+        with self._lock:
+            return self._zip.read(name)
+
+    def close(self) -> None:
+        """Close the archive file."""
+        with self._lock:
+            self._zip.close()
+
+    def get_data(self, path: str) -> bytes:
+        """Return the content of a file of the archive, as for a loader."""
+        name = os.path.relpath(path, self.path).replace(os.sep, "/")
+        try:
+            return self._read(name)
+        except KeyError:
+            raise FileNotFoundError(path) from None
+
+    def spec(self, fullname: str) -> importlib.machinery.ModuleSpec:
+        """Return the spec of a module of the archive."""
+        try:
+            name, is_package = self.modules[fullname]
+        except KeyError:
+            raise CouldNotFindModuleError(
+                fullname,
+                "%s/__init__.py" % fullname,
+                "%s.py" % fullname,
+            ) from None
+        spec = importlib.machinery.ModuleSpec(
+            fullname,
+            self,
+            origin=os.path.join(self.path, name),
+            is_package=is_package,
+        )
+        spec.has_location = True
+        if is_package:
+            spec.submodule_search_locations = [os.path.dirname(spec.origin)]  # noqa: PTH120
+        return spec
+
+    def get_code(self, fullname: str):
+        """Return the code object of a module of the archive."""
+        name, _ = self.modules[fullname]
+        try:
+            pyc = self._read(name + "c")
+        except KeyError:
+            pyc = b""
+        if pyc[:4] == importlib.util.MAGIC_NUMBER:
+            # The pyc was written with the archive, by pack_library().
+            return marshal.loads(pyc[16:])  # noqa: S302
+        return compile(self._read(name), os.path.join(self.path, name), "exec")
+
+    def create_module(self, spec):  # noqa: ARG002
+        """Use the default module creation."""
+        return
+
+    def exec_module(self, module) -> None:
+        """Run a module of the archive."""
+        _run_module(self._exec, module)
+
+    def _exec(self, module) -> None:
+        exec(self.get_code(module.__name__), module.__dict__)  # noqa: S102
+
+
+_archives = {}
+_archives_lock = threading.Lock()
+
+
+def open_archive(path: str) -> LibraryArchive:
+    """Return the LibraryArchive of a path, opened once per process."""
+    with _archives_lock:
+        archive = _archives.get(path)
+        if archive is None:
+            archive = _archives[path] = LibraryArchive(path)
+        return archive
+
+
+def close_archives() -> None:
+    """Close the archives opened, so that they are read again when used."""
+    with _archives_lock:
+        for archive in _archives.values():
+            archive.close()
+        _archives.clear()
+
+
+def scan_library(library_path) -> dict:
+    """Return the paths of the modules of a generated library, by full name."""
+    paths = {}
+    root = os.path.join(library_path, "library")
+    for directory, directories, files in os.walk(root):
+        if "__pycache__" in directories:
+            directories.remove("__pycache__")
+        package = os.path.relpath(directory, library_path).replace(os.sep, ".")
+        for name in files:
+            if name == "__init__.py":
+                paths["ldraw." + package] = os.path.join(directory, name)
+            elif name.endswith(".py"):
+                paths["ldraw.%s.%s" % (package, name[:-3])] = os.path.join(
+                    directory,
+                    name,
+                )
+    return paths
+
+
+def library_spec(library_path, fullname, module_path=None):
+    """Return the spec of a module of a generated library.
+
+    library_path and module_path are as for load_lib().
+    """
+    if str(library_path).endswith(ARCHIVE_SUFFIX):
+        return open_archive(str(library_path)).spec(fullname)
+    if module_path is None:
+        module_path = _find_module(library_path, fullname)
+
+    spec = importlib.util.spec_from_file_location(
+        fullname,
+        module_path,
+        loader=LibraryFileLoader(fullname, module_path),
+    )
+    if spec is None or spec.loader is None:
+        raise CouldNotLoadSpecError(fullname)
+    return spec
+
+
+def load_lib(library_path, fullname, module_path=None):
     """Load a dynamically generated LDraw library module.
 
+    A module already in sys.modules is returned as is; a module is loaded
+    by one thread at a time, the others waiting for it.
+
     Args:
-        library_path (str): The root directory of the generated LDraw library.
+        library_path (str): The root directory of the generated LDraw library,
+            or an archive of it, ending with ARCHIVE_SUFFIX.
         fullname (str): The full dotted module name to load
             (e.g., 'ldraw.library.parts.brick_2x4').
+        module_path (str, optional): The file of the module, if known, as
+            found by scan_library().
 
     Returns:
         module: The loaded Python module object.
@@ -30,6 +199,14 @@ def load_lib(library_path, fullname):
         Exception: If execution of the module fails.
 
     """
+    with _module_lock(fullname):
+        module = sys.modules.get(fullname)
+        if module is not None:
+            return module
+        return _exec_spec(fullname, library_spec(library_path, fullname, module_path))
+
+
+def _find_module(library_path, fullname):
     dot_split = fullname.split(".")
     dot_split.pop(0)  # Remove 'ldraw'
 
@@ -46,15 +223,27 @@ def load_lib(library_path, fullname):
     py_path = os.path.join(lib_dir, f"{lib_name}.py")
 
     if os.path.exists(init_path):
-        module_path = init_path
-    elif os.path.exists(py_path):
-        module_path = py_path
-    else:
-        raise CouldNotFindModuleError(fullname, init_path, py_path)
+        return init_path
+    if os.path.exists(py_path):
+        return py_path
+    raise CouldNotFindModuleError(fullname, init_path, py_path)
 
-    spec = importlib.util.spec_from_file_location(fullname, module_path)
-    if spec is None or spec.loader is None:
-        raise CouldNotLoadSpecError(fullname)
+
+# The locks of the modules being loaded by load_lib(), dropped when unused.
+_module_locks = weakref.WeakValueDictionary()
+_module_locks_lock = threading.Lock()
+
+
+def _module_lock(fullname):
+    with _module_locks_lock:
+        lock = _module_locks.get(fullname)
+        if lock is None:
+            # Reentrant, for a package loading its own modules.
+            lock = _module_locks[fullname] = threading.RLock()
+        return lock
+
+
+def _exec_spec(fullname, spec):
     library_module = importlib.util.module_from_spec(spec)
 
     # Add to sys.modules BEFORE executing to prevent infinite recursion
@@ -63,15 +252,103 @@ def load_lib(library_path, fullname):
         spec.loader.exec_module(library_module)
     except Exception:
         # If execution fails, remove from sys.modules
-        if fullname in sys.modules:
-            del sys.modules[fullname]
+        sys.modules.pop(fullname, None)
         raise
 
     return library_module
 
 
+class _ModuleGate:
+    """lets library modules run in many threads, but not during clean().
+
+    A thread running a module, which may import others, never waits for
+    itself.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._running = 0
+
+    @contextlib.contextmanager
+    def running(self):
+        depth = getattr(self._local, "depth", 0)
+        with self._condition:
+            self._running += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            with self._condition:
+                self._running -= 1
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def cleaning(self):
+        depth = getattr(self._local, "depth", 0)
+        with self._condition:
+            self._condition.wait_for(lambda: self._running == depth)
+            yield
+
+
+_gate = _ModuleGate()
+
+
+def _run_module(run, module) -> None:
+    start = time.perf_counter()
+    with _gate.running():
+        try:
+            run(module)
+        finally:
+            LibraryImporter.stats.count(time.perf_counter() - start)
+
+
+class LibraryFileLoader(importlib.machinery.SourceFileLoader):
+    """the loader of the modules of a generated library, from their files."""
+
+    def exec_module(self, module) -> None:
+        """Run a module, as SourceFileLoader does."""
+        _run_module(super().exec_module, module)
+
+
+class ImportStats:
+    """counters of the work done by LibraryImporter."""
+
+    def __init__(self):
+        self.config_loads = 0
+        self.library_scans = 0
+        self.modules = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<ImportStats: %i modules in %.3fs, %i config loads, %i scans>" % (
+            self.modules,
+            self.seconds,
+            self.config_loads,
+            self.library_scans,
+        )
+
+    def count(self, seconds: float) -> None:
+        """Count a module run, in any thread."""
+        with self._lock:
+            self.modules += 1
+            self.seconds += seconds
+
+
 class LibraryImporter:
-    """Added to sys.meta_path as an import hook."""
+    """Added to sys.meta_path as an import hook.
+
+    The configuration, when not set, is loaded once, and the generated
+    library is scanned once for the paths of its modules, until clean()
+    is called. stats counts this work, and the time spent loading modules.
+
+    Modules are found with specs whose loaders run them in exec_module(),
+    so that the import system locks each module, and threads import
+    different modules in parallel. clean() waits for the modules being
+    run in other threads.
+    """
 
     @classmethod
     def valid_module(cls, fullname):
@@ -83,39 +360,41 @@ class LibraryImporter:
         return False
 
     config = None
+    stats = ImportStats()
+    _loaded_config = None
+    _paths = None
+    # Guards the configuration and the paths; taken after _gate.cleaning().
+    _lock = threading.RLock()
 
     @classmethod
     def set_config(cls, config):
         """Set the configuration for the library importer and clean cached modules."""
-        cls.config = config
-        cls.clean()
+        with _gate.cleaning(), cls._lock:
+            cls.config = config
+            cls._clean()
 
     @classmethod
-    def find_module(cls, fullname, path=None):  # noqa: ARG003
-        """Find module for the given fullname.
-
-        This method is called by Python if this class
-        is on sys.path. fullname is the fully-qualified
-        name of the module to look for, and path is either
-        __path__ (for submodules and subpackages) or None (for
-        a top-level module/package).
-
-        Called every time an import
-        statement is detected (or __import__ is called), before
-        Python's built-in package/module-finding code kicks in.
-        """
-        if cls.valid_module(fullname):
-            # As per PEP #302 (which implemented the sys.meta_path protocol),
-            # if fullname is the name of a module/package that we want to
-            # report as found, then we need to return a loader object.
-            # In this simple example, that will just be self.
+    def get_config(cls) -> Config:
+        """Return the configuration set, or the one loaded from config.yml."""
+        with cls._lock:
+            if cls.config is not None:
+                return cls.config
+            if cls._loaded_config is None:
+                cls._loaded_config = Config.load()
+                cls.stats.config_loads += 1
+            return cls._loaded_config
 
-            return cls()
-
-        # If we don't provide the requested module, return None, as per
-        # PEP #302.
-
-        return None
+    @classmethod
+    def module_path(cls, fullname) -> str | None:
+        """Return the file of a module of the generated library, if known."""
+        with cls._lock:
+            config = cls.get_config()
+            if config.in_memory or config.generated_path.endswith(ARCHIVE_SUFFIX):
+                return None
+            if cls._paths is None:
+                cls._paths = scan_library(config.generated_path)
+                cls.stats.library_scans += 1
+            return cls._paths.get(fullname)
 
     @classmethod
     def find_spec(cls, fullname, path, target=None):  # noqa: ARG003
@@ -123,44 +402,63 @@ class LibraryImporter:
 
         PEP 451: find_spec should return a ModuleSpec if the module can be handled.
         """
-        if cls.valid_module(fullname):
-            # Use importlib.util.spec_from_loader for compatibility
-            return importlib.util.spec_from_loader(fullname, cls())
-        return None
+        if not cls.valid_module(fullname):
+            return None
+        config = cls.get_config()
+        if config.in_memory:
+            from ldraw.memory import memory_library  # noqa: PLC0415
+
+            # The fingerprint is checked again when the library is imported.
+            library = memory_library(config, refresh=fullname == VIRTUAL_MODULE)
+            spec = importlib.machinery.ModuleSpec(
+                fullname,
+                cls(),
+                origin="<memory>",
+                is_package=library.is_package(fullname),
+            )
+            spec.loader_state = library
+            return spec
+        logger.debug("finding %s in %s", fullname, config.generated_path)
+        return library_spec(
+            config.generated_path,
+            fullname,
+            cls.module_path(fullname),
+        )
 
     @classmethod
     def clean(cls):
-        """Clean cached library modules from sys.modules."""
-        for fullname in list(sys.modules.keys()):
+        """Clean cached library modules from sys.modules, and close archives.
+
+        Modules being run in other threads are waited for.
+        """
+        with _gate.cleaning(), cls._lock:
+            cls._clean()
+
+    @classmethod
+    def _clean(cls):
+        for fullname in list(sys.modules):
             if cls.valid_module(fullname):
-                del sys.modules[fullname]
-        if "ldraw" in sys.modules:
-            ldraw_mod = sys.modules["ldraw"]
-            if hasattr(ldraw_mod, "library"):
-                delattr(ldraw_mod, "library")
-
-    def get_code(self, fullname):  # noqa: ARG002
-        """Get the code object for a module (not used in this implementation)."""
+                sys.modules.pop(fullname, None)
+        ldraw_mod = sys.modules.get("ldraw")
+        if ldraw_mod is not None and hasattr(ldraw_mod, "library"):
+            delattr(ldraw_mod, "library")
+        close_archives()
+        cls._loaded_config = None
+        cls._paths = None
+
+    def create_module(self, spec):  # noqa: ARG002
+        """Use the default module creation."""
         return
 
-    def load_module(self, fullname):
-        """Load module if CustomImporter.find_module does not return None.
-
-        fullname is the fully-qualified name of the module/package that was requested.
-        """
-        if not self.valid_module(fullname):
-            # Raise ImportError as per PEP #302 if the requested module/package
-            # couldn't be loaded. This should never be reached in this
-            # simple example, but it's included here for completeness. :)
-            raise ImportError(fullname)
-
-        # Check if module is already loaded to prevent infinite recursion
-        if fullname in sys.modules:
-            return sys.modules[fullname]
-
-        # if the library already exists and correctly generated,
-        # the __hash__ will prevent re-generation
-        config = self.config if self.config is not None else Config.load()
-        logger.debug("loading %s from %s", fullname, config.generated_path)
-        # Module is already added to sys.modules in load_lib
-        return load_lib(config.generated_path, fullname)
+    def exec_module(self, module) -> None:
+        """Build a module of the library in memory, for Config(in_memory=True)."""
+        _run_module(self._build, module)
+
+    @staticmethod
+    def _build(module) -> None:
+        library = module.__spec__.loader_state
+        logger.debug("building %s in memory", module.__name__)
+        module.__dict__.update(library.attributes(module.__name__))
+        for name in library.sections(module.__name__):
+            section = importlib.import_module("%s.%s" % (module.__name__, name))
+            setattr(module, name, section)
@@ -0,0 +1,176 @@
+"""Bills of materials for LDraw models.
+
+An inventory counts the parts of a model by part code and colour. Files
+are read line by line and only counts are kept, one per distinct part,
+colour and submodel, so memory use does not depend on the size of the
+model. Submodels of MPD files, and LDR files referenced next to the
+model, are counted once and multiplied by the number of times they are
+used; pieces in colour 16 take the colour of the reference.
+"""
+
+from collections import Counter
+from pathlib import Path
+
+from ldraw.errors import SubmodelCycleError
+from ldraw.loader import read_lines, split_mpd, sub_file_tokens
+
+MAIN_COLOUR = 16
+SUBMODEL_EXTENSIONS = (".LDR", ".MPD")
+LINE_FORMAT = "%-39s %d"
+
+
+def _part_code(name: str) -> str:
+    return name.upper().removesuffix(".DAT")
+
+
+def _colour_code(token: str) -> int | str:
+    try:
+        return int(token)
+    except ValueError:
+        # Direct colours, 0x2RRGGBB, are counted by their text.
+        return token
+
+
+class _Submodel:
+    """Counts of the parts and submodel references of one file or section."""
+
+    def __init__(self):
+        self.parts = Counter()
+        self.references = Counter()
+
+    def read(self, lines, name, start=1):
+        for tokens in sub_file_tokens(lines, name, start):
+            key = (_part_code(tokens[14]), _colour_code(tokens[1]))
+            if key[0].endswith(SUBMODEL_EXTENSIONS):
+                self.references[key] += 1
+            else:
+                self.parts[key] += 1
+        return self
+
+
+class Inventory:
+    """the parts of a model, counted by (part code, colour code).
+
+    descriptions optionally maps part codes to descriptions, such as
+    Parts.by_code; parts without a description are listed by code.
+    """
+
+    def __init__(self, counts=None, descriptions=None):
+        self.counts = Counter(counts) if counts is not None else Counter()
+        self.descriptions = {
+            code.upper(): " ".join(description.split())
+            for code, description in (descriptions or {}).items()
+        }
+
+    def __repr__(self):
+        return "<Inventory: %i pieces, %i kinds>" % (len(self), len(self.counts))
+
+    def __len__(self):
+        return sum(self.counts.values())
+
+    def description(self, code: str) -> str:
+        """Return the description of a part code, or the code itself."""
+        return self.descriptions.get(code.upper(), code)
+
+    def by_description(self) -> dict[str, int]:
+        """Return the counts by description, in all colours, sorted."""
+        totals = Counter()
+        for (code, _), count in self.counts.items():
+            totals[self.description(code)] += count
+        return dict(sorted(totals.items()))
+
+    def lines(self) -> list[str]:
+        """Return the inventory as text lines, one per description."""
+        return [
+            LINE_FORMAT % (description, count)
+            for description, count in self.by_description().items()
+        ]
+
+    def write(self, file) -> None:
+        """Write the inventory to a path or an open text file."""
+        text = "".join(line + "\n" for line in self.lines())
+        if isinstance(file, (str, Path)):
+            Path(file).write_text(text, encoding="utf-8")
+        else:
+            file.write(text)
+
+
+def _read_submodels(file):
+    """Return the main model name and the counts of each submodel.
+
+    The main model is the first 0 FILE section, or None for an LDR file.
+    """
+    submodels = {}
+    for name, start, lines in split_mpd(read_lines(file)):
+        key = name.upper() if name is not None else None
+        submodels[key] = _Submodel().read(lines, "%s in %s" % (name, file), start)
+    named = [name for name in submodels if name is not None]
+    return (named[0] if named else None), submodels
+
+
+class _Totals:
+    """the counts of the submodels of a model, including those they reference.
+
+    files maps the upper case names of the LDR and MPD files next to the
+    model to their paths; they are read when first referenced.
+    """
+
+    def __init__(self, submodels, files):
+        self.submodels = submodels
+        self.files = files
+        self.totals = {}
+        self.visiting = set()
+
+    def resolve(self, name):
+        """Return the _Submodel of a name, or None if it is a part."""
+        if name not in self.submodels and name in self.files:
+            file_main, file_submodels = _read_submodels(self.files.pop(name))
+            self.submodels[name] = file_submodels[file_main]
+            for other, submodel in file_submodels.items():
+                self.submodels.setdefault(other, submodel)
+        return self.submodels.get(name)
+
+    def total(self, name) -> Counter:
+        """Return the counts of a submodel, with colour 16 left unresolved."""
+        if name in self.totals:
+            return self.totals[name]
+        if name in self.visiting:
+            raise SubmodelCycleError(name)
+        self.visiting.add(name)
+        submodel = self.submodels[name]
+        counts = Counter(submodel.parts)
+        for (reference, colour), uses in submodel.references.items():
+            if self.resolve(reference) is None:
+                counts[(reference, colour)] += uses
+                continue
+            for (code, code_colour), count in self.total(reference).items():
+                resolved = colour if code_colour == MAIN_COLOUR else code_colour
+                counts[(code, resolved)] += uses * count
+        self.visiting.discard(name)
+        self.totals[name] = counts
+        return counts
+
+
+def _model_files(file) -> dict:
+    """Map the upper case names of the LDR and MPD files next to a model to paths."""
+    if not isinstance(file, (str, Path)):
+        return {}
+    return {
+        path.name.upper(): path
+        for path in Path(file).parent.iterdir()
+        if path.suffix.upper() in SUBMODEL_EXTENSIONS
+    }
+
+
+def build_inventory(file, descriptions=None) -> Inventory:
+    """Count the parts of an LDR or MPD file.
+
+    file is a path or an open text file. References to submodels are
+    followed, as are references to LDR or MPD files in the directory of
+    the model when file is a path; other references are counted as parts.
+    """
+    main, submodels = _read_submodels(file)
+    if main not in submodels:
+        return Inventory(descriptions=descriptions)
+    totals = _Totals(submodels, _model_files(file))
+    return Inventory(totals.total(main), descriptions)
@@ -0,0 +1,139 @@
+"""Lazy modules of a generated ldraw.library.parts namespace.
+
+When the library is generated with lazy=True, each section of parts is a
+small stub module next to a table of its "Name<TAB>code" lines, sorted by
+name. The stubs use a module level __getattr__ (PEP 562) that looks names
+up in the table, mapped in memory and searched in place, so importing one
+part neither compiles nor executes the thousands of assignments of its
+section, and only the pages of the table that are read are loaded.
+"""
+
+import importlib
+import importlib.machinery
+import mmap
+import sys
+from pathlib import Path
+
+TABLE_SUFFIX = ".tbl"
+FILE_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+)
+
+
+class PartTable:
+    """a sorted table of part names and codes, read on demand.
+
+    A table that is not a file, such as one in a library archive, is read
+    whole with the get_data() of the loader given.
+    """
+
+    def __init__(self, path, loader=None):
+        self.path = Path(path)
+        self.loader = loader
+        self._data = None
+
+    def __repr__(self):
+        return "<PartTable: %s>" % self.path
+
+    def _map(self):
+        if self._data is None and self.loader is not None:
+            self._data = self.loader.get_data(str(self.path))
+        elif self._data is None:
+            with self.path.open("rb") as f:
+                try:
+                    self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:
+                    # An empty file cannot be mapped.
+                    self._data = b""
+        return self._data
+
+    def get(self, name: str) -> str | None:
+        """Return the code of a part name, or None."""
+        data = self._map()
+        key = name.encode("utf-8") + b"\t"
+        # lo and hi are always at the start of a line.
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b"\n", lo, mid) + 1 or lo
+            end = data.find(b"\n", start) + 1
+            line = data[start:end]
+            if line.startswith(key):
+                return line[len(key) : -1].decode("utf-8")
+            if line < key:
+                lo = end
+            else:
+                hi = start
+        return None
+
+    def names(self) -> list[str]:
+        """Return all the part names, sorted."""
+        return [
+            line.split(b"\t", 1)[0].decode("utf-8")
+            for line in bytes(self._map()).splitlines()
+        ]
+
+
+def table_content(names) -> bytes:
+    """Return a table of (name, code) pairs, the last code of a name winning."""
+    lines = {name: "%s\t%s\n" % (name, code) for name, code in names}
+    return b"".join(sorted(line.encode("utf-8") for line in lines.values()))
+
+
+def _table(module_name, file):
+    loader = getattr(sys.modules.get(module_name), "__loader__", None)
+    if isinstance(loader, FILE_LOADERS):
+        # Modules in files have their tables next to them.
+        loader = None
+    return PartTable(Path(file).with_suffix(TABLE_SUFFIX), loader)
+
+
+def _no_attribute(module_name, name):
+    return AttributeError("module %r has no attribute %r" % (module_name, name))
+
+
+def section_attributes(module_name: str, file: str):
+    """Return the __getattr__ and __dir__ of a lazy section module."""
+    table = _table(module_name, file)
+
+    def __getattr__(name):  # noqa: N807
+        if name == "__all__":
+            value = table.names()
+        else:
+            value = table.get(name)
+            if value is None:
+                raise _no_attribute(module_name, name)
+        # Later lookups do not need the table.
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__():  # noqa: N807
+        return sorted(set(vars(sys.modules[module_name])) | set(table.names()))
+
+    return __getattr__, __dir__
+
+
+def package_attributes(module_name: str, file: str, sections: list[str]):
+    """Return the __getattr__ and __dir__ of a lazy package of sections.
+
+    Like the modules written without lazy=True, the package has the parts
+    of all its sections, and the sections themselves, as attributes.
+    """
+    table = _table(module_name, file)
+
+    def __getattr__(name):  # noqa: N807
+        if name in sections:
+            return importlib.import_module("%s.%s" % (module_name, name))
+        value = table.get(name)
+        if value is None:
+            raise _no_attribute(module_name, name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__():  # noqa: N807
+        return sorted(
+            set(vars(sys.modules[module_name])) | set(sections) | set(table.names()),
+        )
+
+    return __getattr__, __dir__
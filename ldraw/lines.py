@@ -1,74 +1,85 @@
 # pylint: disable=too-few-public-methods, too-many-arguments
 
-"""classes for lines in parts path."""
+"""classes for lines in parts path.
 
+Lines are immutable, slotted dataclasses: a parsed part holds many of
+them, and slots avoid a __dict__ per line.
+"""
 
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True, eq=False)
 class OptionalLine:
     """an optional Line."""
 
-    def __init__(self, colour, point1, point2, point3, point4):
-        self.colour = colour
-        self.point1 = point1
-        self.point2 = point2
-        self.point3 = point3
-        self.point4 = point4
+    colour: object
+    point1: object
+    point2: object
+    point3: object
+    point4: object
+
+    @property
+    def points(self):
+        """Returns the points tuple."""
+        return (self.point1, self.point2, self.point3, self.point4)
 
 
+@dataclass(frozen=True, slots=True, eq=False)
 class Quadrilateral:
     """a quadrilateral."""
 
-    def __init__(self, colour, point1, point2, point3, point4):
-        self.colour = colour
-        self.point1 = point1
-        self.point2 = point2
-        self.point3 = point3
-        self.point4 = point4
+    colour: object
+    point1: object
+    point2: object
+    point3: object
+    point4: object
 
     @property
     def points(self):
-        """Returns the points array."""
-        return [self.point1, self.point2, self.point3, self.point4]
+        """Returns the points tuple."""
+        return (self.point1, self.point2, self.point3, self.point4)
 
 
+@dataclass(frozen=True, slots=True, eq=False)
 class Line:
     """a 3D line."""
 
-    def __init__(self, colour, point1, point2):
-        self.colour = colour
-        self.point1 = point1
-        self.point2 = point2
+    colour: object
+    point1: object
+    point2: object
 
     @property
     def points(self):
-        """Returns the points array."""
-        return [self.point1, self.point2]
+        """Returns the points tuple."""
+        return (self.point1, self.point2)
 
 
+@dataclass(frozen=True, slots=True, eq=False)
 class Triangle:
     """a triangle."""
 
-    def __init__(self, colour, point1, point2, point3):
-        self.colour = colour
-        self.point1 = point1
-        self.point2 = point2
-        self.point3 = point3
+    colour: object
+    point1: object
+    point2: object
+    point3: object
 
     @property
     def points(self):
-        """Returns the points array."""
-        return [self.point1, self.point2, self.point3]
+        """Returns the points tuple."""
+        return (self.point1, self.point2, self.point3)
 
 
+@dataclass(frozen=True, slots=True, eq=False)
 class MetaCommand:
     """a metacommand."""
 
-    def __init__(self, type, text):  # noqa: A002
-        self.type = type
-        self.text = text
+    type: str
+    text: str
 
 
+@dataclass(frozen=True, slots=True, eq=False)
 class Comment:
     """a comment."""
 
-    def __init__(self, text):
-        self.text = text
+    text: str
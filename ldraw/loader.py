@@ -0,0 +1,228 @@
+"""Fast loading of LDraw models into Pieces, Groups and PieceArrays.
+
+Only type 1 lines are loaded; comments, meta commands and drawing
+primitives are skipped. Part names are interned, colours are shared
+between the pieces that use the same ones, and matrix values are parsed
+once per distinct text, so that loading a model written by ldraw.writer
+and writing it again gives the same file.
+"""
+
+import sys
+from itertools import chain
+from pathlib import Path
+
+from ldraw.colour import Colour, direct_colour
+from ldraw.errors import InvalidLineDataError, PartError
+from ldraw.geometry import Matrix, Vector
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+
+
+def read_lines(file):
+    """Yield the lines of a path or an open text file."""
+    if isinstance(file, (str, Path)):
+        with Path(file).open("r", encoding="utf-8") as f:
+            yield from f
+    else:
+        yield from file
+
+
+def _part_name(token: str) -> str:
+    return sys.intern(token.upper().removesuffix(".DAT"))
+
+
+class _Reader:
+    """Turns the tokens of type 1 lines into shared, interned values."""
+
+    def __init__(self, colours=None):
+        self.colours = colours if colours is not None else {}
+        self._colour_objects = {}
+        self._values = {}
+        self._parts = {}
+
+    def colour(self, token: str) -> Colour:
+        try:
+            return self._colour_objects[token]
+        except KeyError:
+            pass
+        try:
+            code = int(token)
+        except ValueError:
+            colour = direct_colour(token)
+        else:
+            colour = self.colours.get(code) or Colour(code)
+        self._colour_objects[token] = colour
+        return colour
+
+    # Matrix values are cached by their text rather than their values,
+    # since 0.0 == -0.0 but they are written differently. Each piece gets
+    # a Matrix of its own, since Matrices can be changed in place.
+    def matrix_values(self, tokens: list) -> tuple:
+        key = tuple(tokens)
+        try:
+            return self._values[key]
+        except KeyError:
+            values = self._values[key] = tuple(map(float, tokens))
+            return values
+
+    def matrix(self, tokens: list) -> Matrix:
+        values = self.matrix_values(tokens)
+        return Matrix([list(values[0:3]), list(values[3:6]), list(values[6:9])])
+
+    def part(self, token: str) -> str:
+        try:
+            return self._parts[token]
+        except KeyError:
+            part = self._parts[token] = _part_name(token)
+            return part
+
+
+def sub_file_tokens(lines, name, start=1):
+    """Yield the tokens of the type 1 lines, those referencing sub-files.
+
+    Each is a list of 15 tokens, from "1" to the file name. name and start,
+    the number of the first line in the file, are used in the PartError
+    raised for a line with another number of tokens.
+    """
+    for number, line in enumerate(lines, start):
+        tokens = line.split()
+        if not tokens or tokens[0] != "1":
+            continue
+        if len(tokens) != 15:
+            error = InvalidLineDataError("subfile", 14, tokens[1:])
+            raise PartError(
+                error.message + " in %s at line %i" % (name, number),
+            ) from error
+        yield tokens
+
+
+def _load_group(sub_files, reader: _Reader) -> Group:
+    group = Group()
+    pieces = group.pieces
+    for tokens in sub_files:
+        part = reader.part(tokens[14])
+        piece = Piece(
+            reader.colour(tokens[1]),
+            Vector(float(tokens[2]), float(tokens[3]), float(tokens[4])),
+            reader.matrix(tokens[5:14]),
+            part,
+        )
+        # Keep the interned name rather than the copy made by Piece.
+        piece.part = part
+        piece.group = group
+        pieces.append(piece)
+    return group
+
+
+def _load_array(sub_files, reader: _Reader) -> PieceArray:
+    scene = PieceArray()
+    positions, matrices = scene.positions, scene.matrices
+    colours, parts = scene.colours, scene.parts
+    codes = {}
+    indices = {}
+    for tokens in sub_files:
+        token = tokens[1]
+        try:
+            code = codes[token]
+        except KeyError:
+            code = codes[token] = scene.register_colour(reader.colour(token))
+        token = tokens[14]
+        try:
+            index = indices[token]
+        except KeyError:
+            index = indices[token] = scene.intern_part(reader.part(token))
+        colours.append(code)
+        parts.append(index)
+        positions.extend((float(tokens[2]), float(tokens[3]), float(tokens[4])))
+        matrices.extend(reader.matrix_values(tokens[5:14]))
+    return scene
+
+
+def _load(sub_files, reader: _Reader, *, columnar: bool) -> Group | PieceArray:
+    if columnar:
+        return _load_array(sub_files, reader)
+    return _load_group(sub_files, reader)
+
+
+def load_ldr(file, colours=None, *, columnar=False) -> Group | PieceArray:
+    """Load the pieces of an LDR file.
+
+    file is a path or an open text file. colours optionally maps colour
+    codes to Colours, such as Parts.colours_by_code; other codes get a
+    Colour with only a code. Returns a Group of Pieces, or a PieceArray
+    if columnar is True.
+    """
+    return _load(
+        sub_file_tokens(read_lines(file), file),
+        _Reader(colours),
+        columnar=columnar,
+    )
+
+
+def _section(numbered, following):
+    """Yield the lines of a section, up to the next 0 FILE or 0 NOFILE line.
+
+    The name and first line number of the next section are appended to
+    following.
+    """
+    for number, line in numbered:
+        tokens = line.split(None, 2)
+        if tokens[:2] == ["0", "FILE"] and len(tokens) == 3:
+            following.append((tokens[2].strip(), number + 1))
+            return
+        if tokens[:2] == ["0", "NOFILE"]:
+            following.append((None, number + 1))
+            return
+        yield line
+
+
+def split_mpd(lines):
+    """Yield the name, first line number and lines of each submodel of an MPD file.
+
+    Lines are numbered from 1; a section without a 0 FILE line, such as
+    a whole LDR file, has None as its name. The lines of a section are
+    read as they are iterated, so as with itertools.groupby(), a section
+    must be used before the next one is yielded; the lines not used are
+    skipped.
+    """
+    numbered = enumerate(lines, 1)
+    following = [(None, 1)]
+    while following:
+        name, start = following.pop()
+        section = _section(numbered, following)
+        if name is None:
+            # Skip the empty sections before 0 FILE lines and at the end.
+            first = next(section, None)
+            if first is None:
+                continue
+            section = chain((first,), section)
+        yield name, start, section
+        for _ in section:
+            pass
+
+
+def load_mpd(
+    file,
+    colours=None,
+    *,
+    columnar=False,
+) -> dict[str, Group | PieceArray]:
+    """Load the submodels of an MPD file.
+
+    Returns a dict mapping the upper case names of the submodels, in file
+    order starting with the main model, to a Group or a PieceArray as for
+    load_ldr(). Pieces referencing a submodel keep its name, with its
+    extension, as their part. Colours, matrices and part names are shared
+    by all the submodels.
+    """
+    reader = _Reader(colours)
+    models = {}
+    for name, start, lines in split_mpd(read_lines(file)):
+        if name is None:
+            continue
+        models[name.upper()] = _load(
+            sub_file_tokens(lines, "%s in %s" % (name, file), start),
+            reader,
+            columnar=columnar,
+        )
+    return models
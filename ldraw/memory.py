@@ -0,0 +1,169 @@
+"""Building the ldraw.library modules in memory, without generated files.
+
+With Config(in_memory=True), LibraryImporter builds ldraw.library.colours
+and the ldraw.library.parts modules from an index of the LDraw library
+instead of importing generated source files. The index only holds names
+and codes; it is made from a Parts catalog the first time, then pickled
+in the cache directory under the fingerprint of parts.lst, so that later
+processes do not have to parse the parts again. Nothing is written when
+the cache directory is not writable.
+
+The modules have the same attributes as the generated ones: the colours
+and their ColoursByCode and ColoursByName dicts, each section with its
+parts, and each package with its __all__ sections and their parts.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+from pathlib import Path
+
+from attridict import AttriDict
+
+from ldraw.colour import Colour
+from ldraw.dirs import get_cache_dir
+from ldraw.errors import CouldNotFindModuleError
+from ldraw.generation.parts import section_names
+from ldraw.parts import Parts
+from ldraw.utils import camel, clean
+
+ROOT_MODULE = "ldraw.library"
+# Changed when the content of the index changes, to ignore older pickles.
+INDEX_VERSION = 1
+
+
+def library_fingerprint(ldraw_library_path) -> str:
+    """Return the MD5 of the parts.lst of an LDraw library, as generate() does."""
+    parts_lst = Path(ldraw_library_path) / "ldraw" / "parts.lst"
+    return hashlib.md5(parts_lst.read_bytes()).hexdigest()
+
+
+def _index_packages(parts_parts: AttriDict, package: str, index: dict) -> None:
+    # The same modules as ldraw.generation.parts.recursive_gen_parts().
+    sections = []
+    for name, value in parts_parts.items():
+        if isinstance(value, AttriDict):
+            if any(len(v) > 0 for v in value.values()):
+                _index_packages(value, "%s.%s" % (package, name), index)
+        elif name != "":
+            index["sections"]["%s.%s" % (package, name)] = dict(section_names(value))
+            sections.append(name)
+    index["packages"][package] = sections
+
+
+def build_index(parts: Parts) -> dict:
+    """Return the index of the modules of a Parts catalog.
+
+    colours is a list of the (code, name, rgb, alpha, colour attributes)
+    of the colours, sections maps section modules to their parts, by
+    name, and packages maps packages to the names of their sections.
+    """
+    colours = sorted(parts.colours_by_name.values(), key=lambda c: c.code)
+    index = {
+        "version": INDEX_VERSION,
+        "colours": [
+            (c.code, c.name, c.rgb, c.alpha, c.colour_attributes) for c in colours
+        ],
+        "sections": {},
+        "packages": {},
+    }
+    _index_packages(parts.parts, ROOT_MODULE + ".parts", index)
+    return index
+
+
+def load_index(ldraw_library_path, fingerprint: str, cache_dir=None) -> dict:
+    """Return the index of an LDraw library, from the cache if possible."""
+    cache_dir = Path(cache_dir if cache_dir is not None else get_cache_dir())
+    index_path = cache_dir / ("library-%s.pickle" % fingerprint)
+    try:
+        with index_path.open("rb") as f:
+            index = pickle.load(f)  # noqa: S301
+        if index.get("version") == INDEX_VERSION:
+            return index
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    index = build_index(Parts(Path(ldraw_library_path) / "ldraw" / "parts.lst"))
+    partial = index_path.with_name(index_path.name + ".%i" % os.getpid())
+    try:
+        with partial.open("wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        partial.replace(index_path)
+    except OSError:
+        partial.unlink(missing_ok=True)
+    return index
+
+
+class MemoryLibrary:
+    """the ldraw.library modules of an index, made when they are imported."""
+
+    def __init__(self, index: dict, fingerprint: str | None = None):
+        self.index = index
+        self.fingerprint = fingerprint
+
+    def __repr__(self):
+        return "<MemoryLibrary: %i sections>" % len(self.index["sections"])
+
+    def is_package(self, fullname: str) -> bool:
+        """Return whether a module of the library is a package."""
+        return fullname == ROOT_MODULE or fullname in self.index["packages"]
+
+    def sections(self, fullname: str) -> list[str]:
+        """Return the names of the sections of a package, which are modules."""
+        return self.index["packages"].get(fullname, [])
+
+    def attributes(self, fullname: str) -> dict:
+        """Return the attributes of a module of the library, but its sections."""
+        if fullname == ROOT_MODULE:
+            return {"__all__": ["colours", "parts"]}
+        if fullname == ROOT_MODULE + ".colours":
+            return self._colours()
+        if fullname in self.index["packages"]:
+            return self._package(fullname)
+        if fullname in self.index["sections"]:
+            return dict(self.index["sections"][fullname])
+        raise CouldNotFindModuleError(fullname, "<memory>", "<memory>")
+
+    def _colours(self) -> dict:
+        attributes = {"Colour": Colour}
+        by_code = {}
+        by_name = {}
+        for code, name, rgb, alpha, colour_attributes in self.index["colours"]:
+            colour = Colour(code, camel(clean(name)), rgb, alpha, colour_attributes)
+            attributes[colour.name] = by_code[code] = by_name[name] = colour
+        attributes["ColoursByCode"] = by_code
+        attributes["ColoursByName"] = by_name
+        return attributes
+
+    def _package(self, fullname: str) -> dict:
+        sections = self.index["packages"][fullname]
+        attributes = {"__all__": list(sections)}
+        for name in sections:
+            # As "from .section import *" does, later sections winning.
+            attributes.update(self.index["sections"]["%s.%s" % (fullname, name)])
+        return attributes
+
+
+_libraries = {}
+_libraries_lock = threading.Lock()
+
+
+def memory_library(config, *, refresh=False) -> MemoryLibrary:
+    """Return the MemoryLibrary of a configuration, made once per process.
+
+    If refresh is True, the fingerprint of the LDraw library is checked
+    again, and the library made again if it changed.
+    """
+    key = config.ldraw_library_path
+    with _libraries_lock:
+        library = _libraries.get(key)
+        if library is not None and not refresh:
+            return library
+        fingerprint = library_fingerprint(key)
+        if library is None or library.fingerprint != fingerprint:
+            library = _libraries[key] = MemoryLibrary(
+                load_index(key, fingerprint),
+                fingerprint,
+            )
+        return library
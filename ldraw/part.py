@@ -1,6 +1,7 @@
 """Part file parsing and processing functionality."""
 
 import re
+from functools import lru_cache
 from pathlib import Path
 
 from ldraw.colour import Colour
@@ -28,6 +29,12 @@ def colour_from_str(colour_str):
             return Colour(rgb="#" + colour_str[3:], alpha=255)
 
 
+@lru_cache(maxsize=1024)
+def _colour(colour_str):
+    """Get a Colour from a string, shared by all the lines using it."""
+    return Colour(colour_from_str(colour_str))
+
+
 def _comment_or_meta(pieces):
     if not pieces:
         return Comment("")
@@ -39,7 +46,7 @@ def _comment_or_meta(pieces):
 def _sub_file(pieces: list) -> Piece:
     if len(pieces) != 14:
         raise InvalidLineDataError("subfile", 14, pieces)
-    colour = colour_from_str(pieces[0])
+    colour = _colour(pieces[0])
     position = list(map(float, pieces[1:4]))
     rows = [
         list(map(float, pieces[4:7])),
@@ -49,38 +56,38 @@ def _sub_file(pieces: list) -> Piece:
     part = pieces[13].upper()
     if re.search(ENDS_DOT_DAT, part):
         part = part[:-4]
-    return Piece(Colour(colour), Vector(*position), Matrix(rows), part)
+    return Piece(colour, Vector(*position), Matrix(rows), part)
 
 
 def _line(pieces: list) -> Line:
     if len(pieces) != 7:
         raise InvalidLineDataError("lint", 7, pieces)
-    colour = colour_from_str(pieces[0])
+    colour = _colour(pieces[0])
     point1 = map(float, pieces[1:4])
     point2 = map(float, pieces[4:7])
-    return Line(Colour(colour), Vector(*point1), Vector(*point2))
+    return Line(colour, Vector(*point1), Vector(*point2))
 
 
 def _triangle(pieces: list) -> Triangle:
     if len(pieces) != 10:
         raise InvalidLineDataError("triangle", 10, pieces)
-    colour = colour_from_str(pieces[0])
+    colour = _colour(pieces[0])
     point1 = map(float, pieces[1:4])
     point2 = map(float, pieces[4:7])
     point3 = map(float, pieces[7:10])
-    return Triangle(Colour(colour), Vector(*point1), Vector(*point2), Vector(*point3))
+    return Triangle(colour, Vector(*point1), Vector(*point2), Vector(*point3))
 
 
 def _quadrilateral(pieces: list) -> Quadrilateral:
     if len(pieces) != 13:
         raise InvalidLineDataError("quadrilateral", 13, pieces)
-    colour = colour_from_str(pieces[0])
+    colour = _colour(pieces[0])
     point1 = map(float, pieces[1:4])
     point2 = map(float, pieces[4:7])
     point3 = map(float, pieces[7:10])
     point4 = map(float, pieces[10:13])
     return Quadrilateral(
-        Colour(colour),
+        colour,
         Vector(*point1),
         Vector(*point2),
         Vector(*point3),
@@ -91,13 +98,13 @@ def _quadrilateral(pieces: list) -> Quadrilateral:
 def _optional_line(pieces: list) -> OptionalLine:
     if len(pieces) != 13:
         raise InvalidLineDataError("optional", 13, pieces)
-    colour = colour_from_str(pieces[0])
+    colour = _colour(pieces[0])
     point1 = map(float, pieces[1:4])
     point2 = map(float, pieces[4:7])
     point3 = map(float, pieces[7:10])
     point4 = map(float, pieces[10:13])
     return OptionalLine(
-        Colour(colour),
+        colour,
         Vector(*point1),
         Vector(*point2),
         Vector(*point3),
@@ -20,6 +20,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 # pylint: disable=too-few-public-methods
 import contextlib
+import functools
 import hashlib
 import logging
 import os
@@ -27,7 +28,6 @@ import re
 from collections import defaultdict
 from pathlib import Path
 
-import inflect
 from attridict import AttriDict
 
 from ldraw.colour import Colour
@@ -41,7 +41,13 @@ DOT_DAT = re.compile(r"\.DAT", flags=re.IGNORECASE)
 logger = logging.getLogger(__name__)
 
 
-p = inflect.engine()
+@functools.cache
+def _inflect_engine():
+    # inflect is slow to import, and only needed to load a catalog.
+    import inflect  # noqa: PLC0415
+
+    return inflect.engine()
+
 
 MEMOIZED = {}
 
@@ -185,7 +191,7 @@ class Parts:
                 elif k in {"car", "train", "technic"}:
                     self.parts[k] = value
                 else:
-                    self.parts[p.plural(k)] = value
+                    self.parts[_inflect_engine().plural(k)] = value
 
     def get_category(self, part_description: str) -> str | None:
         """Get the category of a part based on its description."""
@@ -19,53 +19,217 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 # pylint: disable=too-many-arguments, too-few-public-methods
+from collections.abc import Iterator
 from functools import reduce
 
-from ldraw.geometry import Identity, Matrix, Vector
+from ldraw.colour import colour_text
+from ldraw.errors import GroupCycleError
+from ldraw.geometry import Identity, Matrix, Quaternion, Vector, as_matrix
+
+ORIGIN = Vector(0, 0, 0)
+IDENTITY_ROWS = Identity().rows
 
 
 class Piece:
-    """A Piece is a Part with a defined colour, position, and rotation."""
+    """A Piece is a Part with a defined colour, position, and rotation.
+
+    The rotation can be given as a Matrix or as a Quaternion. The world
+    transform, including the transforms of the enclosing groups, is cached
+    until the piece or one of its groups is moved.
+    """
+
+    __slots__ = ("_group", "_matrix", "_position", "_world", "colour", "part")
 
     def __init__(self, colour, position, matrix, part, group=None):
-        self.position = position
+        self._position = position
+        self._matrix = as_matrix(matrix)
+        self._group = None
+        self._world = None
         self.colour = colour
-        self.matrix = matrix
         self.part = part.upper()
-        self.group = group
         if group:
             group.add_piece(self)
 
     def __repr__(self) -> str:
-        if self.group:
-            position = self.group.position + self.group.matrix * self.position
-            matrix = self.group.matrix * self.matrix
-        else:
-            position = self.position
-            matrix = self.matrix
+        position, matrix = self.world_transform()
         tup = tuple(reduce(lambda row1, row2: row1 + row2, matrix.rows))
         return (
-            ("1 %i " % self.colour.code)
+            ("1 %s " % colour_text(self.colour.code))
             + ("%f " * 3) % (position.x, position.y, position.z)
             + ("%f " * 9) % tup
             + ("%s.DAT" % self.part)
         )
 
+    @property
+    def position(self) -> Vector:
+        """Position of the piece, relative to its group."""
+        return self._position
+
+    @position.setter
+    def position(self, position: Vector) -> None:
+        self._position = position
+        self._world = None
+
+    @property
+    def matrix(self) -> Matrix:
+        """Rotation of the piece, relative to its group."""
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, matrix: Matrix | Quaternion) -> None:
+        self._matrix = as_matrix(matrix)
+        self._world = None
+
+    @property
+    def group(self) -> "Group | None":
+        """The group containing the piece."""
+        return self._group
+
+    @group.setter
+    def group(self, group: "Group | None") -> None:
+        self._group = group
+        self._world = None
+
+    def invalidate(self) -> None:
+        """Mark the cached world transform as stale."""
+        self._world = None
+
+    def world_transform(self) -> tuple[Vector, Matrix]:
+        """Return the position and matrix of the piece in the model."""
+        if self._world is None:
+            if self._group is None:
+                self._world = (self._position, self._matrix)
+            elif self._group.is_identity:
+                # Skipping the multiplication also keeps the sign of -0.0.
+                self._world = (self._position, self._matrix)
+            else:
+                position, matrix = self._group.world_transform()
+                self._world = (
+                    position + matrix * self._position,
+                    matrix * self._matrix,
+                )
+        return self._world
+
+    @property
+    def world_position(self) -> Vector:
+        """Position of the piece in the model."""
+        return self.world_transform()[0]
+
+    @property
+    def world_matrix(self) -> Matrix:
+        """Rotation of the piece in the model."""
+        return self.world_transform()[1]
+
 
 class Group:
-    """a Group of Pieces."""
+    """a Group of Pieces, and of other Groups.
+
+    Each group caches its world transform; moving a group marks all its
+    descendants stale, and they are recomputed once when next accessed.
+    Assign position and matrix rather than modifying them in place, so
+    that the caches are invalidated.
+    """
 
     def __init__(
         self,
         position: Vector | None = None,
-        matrix: Matrix | None = None,
+        matrix: Matrix | Quaternion | None = None,
+        group: "Group | None" = None,
     ) -> None:
-        self.position = position if position is not None else Vector(0, 0, 0)
-        self.matrix = matrix if matrix is not None else Identity()
+        self._position = position if position is not None else Vector(0, 0, 0)
+        self._matrix = as_matrix(matrix) if matrix is not None else Identity()
+        self._group: Group | None = None
+        self._world: tuple[Vector, Matrix] | None = None
+        self._identity = False
         self.pieces: list[Piece] = []
+        self.groups: list[Group] = []
+        if group:
+            group.add_group(self)
 
     def __repr__(self) -> str:
-        return "\n".join([repr(piece) for piece in self.pieces])
+        return "\n".join([repr(piece) for piece in self.all_pieces()])
+
+    @property
+    def position(self) -> Vector:
+        """Position of the group, relative to its parent group."""
+        return self._position
+
+    @position.setter
+    def position(self, position: Vector) -> None:
+        self._position = position
+        self.invalidate()
+
+    @property
+    def matrix(self) -> Matrix:
+        """Rotation of the group, relative to its parent group."""
+        return self._matrix
+
+    @matrix.setter
+    def matrix(self, matrix: Matrix | Quaternion) -> None:
+        self._matrix = as_matrix(matrix)
+        self.invalidate()
+
+    @property
+    def group(self) -> "Group | None":
+        """The parent group."""
+        return self._group
+
+    @group.setter
+    def group(self, group: "Group | None") -> None:
+        self._group = group
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Mark the cached world transforms of the group and its descendants stale."""
+        # A cached node always has cached ancestors, so when this group is
+        # already stale its whole subtree is stale too.
+        if self._world is None:
+            return
+        self._world = None
+        for piece in self.pieces:
+            piece.invalidate()
+        for group in self.groups:
+            group.invalidate()
+
+    def world_transform(self) -> tuple[Vector, Matrix]:
+        """Return the position and matrix of the group in the model."""
+        if self._world is None:
+            if self._group is None:
+                self._world = (self._position, self._matrix)
+            else:
+                position, matrix = self._group.world_transform()
+                self._world = (
+                    position + matrix * self._position,
+                    matrix * self._matrix,
+                )
+            self._identity = (
+                self._world[0] == ORIGIN and self._world[1].rows == IDENTITY_ROWS
+            )
+        return self._world
+
+    @property
+    def is_identity(self) -> bool:
+        """Check if the group leaves its pieces where they are in the model."""
+        self.world_transform()
+        return self._identity
+
+    @property
+    def world_position(self) -> Vector:
+        """Position of the group in the model."""
+        return self.world_transform()[0]
+
+    @property
+    def world_matrix(self) -> Matrix:
+        """Rotation of the group in the model."""
+        return self.world_transform()[1]
+
+    def all_pieces(self) -> Iterator[Piece]:
+        """Yield the pieces of the group, then those of its subgroups."""
+        stack = [self]
+        while stack:
+            group = stack.pop()
+            yield from group.pieces
+            stack.extend(reversed(group.groups))
 
     def add_piece(self, piece: Piece) -> None:
         """Add a piece to the group."""
@@ -78,3 +242,20 @@ class Group:
         """Remove a piece from the group."""
         self.pieces.remove(piece)
         piece.group = None
+
+    def add_group(self, group: "Group") -> None:
+        """Add a subgroup to the group."""
+        ancestor: Group | None = self
+        while ancestor is not None:
+            if ancestor is group:
+                raise GroupCycleError
+            ancestor = ancestor.group
+        self.groups.append(group)
+        if group.group and group.group != self:
+            group.group.remove_group(group)
+        group.group = self
+
+    def remove_group(self, group: "Group") -> None:
+        """Remove a subgroup from the group."""
+        self.groups.remove(group)
+        group.group = None
@@ -0,0 +1,238 @@
+"""Columnar storage for scenes with a high piece count.
+
+A PieceArray keeps the pieces of a scene in parallel arrays instead of one
+Piece, Vector, Matrix and Colour object per brick, so that millions of
+pieces fit in memory and can be filtered in bulk.
+"""
+
+from array import array
+from collections.abc import Iterable, Iterator
+
+from ldraw.colour import Colour
+from ldraw.errors import ColourCodeError, ColumnLengthError
+from ldraw.geometry import Matrix, Quaternion, Vector, as_matrix
+from ldraw.pieces import Group, Piece
+
+IDENTITY_VALUES = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0)
+
+
+def _colour_code(colour) -> int:
+    code = colour.code if isinstance(colour, Colour) else colour
+    if not isinstance(code, int):
+        raise ColourCodeError(colour)
+    return code
+
+
+def _position_values(position) -> tuple:
+    if isinstance(position, Vector):
+        return position.x, position.y, position.z
+    return tuple(position)
+
+
+def _matrix_values(matrix) -> tuple:
+    if matrix is None:
+        return IDENTITY_VALUES
+    if isinstance(matrix, (Matrix, Quaternion)):
+        return as_matrix(matrix).flatten()
+    return tuple(matrix)
+
+
+class PieceArray:
+    """Pieces stored as parallel arrays of positions, matrices, colours and parts.
+
+    Positions hold 3 floats and matrices 9 floats per piece; colours are
+    stored by code, and part codes are interned so that each piece only
+    stores an index. Colour instances given on append are kept, one per
+    code, and reused when converting back to Piece objects.
+    """
+
+    def __init__(self):
+        self.positions = array("d")
+        self.matrices = array("d")
+        self.colours = array("l")
+        self.parts = array("L")
+        self.part_codes: list[str] = []
+        self._part_index: dict[str, int] = {}
+        self._colour_objects: dict[int, Colour] = {}
+
+    def __len__(self):
+        return len(self.colours)
+
+    def __repr__(self):
+        return "<PieceArray: %i pieces, %i parts>" % (len(self), len(self.part_codes))
+
+    def _empty_like(self) -> "PieceArray":
+        # Slices share the interning tables, which are append-only.
+        result = PieceArray()
+        result.part_codes = self.part_codes
+        result._part_index = self._part_index
+        result._colour_objects = self._colour_objects
+        return result
+
+    def intern_part(self, part: str) -> int:
+        """Return the index of a part code, adding it if needed."""
+        part = part.upper()
+        try:
+            return self._part_index[part]
+        except KeyError:
+            index = len(self.part_codes)
+            self.part_codes.append(part)
+            self._part_index[part] = index
+            return index
+
+    def colour(self, code: int) -> Colour:
+        """Return the shared Colour instance for a colour code."""
+        try:
+            return self._colour_objects[code]
+        except KeyError:
+            colour = Colour(code)
+            self._colour_objects[code] = colour
+            return colour
+
+    def register_colour(self, colour) -> int:
+        """Return the code of a Colour or code, keeping the Colour instance."""
+        code = _colour_code(colour)
+        if isinstance(colour, Colour) and code not in self._colour_objects:
+            self._colour_objects[code] = colour
+        return code
+
+    def append(self, colour, position, matrix, part: str) -> None:
+        """Append a piece given by its colour, position, matrix and part code.
+
+        The colour can be a Colour or a code, the position a Vector or
+        three numbers, and the matrix a Matrix, a Quaternion, nine numbers
+        or None for the identity.
+        """
+        self.colours.append(self.register_colour(colour))
+        self.positions.extend(_position_values(position))
+        self.matrices.extend(_matrix_values(matrix))
+        self.parts.append(self.intern_part(part))
+
+    def append_piece(self, piece: Piece) -> None:
+        """Append a Piece, with the transforms of its groups applied."""
+        position, matrix = piece.world_transform()
+        self.append(piece.colour, position, matrix, piece.part)
+
+    def extend(self, pieces: Iterable[Piece]) -> None:
+        """Append Pieces, with the transforms of their groups applied."""
+        for piece in pieces:
+            self.append_piece(piece)
+
+    def bulk_append(self, positions, colours, parts, matrices=None) -> None:
+        """Append many pieces at once.
+
+        positions is an iterable of positions. colours, parts and matrices
+        are either iterables of the same length, or a single value shared
+        by all the new pieces.
+        """
+        start = len(self)
+        try:
+            for position in positions:
+                self.positions.extend(_position_values(position))
+            count = len(self.positions) // 3 - start
+
+            if isinstance(colours, (Colour, int)):
+                self.colours.extend([self.register_colour(colours)] * count)
+            else:
+                self.colours.extend(self.register_colour(c) for c in colours)
+            if isinstance(parts, str):
+                self.parts.extend([self.intern_part(parts)] * count)
+            else:
+                self.parts.extend(self.intern_part(part) for part in parts)
+            if matrices is None or isinstance(matrices, (Matrix, Quaternion)):
+                self.matrices.extend(_matrix_values(matrices) * count)
+            else:
+                for matrix in matrices:
+                    self.matrices.extend(_matrix_values(matrix))
+        except Exception:
+            self._truncate(start)
+            raise
+
+        sizes = {
+            len(self.colours),
+            len(self.parts),
+            len(self.matrices) // 9,
+            len(self.positions) // 3,
+        }
+        if len(sizes) != 1:
+            self._truncate(start)
+            raise ColumnLengthError
+
+    def _truncate(self, size: int) -> None:
+        del self.positions[3 * size :]
+        del self.matrices[9 * size :]
+        del self.colours[size:]
+        del self.parts[size:]
+
+    @classmethod
+    def from_pieces(cls, pieces: Iterable[Piece] | Group) -> "PieceArray":
+        """Build a PieceArray from Pieces, or from all the pieces of a Group."""
+        result = cls()
+        if isinstance(pieces, Group):
+            pieces = pieces.all_pieces()
+        result.extend(pieces)
+        return result
+
+    def part(self, index: int) -> str:
+        """Return the part code of a piece."""
+        return self.part_codes[self.parts[index]]
+
+    def position(self, index: int) -> Vector:
+        """Return the position of a piece."""
+        return Vector(*self.positions[3 * index : 3 * index + 3])
+
+    def matrix(self, index: int) -> Matrix:
+        """Return the matrix of a piece."""
+        m = self.matrices[9 * index : 9 * index + 9]
+        return Matrix([list(m[0:3]), list(m[3:6]), list(m[6:9])])
+
+    def piece(self, index: int, group: Group | None = None) -> Piece:
+        """Return a new Piece for the piece at an index."""
+        return Piece(
+            self.colour(self.colours[index]),
+            self.position(index),
+            self.matrix(index),
+            self.part(index),
+            group,
+        )
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self.take(range(len(self))[key])
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError(key)
+        return self.piece(key)
+
+    def __iter__(self) -> Iterator[Piece]:
+        for index in range(len(self)):
+            yield self.piece(index)
+
+    def to_pieces(self, group: Group | None = None) -> list[Piece]:
+        """Return new Pieces for all the pieces, optionally added to a group."""
+        return [self.piece(index, group) for index in range(len(self))]
+
+    def take(self, indices: Iterable[int]) -> "PieceArray":
+        """Return a new PieceArray with the pieces at the given indices."""
+        result = self._empty_like()
+        positions, matrices = self.positions, self.matrices
+        for index in indices:
+            result.positions.extend(positions[3 * index : 3 * index + 3])
+            result.matrices.extend(matrices[9 * index : 9 * index + 9])
+            result.colours.append(self.colours[index])
+            result.parts.append(self.parts[index])
+        return result
+
+    def filter(self, part: str | None = None, colour=None) -> "PieceArray":
+        """Return the pieces with a given part code and/or colour."""
+        selected = range(len(self))
+        if part is not None:
+            part_index = self._part_index.get(part.upper())
+            parts = self.parts
+            selected = [i for i in selected if parts[i] == part_index]
+        if colour is not None:
+            code = _colour_code(colour)
+            colours = self.colours
+            selected = [i for i in selected if colours[i] == code]
+        return self.take(selected)
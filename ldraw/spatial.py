@@ -0,0 +1,113 @@
+"""Spatial hashing of 3D points for near-neighbour lookups."""
+
+import math
+from collections import defaultdict
+
+
+class SpatialHash:
+    """a uniform grid that buckets points by cell.
+
+    Points are (x, y, z) tuples. A lookup only visits the cells overlapping
+    the query radius, a single one most of the time when the cell size is
+    a few times the radius, so inserting n points and querying each of
+    them is linear in n. nearest() searches outwards instead, and suits
+    small cells with a large radius.
+    """
+
+    def __init__(self, cell_size: float):
+        self.cell_size = cell_size
+        self._cells = defaultdict(list)
+
+    def __len__(self):
+        return sum(len(cell) for cell in self._cells.values())
+
+    def _cell(self, point):
+        return self._index(point[0]), self._index(point[1]), self._index(point[2])
+
+    def _index(self, value):
+        # Cells are centred on multiples of the cell size, so that the round
+        # coordinates LDraw models use fall well inside a cell.
+        return math.floor(value / self.cell_size + 0.5)
+
+    def insert(self, point, item):
+        """Insert an item at a point."""
+        self._cells[self._cell(point)].append((point, item))
+
+    def remove(self, point, item):
+        """Remove an item previously inserted at a point."""
+        cell = self._cell(point)
+        self._cells[cell].remove((point, item))
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    def near(self, point, radius):
+        """Yield (point, item) pairs within radius of a point."""
+        x, y, z = point
+        squared = radius * radius
+        cells = self._cells
+        index = self._index
+        x_cells = range(index(x - radius), index(x + radius) + 1)
+        y_cells = range(index(y - radius), index(y + radius) + 1)
+        z_cells = range(index(z - radius), index(z + radius) + 1)
+        for cx in x_cells:
+            for cy in y_cells:
+                for cz in z_cells:
+                    cell = cells.get((cx, cy, cz))
+                    if not cell:
+                        continue
+                    for other, item in cell:
+                        ox, oy, oz = other
+                        if (ox - x) ** 2 + (oy - y) ** 2 + (oz - z) ** 2 <= squared:
+                            yield other, item
+
+    def _ring(self, centre, ring):
+        # Yield the non empty cells ring cells away from a cell, on any axis.
+        cells = self._cells
+        side = 2 * ring + 1
+        if side**3 - max(side - 2, 0) ** 3 > len(cells):
+            # There are fewer cells in the grid than in the ring.
+            for position, cell in cells.items():
+                distance = max(
+                    abs(a - b) for a, b in zip(position, centre, strict=True)
+                )
+                if distance == ring:
+                    yield cell
+            return
+        cx, cy, cz = centre
+        span = range(-ring, ring + 1)
+        faces = (-ring, ring) if ring else (0,)
+        for dx in span:
+            for dy in span:
+                # Inside the ring, only its two faces along z.
+                dz_span = span if abs(dx) == ring or abs(dy) == ring else faces
+                for dz in dz_span:
+                    cell = cells.get((cx + dx, cy + dy, cz + dz))
+                    if cell:
+                        yield cell
+
+    def nearest(self, point, radius):
+        """Return the (point, item) pair nearest to a point within radius, or None.
+
+        Cells are searched ring by ring outwards from the cell of the point,
+        until no point nearer than the best one can be found, so that a
+        near point is found in a few lookups whatever the radius.
+        """
+        x, y, z = point
+        centre = self._cell(point)
+        best = None
+        best_squared = radius * radius
+        # A point in the cell is at most half a cell from its centre, so the
+        # points of a ring are at least ring - 1 cells away.
+        for ring in range(math.floor(radius / self.cell_size) + 2):
+            reach = max(ring - 1, 0) * self.cell_size
+            if reach * reach > best_squared:
+                break
+            for cell in self._ring(centre, ring):
+                for other, item in cell:
+                    ox, oy, oz = other
+                    squared = (ox - x) ** 2 + (oy - y) ** 2 + (oz - z) ** 2
+                    if squared < best_squared or (
+                        best is None and squared == best_squared
+                    ):
+                        best, best_squared = (other, item), squared
+        return best
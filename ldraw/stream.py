@@ -0,0 +1,111 @@
+"""Streaming generation of models too large to keep in memory.
+
+A ModelStream is an LDRWriter that hands out StreamGroups. Pieces added
+to a StreamGroup are written immediately, with the current transforms of
+the enclosing groups applied, and are not kept, so memory use does not
+grow with the number of pieces.
+"""
+
+import weakref
+from collections.abc import Iterator
+
+from ldraw.errors import GroupCycleError
+from ldraw.geometry import Matrix, Quaternion, Vector
+from ldraw.pieces import Group, Piece
+from ldraw.writer import BUFFER_SIZE, DEFAULT_PRECISION, LDRWriter
+
+
+class StreamGroup(Group):
+    """a Group that writes its pieces to a ModelStream as they are added.
+
+    Subgroups that are StreamGroups are only weakly referenced, to pass on
+    the invalidation of world transforms when a group is moved; pieces
+    added afterwards are written at the new place. Any other Group is
+    written with all its pieces when it is added, then detached.
+    """
+
+    def __init__(
+        self,
+        stream: "ModelStream",
+        position: Vector | None = None,
+        matrix: Matrix | Quaternion | None = None,
+        group: Group | None = None,
+    ) -> None:
+        self.stream = stream
+        super().__init__(position, matrix)
+        self.groups = weakref.WeakSet()
+        if group:
+            group.add_group(self)
+
+    def all_pieces(self) -> Iterator[Piece]:
+        """Yield nothing, the pieces have already been written."""
+        return iter(())
+
+    def add_piece(self, piece: Piece) -> None:
+        """Write a piece, with the transforms of this group applied."""
+        if piece.group and piece.group != self:
+            piece.group.remove_piece(piece)
+        piece.group = self
+        self.stream.write_piece(piece)
+
+    def remove_piece(self, piece: Piece) -> None:
+        """Detach a piece; it has already been written."""
+        piece.group = None
+
+    def add_group(self, group: Group) -> None:
+        """Add a StreamGroup, or write the pieces of another Group."""
+        ancestor: Group | None = self
+        while ancestor is not None:
+            if ancestor is group:
+                raise GroupCycleError
+            ancestor = ancestor.group
+        if group.group and group.group != self:
+            group.group.remove_group(group)
+        group.group = self
+        if isinstance(group, StreamGroup):
+            self.groups.add(group)
+        else:
+            self.stream.write_pieces(group.all_pieces())
+            group.group = None
+
+    def remove_group(self, group: Group) -> None:
+        """Remove a subgroup from the group."""
+        self.groups.discard(group)
+        group.group = None
+
+
+class ModelStream(LDRWriter):
+    """an LDRWriter for pieces generated on the fly.
+
+    Used as a context manager, the stream is flushed, and its file closed
+    if it was given as a path, on exit. Pieces are written to the root
+    group, or to groups created with group().
+    """
+
+    def __init__(self, file, precision=DEFAULT_PRECISION, buffer_size=BUFFER_SIZE):
+        super().__init__(file, precision=precision, buffer_size=buffer_size)
+        self.root = StreamGroup(self)
+        self.steps = 0
+
+    def group(
+        self,
+        position: Vector | None = None,
+        matrix: Matrix | Quaternion | None = None,
+        parent: StreamGroup | None = None,
+    ) -> StreamGroup:
+        """Return a new StreamGroup, in the root group by default."""
+        return StreamGroup(
+            self,
+            position,
+            matrix,
+            parent if parent is not None else self.root,
+        )
+
+    def add(self, piece: Piece) -> None:
+        """Write a piece to the root group."""
+        self.root.add_piece(piece)
+
+    def step(self) -> None:
+        """End the current building step."""
+        self.write_line("0 STEP")
+        self.steps += 1
@@ -2,6 +2,9 @@
 
 import os
 import re
+from pathlib import Path
+
+NON_WORD = re.compile(r"\W+")
 
 
 def clean(input_string: str) -> str:
@@ -10,12 +13,13 @@ def clean(input_string: str) -> str:
     :param input_string:
     :return:
     """
-    return re.sub(r"\W+", "_", input_string).replace("_x_", "x")
+    return NON_WORD.sub("_", input_string).replace("_x_", "x")
 
 
 def camel(input_string: str) -> str:
     """Return a CamelCase string."""
-    return "".join(x for x in input_string.title() if not x.isspace())
+    # split() drops the same characters as str.isspace(), much faster.
+    return "".join(input_string.title().split())
 
 
 def ensure_exists(path: str) -> str:
@@ -24,6 +28,23 @@ def ensure_exists(path: str) -> str:
     return path
 
 
+def write_if_changed(path: str | Path, content: str | bytes) -> bool:
+    """Write a text, or bytes, file unless it already has this content.
+
+    Returns whether the file was written; an unchanged file keeps its
+    modification time, and so the bytecode cached for it stays valid.
+    """
+    path = Path(path)
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
+
 # https://stackoverflow.com/a/6027615
 def flatten(input_dict: dict, parent_key: str = "", sep: str = ".") -> dict:
     """Flatten a dictionary."""
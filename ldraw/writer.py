@@ -0,0 +1,364 @@
+"""Buffered writing of pieces to LDraw files.
+
+An LDRWriter formats type 1 lines for Pieces, Groups and PieceArrays and
+writes them to a file in large chunks. With the default precision the
+lines are identical to repr(piece); the formatted text of matrices,
+colours and part names is cached, since most models only use a handful
+of distinct rotations.
+
+write_mpd() writes repeated subgroups once, as MPD submodels.
+"""
+
+import math
+import struct
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+from ldraw.colour import colour_text
+from ldraw.geometry import Matrix, Vector
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+
+DEFAULT_PRECISION = 6
+BUFFER_SIZE = 1 << 20
+# Number of lines joined before each write to the underlying file.
+CHUNK_LINES = 4096
+PART_EXTENSIONS = (".DAT", ".LDR", ".MPD")
+# Coordinates of models on a stud grid repeat a lot; their formatted text
+# is cached until this many distinct values have been seen.
+NUMBER_CACHE_SIZE = 1 << 16
+# Most models use a handful of rotations, but a stream of pieces at
+# arbitrary angles would add one formatted matrix per piece.
+MATRIX_CACHE_SIZE = 1 << 12
+# Colour code of submodel references, so that their pieces keep their own.
+MAIN_COLOUR = 16
+# Matrices are cached by their bytes, since 0.0 == -0.0 but they are
+# formatted differently.
+_matrix_key = struct.Struct("9d").pack
+
+
+def part_filename(part: str) -> str:
+    """Return the file name used to reference a part in a type 1 line."""
+    if part.upper().endswith(PART_EXTENSIONS):
+        return part
+    return "%s.DAT" % part
+
+
+class LDRWriter:
+    """Writes pieces as type 1 lines to a text file.
+
+    file is a path or an open text file. A path is opened with a buffer
+    of buffer_size bytes and closed by close(), or on leaving the writer
+    used as a context manager.
+    """
+
+    def __init__(self, file, precision=DEFAULT_PRECISION, buffer_size=BUFFER_SIZE):
+        if isinstance(file, (str, Path)):
+            # Owned by the writer, and closed by close().
+            self._file = Path(file).open("w", buffering=buffer_size)  # noqa: SIM115
+            self._owned = True
+        else:
+            self._file = file
+            self._owned = False
+        self.precision = precision
+        self.lines_written = 0
+        self._float = "%%.%if" % precision
+        self._matrix_format = " ".join([self._float] * 9)
+        self._pending = []
+        self._matrices = {}
+        self._colours = {}
+        self._parts = {}
+        self._numbers = {}
+        self._zero = self._float % 0.0
+        self._negative_zero = self._float % -0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _colour(self, code: int) -> str:
+        try:
+            return self._colours[code]
+        except KeyError:
+            text = self._colours[code] = "1 %s " % colour_text(code)
+            return text
+
+    def _part(self, part: str) -> str:
+        try:
+            return self._parts[part]
+        except KeyError:
+            text = self._parts[part] = " %s\n" % part_filename(part)
+            return text
+
+    def _matrix(self, values, key: bytes) -> str:
+        matrices = self._matrices
+        try:
+            return matrices[key]
+        except KeyError:
+            if len(matrices) >= MATRIX_CACHE_SIZE:
+                matrices.clear()
+            text = matrices[key] = " " + self._matrix_format % tuple(values)
+            return text
+
+    def _number(self, value: float) -> str:
+        numbers = self._numbers
+        try:
+            if value:
+                return numbers[value]
+            return self._zero if math.copysign(1.0, value) > 0 else self._negative_zero
+        except KeyError:
+            if len(numbers) >= NUMBER_CACHE_SIZE:
+                numbers.clear()
+            text = numbers[value] = self._float % value
+            return text
+
+    def format_line(self, code: int, position, matrix, part: str, key=None) -> str:
+        """Return the type 1 line, with its line break, for a piece.
+
+        position is an (x, y, z) sequence and matrix a flat sequence of 9
+        numbers; key, if given, is the bytes of the matrix as 9 doubles.
+        """
+        if key is None:
+            key = _matrix_key(*matrix)
+        x, y, z = position
+        number = self._number
+        return (
+            self._colour(code)
+            + number(x)
+            + " "
+            + number(y)
+            + " "
+            + number(z)
+            + self._matrix(matrix, key)
+            + self._part(part)
+        )
+
+    def _append(self, line: str) -> None:
+        pending = self._pending
+        pending.append(line)
+        if len(pending) >= CHUNK_LINES:
+            self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        if self._pending:
+            self._file.write("".join(self._pending))
+            self.lines_written += len(self._pending)
+            self._pending = []
+
+    def write_line(self, line: str) -> None:
+        """Write a raw line, such as a meta command."""
+        self._append(line + "\n")
+
+    def write_reference(
+        self,
+        code: int,
+        position: Vector,
+        matrix: Matrix,
+        part: str,
+    ) -> None:
+        """Write a type 1 line for a part or submodel at a given place."""
+        rows = matrix.rows
+        self._append(
+            self.format_line(
+                code,
+                (position.x, position.y, position.z),
+                (*rows[0], *rows[1], *rows[2]),
+                part,
+            ),
+        )
+
+    def write_piece(self, piece: Piece) -> None:
+        """Write a Piece, with the transforms of its groups applied."""
+        position, matrix = piece.world_transform()
+        self.write_reference(piece.colour.code, position, matrix, piece.part)
+
+    def write_pieces(self, pieces: Iterable[Piece]) -> None:
+        """Write Pieces, with the transforms of their groups applied."""
+        for piece in pieces:
+            self.write_piece(piece)
+
+    def write_array(self, scene: PieceArray) -> None:
+        """Write all the pieces of a PieceArray, without creating Pieces."""
+        positions, matrices = scene.positions, scene.matrices
+        colours, parts, part_codes = scene.colours, scene.parts, scene.part_codes
+        format_line = self.format_line
+        for i in range(len(scene)):
+            matrix = matrices[9 * i : 9 * i + 9]
+            self._append(
+                format_line(
+                    colours[i],
+                    positions[3 * i : 3 * i + 3],
+                    matrix,
+                    part_codes[parts[i]],
+                    matrix.tobytes(),
+                ),
+            )
+
+    def write(self, model) -> None:
+        """Write a Group, a PieceArray, a Piece or an iterable of Pieces."""
+        if isinstance(model, PieceArray):
+            self.write_array(model)
+        elif isinstance(model, Group):
+            self.write_pieces(model.all_pieces())
+        elif isinstance(model, Piece):
+            self.write_piece(model)
+        else:
+            self.write_pieces(model)
+
+    def flush(self) -> None:
+        """Write the buffered lines to the file."""
+        self._flush_pending()
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush the buffered lines, and close the file if the writer opened it."""
+        self.flush()
+        if self._owned:
+            self._file.close()
+
+
+def write_ldr(model, file, precision=DEFAULT_PRECISION, buffer_size=BUFFER_SIZE):
+    """Write a Group, a PieceArray or Pieces to a path or an open text file.
+
+    Returns the number of lines written.
+    """
+    with LDRWriter(file, precision=precision, buffer_size=buffer_size) as writer:
+        writer.write(model)
+    return writer.lines_written
+
+
+def _rounded(values, digits: int) -> tuple:
+    # Adding 0.0 turns -0.0 into 0.0, which rounds the same anyway.
+    return tuple(round(value, digits) + 0.0 for value in values)
+
+
+def _transform_key(position: Vector, matrix: Matrix, digits: int) -> tuple:
+    rows = matrix.rows
+    return _rounded(
+        (position.x, position.y, position.z, *rows[0], *rows[1], *rows[2]),
+        digits,
+    )
+
+
+class _MPDWriter:
+    """Writes a Group as an MPD file, with repeated subgroups as submodels."""
+
+    def __init__(self, writer: LDRWriter, name: str, min_count: int):
+        self.writer = writer
+        self.name = name
+        self.min_count = min_count
+        self.digits = writer.precision
+        self.signatures = {}
+        self.group_signature = {}
+        self.counts = Counter()
+        self.submodels = {}
+        self.first_groups = {}
+
+    def sign(self, group: Group) -> int:
+        """Return the index of the canonical signature of a group."""
+        digits = self.digits
+        pieces = sorted(
+            (
+                piece.colour.code,
+                piece.part,
+                _transform_key(piece.position, piece.matrix, digits),
+            )
+            for piece in group.pieces
+        )
+        children = sorted(
+            (self.sign(child), _transform_key(child.position, child.matrix, digits))
+            for child in group.groups
+        )
+        signature = (tuple(pieces), tuple(children))
+        index = self.signatures.setdefault(signature, len(self.signatures))
+        self.group_signature[group] = index
+        self.counts[index] += 1
+        return index
+
+    def submodel(self, group: Group) -> str | None:
+        """Return the submodel name for a group, or None if it is not repeated."""
+        index = self.group_signature[group]
+        if self.counts[index] < self.min_count or not (group.pieces or group.groups):
+            return None
+        if index not in self.submodels:
+            stem = self.name.rsplit(".", 1)[0]
+            self.submodels[index] = "%s-%i.ldr" % (stem, len(self.submodels) + 1)
+            self.first_groups[index] = group
+        return self.submodels[index]
+
+    def emit(self, group: Group, position=None, matrix=None) -> None:
+        """Write the contents of a group placed by a position and matrix.
+
+        These are None for the identity, so that pieces are written
+        unchanged.
+        """
+        write = self.writer.write_reference
+        for piece in group.pieces:
+            if matrix is None:
+                write(piece.colour.code, piece.position, piece.matrix, piece.part)
+            else:
+                write(
+                    piece.colour.code,
+                    position + matrix * piece.position,
+                    matrix * piece.matrix,
+                    piece.part,
+                )
+        for child in group.groups:
+            if matrix is None:
+                child_position, child_matrix = child.position, child.matrix
+            else:
+                child_position = position + matrix * child.position
+                child_matrix = matrix * child.matrix
+            reference = self.submodel(child)
+            if reference is None:
+                self.emit(child, child_position, child_matrix)
+            else:
+                write(MAIN_COLOUR, child_position, child_matrix, reference)
+
+    def write(self, model: Group) -> None:
+        """Write the main model, then the submodels it uses."""
+        for child in model.groups:
+            self.sign(child)
+        self.writer.write_line("0 FILE %s" % self.name)
+        if model.is_identity:
+            self.emit(model)
+        else:
+            self.emit(model, *model.world_transform())
+        self.writer.write_line("0 NOFILE")
+        written = set()
+        while len(written) < len(self.submodels):
+            # Writing a submodel can find the submodels nested in it.
+            for index, reference in list(self.submodels.items()):
+                if index in written:
+                    continue
+                written.add(index)
+                self.writer.write_line("0 FILE %s" % reference)
+                self.emit(self.first_groups[index])
+                self.writer.write_line("0 NOFILE")
+
+
+def write_mpd(  # noqa: PLR0913
+    model: Group,
+    file,
+    *,
+    name="model.ldr",
+    precision=DEFAULT_PRECISION,
+    buffer_size=BUFFER_SIZE,
+    min_count=2,
+):
+    """Write a Group as an MPD file, with repeated subgroups as submodels.
+
+    Subgroups, at any depth, with the same pieces at the same places
+    relative to the group, and the same subgroups, are written once in a
+    0 FILE section; each occurrence becomes a single type 1 line in colour
+    16 referencing it. A group is instanced when it occurs at least
+    min_count times. Positions are compared rounded to the precision.
+
+    Returns the number of lines written.
+    """
+    with LDRWriter(file, precision=precision, buffer_size=buffer_size) as writer:
+        _MPDWriter(writer, name, min_count).write(model)
+    return writer.lines_written
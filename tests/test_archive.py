@@ -0,0 +1,53 @@
+"""Tests for generated libraries packed into an archive."""
+
+import os
+import shutil
+import zipfile
+
+import pytest
+
+from ldraw import LibraryImporter, generate
+from ldraw.config import Config
+from ldraw.imports import open_archive
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def archived_library(request, tmp_path):
+    generated_path = tmp_path / "generated"
+    archive = tmp_path / "library.zip"
+    config = Config(
+        ldraw_library_path=os.path.join("tests", "test_ldraw"),
+        generated_path=str(generated_path),
+    )
+    generate(config, workers=1, lazy=request.param, archive=archive)
+    # Only the archive is left to import from.
+    shutil.rmtree(generated_path)
+    config.generated_path = str(archive)
+    LibraryImporter.set_config(config)
+    yield archive
+    LibraryImporter.clean()
+
+
+def test_archive_content(archived_library) -> None:
+    """Modules are packed with their pycs, bytecode caches are not."""
+    names = set(zipfile.ZipFile(archived_library).namelist())
+    assert {"library/__init__.py", "library/parts/bricks.py"} <= names
+    assert {"library/__init__.pyc", "library/parts/bricks.pyc"} <= names
+    assert not any("__pycache__" in name for name in names)
+
+    modules = open_archive(str(archived_library)).modules
+    assert modules["ldraw.library.parts"] == ("library/parts/__init__.py", True)
+    assert modules["ldraw.library.parts.bricks"] == ("library/parts/bricks.py", False)
+
+
+def test_archive_import(archived_library) -> None:
+    """Modules are imported from the archive."""
+    from ldraw.library.parts import Brick2X4
+    from ldraw.library.parts.bricks import Brick2X4 as Brick
+
+    assert Brick2X4 == Brick == "3001"
+
+    from ldraw.library import parts
+
+    assert parts.__file__.startswith(str(archived_library))
+    assert parts.__all__ == ["bricks"]
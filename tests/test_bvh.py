@@ -0,0 +1,105 @@
+"""Tests for the bounding volume hierarchy."""
+
+import itertools
+import random
+
+import pytest
+
+from ldraw.bvh import BVH, BoundingBox, PartBounds
+from ldraw.colour import Colour
+from ldraw.geometry import Identity, Vector, YAxis
+from ldraw.parts import Parts
+from ldraw.pieces import Group, Piece
+
+Red = Colour(4, "Red", "#C91A09", 255, [])
+Brick2X4 = "3001"
+BOUNDS = {Brick2X4: BoundingBox(Vector(-40, -4, -20), Vector(40, 24, 20))}
+
+
+def brute_force_pairs(bvh, pieces):
+    return {
+        (a, b)
+        for a, b in itertools.combinations(pieces, 2)
+        if bvh.box(a).overlaps(bvh.box(b))
+    }
+
+
+@pytest.fixture
+def random_pieces():
+    rng = random.Random(1234)
+    return [
+        Piece(
+            Red,
+            Vector(rng.uniform(0, 800), rng.uniform(0, 200), rng.uniform(0, 800)),
+            Identity().rotate(rng.choice([0, 90, 180, 270]), YAxis),
+            Brick2X4,
+        )
+        for _ in range(300)
+    ]
+
+
+def test_part_bounds() -> None:
+    bounds = PartBounds(Parts("tests/test_ldraw/ldraw/parts.lst"))
+    box = bounds["3001"]
+    assert box.minimum == Vector(-40, 0, -20)
+    assert box.maximum == Vector(40, 24, 20)
+    assert bounds["missing"] is None
+
+
+def test_piece_box_uses_group_transform() -> None:
+    group = Group(Vector(100, 0, 0), Identity().rotate(90, YAxis))
+    piece = Piece(Red, Vector(0, 0, 0), Identity(), Brick2X4, group=group)
+    box = BVH([piece], BOUNDS).box(piece)
+    assert (box.minimum.x, box.maximum.x) == pytest.approx((80, 120))
+    assert (box.minimum.z, box.maximum.z) == pytest.approx((-40, 40))
+
+
+def test_overlapping_pairs(random_pieces) -> None:
+    bvh = BVH(random_pieces, BOUNDS)
+    pairs = set(bvh.overlapping_pairs())
+    assert pairs
+    assert pairs == brute_force_pairs(bvh, random_pieces)
+
+
+def test_stacked_bricks_touching() -> None:
+    bottom = Piece(Red, Vector(0, 0, 0), Identity(), Brick2X4)
+    side = Piece(Red, Vector(80, 0, 0), Identity(), Brick2X4)
+    bvh = BVH([bottom, side], BOUNDS)
+    assert bvh.overlapping_pairs() == []
+
+
+def test_query(random_pieces) -> None:
+    bvh = BVH(random_pieces, BOUNDS)
+    area = BoundingBox(Vector(100, 0, 100), Vector(300, 100, 300))
+    expected = {piece for piece in random_pieces if bvh.box(piece).overlaps(area)}
+    assert set(bvh.query(area)) == expected
+
+
+def test_ray_cast() -> None:
+    pieces = [
+        Piece(Red, Vector(0, -24 * level, 0), Identity(), Brick2X4)
+        for level in range(10)
+    ]
+    bvh = BVH(pieces, BOUNDS)
+    piece, distance = bvh.ray_cast(Vector(0, -1000, 0), Vector(0, 1, 0))
+    assert piece is pieces[-1]
+    assert distance == pytest.approx(1000 - 24 * 9 - 4)
+    assert bvh.ray_cast(Vector(500, -1000, 0), Vector(0, 1, 0)) is None
+    assert BVH([], BOUNDS).ray_cast(Vector(0, 0, 0), Vector(0, 1, 0)) is None
+
+
+def test_refit(random_pieces) -> None:
+    bvh = BVH(random_pieces, BOUNDS)
+    moved = random_pieces[:20]
+    for piece in moved:
+        piece.position = piece.position + Vector(400, 0, 0)
+    bvh.refit(moved)
+    assert set(bvh.overlapping_pairs()) == brute_force_pairs(bvh, random_pieces)
+
+    for piece in random_pieces:
+        piece.position = Vector(0, 0, 0)
+    bvh.refit()
+    assert (
+        len(bvh.overlapping_pairs())
+        == len(random_pieces) * (len(random_pieces) - 1) // 2
+    )
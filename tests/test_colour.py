@@ -1,6 +1,13 @@
 """Tests for colour functionality."""
 
+import copy
+import pickle
+
+import pytest
+
 from ldraw.colour import Colour
+from ldraw.errors import FrozenColourError
+from ldraw.part import Part
 
 
 def test_colour_equality() -> None:
@@ -20,3 +27,29 @@ def test_colour_hash() -> None:
     c2 = Colour(code=12)
 
     assert len({c1, c2}) == 1
+
+
+def test_colour_is_frozen() -> None:
+    red = Colour(4, "Red", "#C91A09", 255, [])
+    with pytest.raises(FrozenColourError):
+        red.code = 5
+    with pytest.raises(AttributeError):
+        del red.name
+    pickled = pickle.loads(pickle.dumps(red))  # noqa: S301
+    for other in (copy.copy(red), copy.deepcopy(red), pickled):
+        assert (other.code, other.name, other.rgb, other.alpha) == (
+            4,
+            "Red",
+            "#C91A09",
+            255,
+        )
+
+
+def test_parsed_colours_are_shared(tmp_path) -> None:
+    path = tmp_path / "shared.dat"
+    path.write_text("0 shared\n2 24 0 0 0 1 0 0\n2 24 1 0 0 2 0 0\n")
+    part = Part(path)
+    first, second = [line.colour for line in list(part.objects)[1:]]
+    assert first is second
+    with pytest.raises(FrozenColourError):
+        first.code = 4
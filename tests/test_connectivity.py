@@ -0,0 +1,110 @@
+"""Tests for stud connectivity."""
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.connectivity import (
+    ConnectionPoints,
+    PartConnections,
+    connection_graph,
+)
+from ldraw.geometry import Identity, Vector, XAxis, YAxis
+from ldraw.parts import Parts
+from ldraw.pieces import Group, Piece
+from ldraw.spatial import SpatialHash
+
+Red = Colour(4, "Red", "#C91A09", 255, [])
+Brick2X4 = "3001"
+UP = (0.0, -1.0, 0.0)
+
+
+@pytest.fixture(scope="module")
+def connections():
+    return PartConnections(Parts("tests/test_ldraw/ldraw/parts.lst"))
+
+
+def brick(x, y, z, matrix=None, group=None):
+    return Piece(Red, Vector(x, y, z), matrix or Identity(), Brick2X4, group=group)
+
+
+def test_spatial_hash() -> None:
+    grid = SpatialHash(1.0)
+    grid.insert((0.0, 0.0, 0.0), "a")
+    grid.insert((0.9, 0.0, 0.0), "b")
+    grid.insert((5.0, 0.0, 0.0), "c")
+    assert {item for _, item in grid.near((0.5, 0.0, 0.0), 0.5)} == {"a", "b"}
+    assert {item for _, item in grid.near((0.0, 0.0, 0.0), 5.0)} == {"a", "b", "c"}
+    grid.remove((0.9, 0.0, 0.0), "b")
+    assert len(grid) == 2
+
+
+def test_spatial_hash_nearest() -> None:
+    grid = SpatialHash(1.0)
+    grid.insert((0.0, 0.0, 0.0), "a")
+    grid.insert((2.9, 0.0, 0.0), "b")
+    grid.insert((0.0, 4.0, 0.0), "c")
+    assert grid.nearest((2.0, 0.0, 0.0), 5.0) == ((2.9, 0.0, 0.0), "b")
+    assert grid.nearest((0.0, 3.0, 0.0), 5.0) == ((0.0, 4.0, 0.0), "c")
+    assert grid.nearest((0.0, 3.0, 0.0), 0.5) is None
+    # The nearest point may be in a further ring than the first found.
+    grid = SpatialHash(1.0)
+    grid.insert((1.6, 1.6, 1.6), "d")
+    grid.insert((2.5, 0.0, 0.0), "e")
+    assert grid.nearest((0.6, 0.0, 0.0), 5.0)[1] == "e"
+
+
+def test_part_connection_points(connections) -> None:
+    points = connections["3001"]
+    studs = sorted(point for point, _ in points.studs)
+    assert len(studs) == 8
+    assert (30.0, 0.0, 10.0) in studs
+    anti_studs = {point for point, _ in points.anti_studs}
+    assert {(x, 24.0, z) for x, _, z in studs} <= {
+        tuple(round(c, 6) for c in point) for point in anti_studs
+    }
+    assert connections["missing"].studs == []
+
+
+def test_stacked_bricks(connections) -> None:
+    bottom = brick(0, 0, 0)
+    top = brick(20, -24, 0)
+    beside = brick(100, 0, 0)
+    half_offset = brick(0, -24, 10)
+    graph = connection_graph([bottom, top, beside, half_offset], connections)
+    assert graph.connected(bottom, top)
+    assert not graph.connected(bottom, beside)
+    assert not graph.connected(bottom, half_offset)
+    assert graph.edges == [(bottom, top)]
+
+
+def test_rotated_group(connections) -> None:
+    group = Group(Vector(100, 0, 0), Identity().rotate(90, YAxis))
+    bottom = brick(0, 0, 0, group=group)
+    top = brick(0, -24, 20, matrix=Identity().rotate(90, YAxis), group=group)
+    graph = connection_graph([bottom, top], connections)
+    assert graph.connected(bottom, top)
+
+
+def test_opposite_directions_do_not_connect(connections) -> None:
+    bottom = brick(0, 0, 0)
+    # Upside down, its studs sit on the anti-studs of bottom but point down.
+    flipped = brick(0, 24, 0, matrix=Identity().rotate(180, XAxis))
+    graph = connection_graph([bottom, flipped], connections)
+    assert not graph.connected(bottom, flipped)
+
+
+def test_components_and_floating() -> None:
+    points = {
+        "PLATE": ConnectionPoints(
+            studs=[((0.0, 0.0, 0.0), UP)],
+            anti_studs=[((0.0, 8.0, 0.0), UP)],
+        ),
+    }
+    pieces = [
+        Piece(Red, Vector(0, -8 * level, 0), Identity(), "PLATE") for level in range(3)
+    ]
+    floating = Piece(Red, Vector(100, 0, 0), Identity(), "PLATE")
+    graph = connection_graph([*pieces, floating], points)
+    assert graph.components() == [pieces, [floating]]
+    assert graph.floating([pieces[0]]) == [floating]
+    assert graph.neighbours(pieces[1]) == [pieces[0], pieces[2]]
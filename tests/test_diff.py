@@ -0,0 +1,84 @@
+"""Tests for model diffs."""
+
+import io
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.diff import canonical_keys, diff_models
+from ldraw.geometry import Identity, Vector, YAxis
+from ldraw.loader import load_ldr
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+from ldraw.writer import write_ldr
+
+White = Colour(15, "White", "#FFFFFF", 255, [])
+Black = Colour(0, "Black", "#05131D", 255, [])
+Brick1X1 = "3005"
+Brick2X4 = "3001"
+
+
+@pytest.fixture
+def wall():
+    group = Group()
+    for x in range(20):
+        for y in range(5):
+            Piece(White, Vector(x * 20, -24 * y, 0), Identity(), Brick1X1, group)
+    return group
+
+
+def test_identical_models(wall, tmp_path) -> None:
+    path = tmp_path / "wall.ldr"
+    write_ldr(wall, path)
+    diff = diff_models(wall, str(path))
+    assert not diff
+    assert diff.unchanged == 100
+
+
+def test_group_transforms_and_negative_zero() -> None:
+    group = Group(Vector(100, 0, 0), Identity().rotate(90, YAxis))
+    Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group)
+    flat = [
+        Piece(White, Vector(100, -0.0, 0), Identity().rotate(90, YAxis), Brick1X1),
+    ]
+    assert list(canonical_keys(group)) == list(canonical_keys(flat))
+
+
+def test_added_removed_moved(wall) -> None:
+    new = PieceArray.from_pieces(wall)
+    new = new.take(range(1, len(new)))
+    new.append(White, (0, 0, 40), None, Brick1X1)
+    new.append(Black, (0, -200, 0), None, Brick2X4)
+    new.append(White, (1000, 0, 1000), None, Brick1X1)
+
+    diff = diff_models(wall, new)
+    assert diff.unchanged == 99
+    assert [piece.part for piece in diff.added_pieces] == [Brick2X4, Brick1X1]
+    assert diff.removed == []
+    [(old, moved)] = diff.moved_pieces
+    assert old.position == Vector(0, 0, 0)
+    assert moved.position == Vector(0, 0, 40)
+
+    diff = diff_models(wall, new, move_radius=0)
+    assert len(diff.added) == 3
+    assert len(diff.removed) == 1
+
+
+def test_whole_model_moved(wall) -> None:
+    moved = PieceArray.from_pieces(wall)
+    for i in range(len(moved)):
+        moved.positions[3 * i] += 5
+
+    diff = diff_models(wall, moved)
+    assert diff.added == diff.removed == []
+    assert len(diff.moved) == 100
+    assert all(new[2] - old[2] == 5 for old, new in diff.moved)
+
+
+def test_duplicates_are_counted(wall) -> None:
+    text = io.StringIO()
+    write_ldr(wall, text)
+    doubled = load_ldr(io.StringIO(text.getvalue() * 2), columnar=True)
+    diff = diff_models(wall, doubled)
+    assert len(diff.added) == 100
+    assert diff.unchanged == 100
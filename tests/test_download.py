@@ -1,9 +1,23 @@
 """Tests for download functionality."""
 
+import hashlib
+import threading
+import time
 import zipfile
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 
+import pytest
+import requests
+
 from ldraw import download
+from ldraw.downloads import PART_SUFFIX, fetch, segment_ranges
+from ldraw.errors import (
+    ChecksumMismatchError,
+    IncompleteDownloadError,
+    UnexpectedRangeError,
+)
 
 
 @patch("os.path.exists", side_effect=lambda s: False)
@@ -21,3 +35,208 @@ def test_download(
 
     download_progress_mock.assert_called_once()
     generate_parts_lst_mock.assert_called_once()
+
+
+CHUNK_SIZE = 16384
+
+
+class _LibraryHandler(BaseHTTPRequestHandler):
+    """Serves the content of its server, with Range requests if server.ranges.
+
+    If server.from_start, ranges are sent from the start of the content,
+    whatever their start requested. Requests for the ranges in
+    server.errors fail, and bodies are sent in chunks of CHUNK_SIZE with
+    server.delay seconds between them.
+    """
+
+    def do_HEAD(self) -> None:
+        self.send_response(HTTPStatus.OK)
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(self.server.content)))
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        server = self.server
+        content = server.content
+        requested = self.headers.get("Range")
+        with server.lock:
+            server.requested.append(requested)
+            truncate, server.truncate = server.truncate, None
+        if requested in server.errors:
+            self.send_error(HTTPStatus.SERVICE_UNAVAILABLE)
+            return
+        start, end = 0, len(content) - 1
+        if requested is not None and server.ranges:
+            first, _, last = requested.removeprefix("bytes=").partition("-")
+            start, end = int(first), int(last or end)
+            if server.from_start:
+                start = 0
+            if start >= len(content):
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", "bytes */%i" % len(content))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header(
+                "Content-Range",
+                "bytes %i-%i/%i" % (start, end, len(content)),
+            )
+        else:
+            self.send_response(HTTPStatus.OK)
+        body = content[start : end + 1]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if truncate is not None:
+            # Drop the connection once, as a network failure would.
+            body = body[:truncate]
+            self.close_connection = True
+        for start in range(0, len(body), CHUNK_SIZE):
+            time.sleep(server.delay)
+            self.wfile.write(body[start : start + CHUNK_SIZE])
+
+    def log_message(self, format, *args) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _LibraryHandler)
+    httpd.content = bytes(range(256)) * 4096
+    httpd.ranges = True
+    httpd.from_start = False
+    httpd.errors = set()
+    httpd.delay = 0.0
+    httpd.truncate = None
+    httpd.requested = []
+    httpd.lock = threading.Lock()
+    httpd.url = "http://127.0.0.1:%i/complete.zip" % httpd.server_port
+    thread = threading.Thread(
+        target=httpd.serve_forever,
+        kwargs={"poll_interval": 0.01},
+        daemon=True,
+    )
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch(server, tmp_path) -> None:
+    received = []
+    destination = fetch(
+        server.url,
+        tmp_path / "complete.zip",
+        chunk_size=100_000,
+        sha256=hashlib.sha256(server.content).hexdigest(),
+        progress=lambda size, total: received.append((size, total)),
+    )
+    assert destination.read_bytes() == server.content
+    assert received[-1] == (len(server.content), len(server.content))
+    assert not (tmp_path / ("complete.zip" + PART_SUFFIX)).exists()
+    # A complete file is not downloaded again.
+    assert fetch(server.url, destination) == destination
+    assert server.requested == [None]
+
+
+def test_fetch_resumes(server, tmp_path) -> None:
+    destination = tmp_path / "complete.zip"
+    server.truncate = 300_000
+    with pytest.raises(requests.RequestException):
+        fetch(server.url, destination, chunk_size=65536)
+    partial = tmp_path / ("complete.zip" + PART_SUFFIX)
+    assert not destination.exists()
+    # The chunks received before the failure are kept.
+    size = partial.stat().st_size
+    assert 0 < size <= 300_000
+    assert partial.read_bytes() == server.content[:size]
+
+    fetch(server.url, destination, chunk_size=65536)
+    assert server.requested == [None, "bytes=%i-" % size]
+    assert destination.read_bytes() == server.content
+    assert not partial.exists()
+
+
+def test_fetch_without_ranges(server, tmp_path) -> None:
+    server.ranges = False
+    partial = tmp_path / ("complete.zip" + PART_SUFFIX)
+    partial.write_bytes(b"stale")
+    destination = fetch(server.url, tmp_path / "complete.zip")
+    assert destination.read_bytes() == server.content
+
+
+def test_fetch_unexpected_range(server, tmp_path) -> None:
+    server.from_start = True
+    partial = tmp_path / ("complete.zip" + PART_SUFFIX)
+    partial.write_bytes(server.content[:1000])
+    with pytest.raises(UnexpectedRangeError):
+        fetch(server.url, tmp_path / "complete.zip")
+    assert not (tmp_path / "complete.zip").exists()
+    assert partial.read_bytes() == server.content[:1000]
+
+
+def test_fetch_complete_part(server, tmp_path) -> None:
+    partial = tmp_path / ("complete.zip" + PART_SUFFIX)
+    partial.write_bytes(server.content)
+    destination = fetch(server.url, tmp_path / "complete.zip")
+    assert destination.read_bytes() == server.content
+    assert server.requested == ["bytes=%i-" % len(server.content)]
+
+
+def test_fetch_checksum_mismatch(server, tmp_path) -> None:
+    with pytest.raises(ChecksumMismatchError):
+        fetch(server.url, tmp_path / "complete.zip", sha256="0" * 64)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_segment_ranges() -> None:
+    assert segment_ranges(10, 3) == [(0, 3), (4, 7), (8, 9)]
+    assert segment_ranges(2, 4) == [(0, 0), (1, 1)]
+
+
+def test_fetch_segments(server, tmp_path) -> None:
+    received = []
+    destination = fetch(
+        server.url,
+        tmp_path / "complete.zip",
+        chunk_size=65536,
+        sha256=hashlib.sha256(server.content).hexdigest(),
+        progress=lambda size, total: received.append((size, total)),
+        segments=4,
+    )
+    assert destination.read_bytes() == server.content
+    size = len(server.content)
+    assert sorted(server.requested) == [
+        "bytes=%i-%i" % segment for segment in segment_ranges(size, 4)
+    ]
+    assert max(received) == (size, size)
+    assert list(tmp_path.iterdir()) == [destination]
+
+
+def test_fetch_segments_without_ranges(server, tmp_path) -> None:
+    server.ranges = False
+    destination = fetch(server.url, tmp_path / "complete.zip", segments=4)
+    assert destination.read_bytes() == server.content
+    assert server.requested == [None]
+
+
+def test_fetch_segments_failure(server, tmp_path) -> None:
+    server.truncate = 1000
+    with pytest.raises((requests.RequestException, IncompleteDownloadError)):
+        fetch(server.url, tmp_path / "complete.zip", chunk_size=65536, segments=4)
+    assert list(tmp_path.iterdir()) == []
+    destination = fetch(server.url, tmp_path / "complete.zip", segments=4)
+    assert destination.read_bytes() == server.content
+
+
+def test_fetch_segments_stop_on_failure(server, tmp_path) -> None:
+    # Each range would take a second and a half to send.
+    server.delay = 0.1
+    size = len(server.content)
+    server.errors = {"bytes=%i-%i" % segment_ranges(size, 4)[0]}
+    started = time.perf_counter()
+    with pytest.raises(requests.HTTPError):
+        fetch(server.url, tmp_path / "complete.zip", chunk_size=CHUNK_SIZE, segments=4)
+    assert time.perf_counter() - started < 1.0
+    assert list(tmp_path.iterdir()) == []
@@ -1,13 +1,18 @@
 """Tests for dynamic import functionality."""
 
+import importlib
 import os
+import sys
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import pytest
 
-from ldraw import LibraryImporter
+from ldraw import LibraryImporter, generate
 from ldraw.config import Config
+from ldraw.imports import scan_library
 
 
 @pytest.fixture
@@ -21,3 +26,68 @@ def mocked_library():
     LibraryImporter.set_config(config)
     yield
     LibraryImporter.clean()
+
+
+def test_library_scanned_once(tmp_path) -> None:
+    """The generated library is scanned once for the paths of its modules."""
+    config = Config(
+        ldraw_library_path=os.path.join("tests", "test_ldraw"),
+        generated_path=str(tmp_path),
+    )
+    generate(config, workers=1)
+    paths = scan_library(str(tmp_path))
+    assert paths["ldraw.library"] == str(tmp_path / "library" / "__init__.py")
+    assert paths["ldraw.library.parts.bricks"] == str(
+        tmp_path / "library" / "parts" / "bricks.py",
+    )
+
+    LibraryImporter.set_config(config)
+    scans = LibraryImporter.stats.library_scans
+    modules = LibraryImporter.stats.modules
+    try:
+        from ldraw.library.parts import bricks
+        from ldraw.library.parts.bricks import Brick2X4
+
+        assert bricks.__file__ == paths["ldraw.library.parts.bricks"]
+        assert Brick2X4 == "3001"
+        assert LibraryImporter.stats.library_scans == scans + 1
+        assert LibraryImporter.stats.modules == modules + 3
+    finally:
+        LibraryImporter.clean()
+
+
+def test_concurrent_imports(tmp_path) -> None:
+    """Threads importing the library at once get the same, complete modules."""
+    config = Config(
+        ldraw_library_path=os.path.join("tests", "test_ldraw"),
+        generated_path=str(tmp_path),
+    )
+    generate(config, workers=1)
+    LibraryImporter.set_config(config)
+    names = sorted(scan_library(str(tmp_path)))
+    barrier = threading.Barrier(8)
+
+    def import_all(offset):
+        barrier.wait()
+        # Each thread starts with a different module.
+        return [
+            importlib.import_module(names[(offset + i) % len(names)])
+            for i in range(len(names))
+        ]
+
+    modules = LibraryImporter.stats.modules
+    try:
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(import_all, range(8)))
+        for result in results:
+            assert sorted(result, key=lambda m: m.__name__) == [
+                sys.modules[name] for name in names
+            ]
+        # Each module was run once.
+        assert LibraryImporter.stats.modules == modules + len(names)
+        from ldraw.library.parts.bricks import Brick2X4
+
+        assert Brick2X4 == "3001"
+    finally:
+        LibraryImporter.clean()
+    assert not [name for name in sys.modules if name.startswith("ldraw.library")]
@@ -9,6 +9,7 @@ from ldraw.geometry import (
     Identity,
     Matrix,
     MatrixError,
+    Quaternion,
     Radians,
     Vector,
     XAxis,
@@ -72,3 +73,51 @@ def test_mul_matrix_vector() -> None:
     v = Vector(42, 1, 0)
     v2 = m * v
     assert v2 == Vector(44, 173, 302)
+
+
+def assert_matrix_approx(matrix, expected, abs_tol=None) -> None:
+    for row, expected_row in zip(matrix.rows, expected.rows, strict=True):
+        assert row == pytest.approx(expected_row, abs=abs_tol)
+
+
+@pytest.mark.parametrize("axis", [XAxis, YAxis, ZAxis])
+def test_quaternion_matches_matrix_rotate(axis) -> None:
+    quaternion = Quaternion.from_axis_angle(30, axis)
+    assert_matrix_approx(quaternion.to_matrix(), Identity().rotate(30, axis))
+
+
+def test_quaternion_composition() -> None:
+    matrix = Identity().rotate(30, XAxis).rotate(-45, YAxis).rotate(60, ZAxis)
+    quaternion = Quaternion().rotate(30, XAxis).rotate(-45, YAxis).rotate(60, ZAxis)
+    assert_matrix_approx(quaternion.to_matrix(), matrix)
+
+    v = Vector(3, -2, 7)
+    rotated = quaternion * v
+    expected = matrix * v
+    assert (rotated.x, rotated.y, rotated.z) == pytest.approx(
+        (expected.x, expected.y, expected.z),
+    )
+
+
+def test_quaternion_from_matrix_round_trip() -> None:
+    for angles in [(0, 0, 0), (180, 0, 0), (0, 180, 0), (90, 200, -30)]:
+        matrix = Identity().rotate(angles[0], XAxis).rotate(angles[1], YAxis)
+        matrix = matrix.rotate(angles[2], ZAxis)
+        round_trip = Quaternion.from_matrix(matrix).to_matrix()
+        assert_matrix_approx(round_trip, matrix, abs_tol=1e-9)
+
+
+def test_quaternion_slerp() -> None:
+    start = Quaternion()
+    end = Quaternion.from_axis_angle(90, ZAxis)
+    assert start.slerp(end, 0) == start
+    half = start.slerp(end, 0.5).to_matrix()
+    assert_matrix_approx(half, Identity().rotate(45, ZAxis))
+    assert abs(start.slerp(end, 0.3)) == pytest.approx(1)
+
+
+def test_quaternion_mul_others() -> None:
+    with pytest.raises(MatrixError):
+        Quaternion() * 2
+    with pytest.raises(MatrixError):
+        Quaternion.from_axis_angle(10, None)
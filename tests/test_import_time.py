@@ -0,0 +1,81 @@
+"""Tests that importing ldraw stays fast."""
+
+import subprocess
+import sys
+
+# Modules that "import ldraw" must not import, as they take long to
+# import and are only needed to download or generate the library.
+DEFERRED_MODULES = (
+    "argparse",
+    "attridict",
+    "inflect",
+    "ldraw.downloads",
+    "ldraw.generation",
+    "ldraw.parts",
+    "progress",
+    "pystache",
+    "requests",
+    "yaml",
+    "zipfile",
+)
+# Cumulative microseconds, generous for slow machines.
+IMPORT_BUDGET_US = 150_000
+
+
+def run_python(statement: str, *options: str) -> subprocess.CompletedProcess:
+    """Run statement in a new interpreter."""
+    return subprocess.run(  # noqa: S603
+        [sys.executable, *options, "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def imported_modules(statement: str) -> set[str]:
+    """Return the modules in sys.modules after running statement."""
+    result = run_python(statement + "; import sys; print(*sys.modules)")
+    return set(result.stdout.split())
+
+
+def added_modules(statement: str) -> set[str]:
+    """Return the modules imported by statement.
+
+    Modules already imported when the interpreter starts, such as by site
+    hooks, are left out.
+    """
+    return imported_modules(statement) - imported_modules("pass")
+
+
+def import_times(statement: str) -> dict[str, int]:
+    """Return the cumulative import times of the modules imported by statement.
+
+    Modules imported with importlib.import_module() are not timed.
+    """
+    times = {}
+    for line in run_python(statement, "-X", "importtime").stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+def test_import_ldraw_defers_dependencies() -> None:
+    modules = added_modules("import ldraw, ldraw.geometry, ldraw.pieces")
+    assert "ldraw.imports" in modules
+    assert sorted(set(DEFERRED_MODULES) & modules) == []
+
+
+def test_import_ldraw_budget() -> None:
+    assert import_times("import ldraw")["ldraw"] < IMPORT_BUDGET_US
+
+
+def test_lazy_attributes() -> None:
+    modules = added_modules("from ldraw import generate; assert callable(generate)")
+    assert "ldraw.generation" in modules
+    assert "requests" not in modules
+    modules = imported_modules(
+        "import ldraw.downloads; from ldraw import download, generate; "
+        "assert callable(download) and callable(generate)",
+    )
+    assert "requests" in modules
@@ -0,0 +1,90 @@
+"""Tests for bills of materials."""
+
+import io
+from pathlib import Path
+
+import pytest
+
+from ldraw.errors import SubmodelCycleError
+from ldraw.inventory import build_inventory
+
+CAR_DESCRIPTIONS = {
+    "3004": "Brick  1 x  2",
+    "3005": "Brick  1 x  1",
+    "3020": "Plate  2 x  4",
+    "3021": "Plate  2 x  3",
+    "3023": "Plate  1 x  2",
+    "3024": "Plate  1 x  1",
+    "3031": "Plate  4 x  4",
+    "3068b": "Tile  2 x  2 with Groove",
+    "3623": "Plate  1 x  3",
+    "3641": "Tyre  6/ 50 x  8 Offset Tread",
+    "3710": "Plate  1 x  4",
+    "3788": "Car Mudguard  2 x  4",
+    "3821": "Door  1 x  3 x  1 Left",
+    "3822": "Door  1 x  3 x  1 Right",
+    "3823": "Windscreen  2 x  4 x  2",
+    "3829c01": "Car Steering Stand and Wheel (Complete)",
+    "3937": "Hinge  1 x  2 Base",
+    "3938": "Hinge  1 x  2 Top",
+    "4070": "Brick  1 x  1 with Headlight",
+    "4079": "Minifig Seat  2 x  2",
+    "4213": "Hinge Car Roof  4 x  4",
+    "4214": "Hinge Car Roof Holder  1 x  4 x  2",
+    "4315": "Hinge Plate  1 x  4 with Car Roof Holder",
+    "4600": "Plate  2 x  2 with Wheel Holders",
+    "4624": "Wheel Rim  6.4 x  8",
+    "6141": "Plate  1 x  1 Round",
+}
+
+MPD = """0 FILE street.mpd
+1 16 0 0 0 1 0 0 0 1 0 0 0 1 house.ldr
+1 4 100 0 0 1 0 0 0 1 0 0 0 1 house.ldr
+1 1 200 0 0 1 0 0 0 1 0 0 0 1 house.ldr
+1 0 0 24 0 1 0 0 0 1 0 0 0 1 3811.dat
+0 FILE house.ldr
+1 16 0 0 0 1 0 0 0 1 0 0 0 1 3001.dat
+1 16 0 -24 0 1 0 0 0 1 0 0 0 1 3001.dat
+1 15 0 -48 0 1 0 0 0 1 0 0 0 1 window.ldr
+0 FILE window.ldr
+1 16 0 0 0 1 0 0 0 1 0 0 0 1 3005.dat
+1 47 0 0 0 1 0 0 0 1 0 0 0 1 3024.dat
+"""
+
+
+def test_car_inventory(tmp_path) -> None:
+    inventory = build_inventory("tests/test_data/car.ldr", CAR_DESCRIPTIONS)
+    path = tmp_path / "car.inv"
+    inventory.write(path)
+    assert path.read_text() == Path("tests/test_data/car.inv").read_text()
+    assert inventory.counts[("3024", 46)] == 4
+
+
+def test_submodels_and_main_colour() -> None:
+    inventory = build_inventory(io.StringIO(MPD))
+    assert inventory.counts == {
+        ("3001", 16): 2,
+        ("3001", 4): 2,
+        ("3001", 1): 2,
+        ("3005", 15): 3,
+        ("3024", 47): 3,
+        ("3811", 0): 1,
+    }
+    assert len(inventory) == 13
+    assert inventory.lines()[0] == "%-39s %d" % ("3001", 6)
+
+
+def test_external_submodel_files(tmp_path) -> None:
+    (tmp_path / "wheel.ldr").write_text("1 16 0 0 0 1 0 0 0 1 0 0 0 1 3641.dat\n")
+    model = tmp_path / "car.ldr"
+    model.write_text(
+        "1 0 10 0 0 1 0 0 0 1 0 0 0 1 WHEEL.LDR\n"
+        "1 0 -10 0 0 1 0 0 0 1 0 0 0 1 wheel.ldr\n",
+    )
+    assert build_inventory(model).counts == {("3641", 0): 2}
+
+
+def test_submodel_cycle() -> None:
+    text = "0 FILE a.ldr\n1 16 0 0 0 1 0 0 0 1 0 0 0 1 a.ldr\n"
+    with pytest.raises(SubmodelCycleError):
+        build_inventory(io.StringIO(text))
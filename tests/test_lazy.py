@@ -0,0 +1,69 @@
+"""Tests for lazily loaded parts modules."""
+
+import os
+
+import pytest
+
+from ldraw import LibraryImporter, generate
+from ldraw.config import Config
+from ldraw.lazy import PartTable, table_content
+
+
+@pytest.fixture
+def lazy_library(tmp_path):
+    config = Config(
+        ldraw_library_path=os.path.join("tests", "test_ldraw"),
+        generated_path=str(tmp_path),
+    )
+    generate(config, workers=1, lazy=True)
+    LibraryImporter.set_config(config)
+    yield tmp_path / "library"
+    LibraryImporter.clean()
+
+
+def test_part_table_lookup(tmp_path) -> None:
+    """Every name of a table is found, and no other."""
+    names = [("Part%iX%i" % (i, i % 7), "p%i" % i) for i in range(1000)]
+    path = tmp_path / "parts.tbl"
+    path.write_bytes(table_content(names))
+    table = PartTable(path)
+
+    for name, code in names:
+        assert table.get(name) == code
+    assert table.get("Part1") is None
+    assert table.get("Part999X5Z") is None
+    assert table.get("A") is None
+    assert table.get("Z") is None
+    assert table.names() == sorted(name for name, _ in names)
+
+
+def test_part_table_last_code_wins(tmp_path) -> None:
+    """A name given twice keeps its last code, like repeated assignments."""
+    path = tmp_path / "parts.tbl"
+    path.write_bytes(table_content([("Brick", "1"), ("Plate", "2"), ("Brick", "3")]))
+    assert PartTable(path).get("Brick") == "3"
+
+    path.write_bytes(b"")
+    assert PartTable(path).get("Brick") is None
+
+
+def test_lazy_library_import(lazy_library) -> None:
+    """Parts are imported from stub modules and their tables."""
+    assert "Brick2X4" not in (lazy_library / "parts" / "bricks.py").read_text()
+    assert (lazy_library / "parts" / "bricks.tbl").read_bytes() == b"Brick2X4\t3001\n"
+
+    from ldraw.library.parts import Brick2X4, bricks
+
+    assert Brick2X4 == "3001"
+    assert bricks.Brick2X4 == "3001"
+    assert bricks.__all__ == ["Brick2X4"]
+    assert "Brick2X4" in dir(bricks)
+
+    from ldraw.library import parts
+
+    assert parts.__all__ == ["bricks"]
+    assert "Brick2X4" in dir(parts)
+    with pytest.raises(AttributeError):
+        _ = parts.Brick1X1
+    with pytest.raises(ImportError):
+        from ldraw.library.parts.bricks import Brick1X1  # noqa: F401
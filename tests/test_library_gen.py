@@ -1,16 +1,25 @@
 """Tests for library generation functionality."""
 
+import importlib.util
+import json
 import logging
 import os
+import shutil
 import tempfile
 from datetime import UTC, datetime
 from os.path import join
+from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
 from ldraw import LibraryImporter, generate
 from ldraw.colour import Colour
 from ldraw.config import Config
+from ldraw.generation.bytecode import CHECKED_HASH_FLAGS, compile_library, is_compiled
+from ldraw.generation.colours import colours_module_content, emit_colours_module
+from ldraw.generation.parts import LAZY_SECTION, write_section, write_sections
+from ldraw.lazy import TABLE_SUFFIX
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +50,7 @@ def test_library_gen_files(test_ldraw_library) -> None:
         "colours.py",
         "license.txt",
         "__hash__",
+        "__manifest__",
         join("parts", "__init__.py"),
         join("parts", "bricks.py"),
     }
@@ -78,3 +88,118 @@ def test_library_gen_import(test_ldraw_library) -> None:
     assert ColoursByName == {expected_color.name: expected_color}
 
     assert Reddish_Gold == expected_color
+
+
+def test_parallel_sections_match_serial(tmp_path) -> None:
+    """Sections written by worker processes are the same as in one process."""
+    sections = {
+        "bricks": {"Brick 2 x 4": "3001", "Brick 1 x 1": "3005"},
+        "plates": {"Plate 2 x 2": "3022"},
+        "tiles": {"Tile 1 x 2 with Groove": "3069b", "Tile 2 x 2": "3068b"},
+    }
+    for workers in (1, 2):
+        directory = tmp_path / str(workers)
+        directory.mkdir()
+        write_sections(
+            [(directory / f"{name}.py", parts) for name, parts in sections.items()],
+            workers,
+        )
+
+    for name in sections:
+        serial = (tmp_path / "1" / f"{name}.py").read_text()
+        assert serial == (tmp_path / "2" / f"{name}.py").read_text()
+    assert 'Brick1X1 = "3005"' in (tmp_path / "1" / "bricks.py").read_text()
+
+
+def test_regeneration_rewrites_changed_sections(tmp_path) -> None:
+    """Only the modules whose parts changed are written again."""
+    ldraw_library = tmp_path / "ldraw_library"
+    shutil.copytree(os.path.join("tests", "test_ldraw"), ldraw_library)
+    config = Config(
+        ldraw_library_path=str(ldraw_library),
+        generated_path=str(tmp_path / "generated"),
+    )
+    generate(config, workers=1)
+
+    library = tmp_path / "generated" / "library"
+    manifest = json.loads((library / "__manifest__").read_text())
+    assert set(manifest) == {"parts/__init__.py", "parts/bricks.py"}
+    modules = ["colours.py", "__init__.py", "parts/__init__.py", "parts/bricks.py"]
+    for module in modules:
+        os.utime(library / module, (0, 0))
+
+    parts_lst = ldraw_library / "ldraw" / "parts.lst"
+    parts_lst.write_text(parts_lst.read_text().replace("Brick  2 x  4", "Brick 2 x 4"))
+    generate(config, workers=1)
+
+    mtimes = {module: (library / module).stat().st_mtime for module in modules}
+    assert mtimes == {
+        "colours.py": 0,
+        "__init__.py": 0,
+        "parts/__init__.py": 0,
+        "parts/bricks.py": mtimes["parts/bricks.py"],
+    }
+    assert mtimes["parts/bricks.py"] > 0
+    assert json.loads((library / "__manifest__").read_text()) != manifest
+
+
+def test_regeneration_follows_lazy_mode(tmp_path) -> None:
+    """Switching lazy mode regenerates the modules of an unchanged parts.lst."""
+    config = Config(
+        ldraw_library_path=os.path.join("tests", "test_ldraw"),
+        generated_path=str(tmp_path),
+    )
+    bricks = tmp_path / "library" / "parts" / "bricks.py"
+    table = bricks.with_suffix(TABLE_SUFFIX)
+    generate(config, workers=1)
+    assert not table.exists()
+
+    generate(config, workers=1, lazy=True)
+    assert table.exists()
+    assert bricks.read_text() == LAZY_SECTION
+
+    generate(config, workers=1)
+    assert not table.exists()
+    assert 'Brick2X4 = "3001"' in bricks.read_text()
+
+
+def test_native_emitter_matches_templates(tmp_path) -> None:
+    """The native emitter writes the same modules as the mustache templates."""
+    section = {
+        "Brick 2 x 4": "3001",
+        "Brick 1 x 1": "3005",
+        'Minifig Torso with "Ribbon" & Buttons': "973p01",
+        "Plate 1 x 2 with Door Rail": "32028",
+    }
+    write_section(tmp_path / "native.py", section, "native")
+    write_section(tmp_path / "mustache.py", section, "mustache")
+    native = (tmp_path / "native.py").read_text(encoding="utf-8")
+    assert native == (tmp_path / "mustache.py").read_text(encoding="utf-8")
+
+    colours = [
+        Colour(4, "Red", "#C91A09", 255, []),
+        Colour(47, "Trans_Clear", "#FCFCFC", 128, []),
+        Colour(383, "Chrome_Silver", "#E0E0E0", 255, ["CHROME"]),
+        Colour(0, "Black", "#05131D", 255, []),
+    ]
+    parts = SimpleNamespace(colours_by_name={c.name: c for c in colours})
+    assert emit_colours_module(parts) == colours_module_content(parts)
+
+
+def test_generate_bytecode(tmp_path) -> None:
+    """Generated modules are compiled to checked hash based pycs."""
+    config = Config(
+        ldraw_library_path=os.path.join("tests", "test_ldraw"),
+        generated_path=str(tmp_path),
+    )
+    generate(config, workers=1, bytecode=True)
+
+    bricks = tmp_path / "library" / "parts" / "bricks.py"
+    pyc = Path(importlib.util.cache_from_source(str(bricks))).read_bytes()
+    assert int.from_bytes(pyc[4:8], "little") == CHECKED_HASH_FLAGS
+    assert is_compiled(bricks)
+    assert compile_library(tmp_path / "library", workers=1) == 0
+
+    bricks.write_text(bricks.read_text() + 'Brick1X1 = "3005"\n')
+    assert not is_compiled(bricks)
+    assert compile_library(tmp_path / "library", workers=1) == 1
@@ -5,6 +5,7 @@ from unittest.mock import patch
 
 import pytest
 
+from ldraw.lines import Quadrilateral
 from ldraw.parts import Parts
 
 
@@ -38,3 +39,18 @@ def test_load_primitives() -> None:
 def test_cantreadpartslst(mocked) -> None:
     with pytest.raises(OSError):
         Parts("tests/test_ldraw/ldraw/parts.lst")
+
+
+def test_parsed_lines_are_compact() -> None:
+    p = Parts("tests/test_ldraw/ldraw/parts.lst")
+    objects = list(p.part(code="box5").objects)
+    quads = [obj for obj in objects if isinstance(obj, Quadrilateral)]
+    assert quads
+    quad = quads[0]
+    assert isinstance(quad.points, tuple)
+    assert len(quad.points) == 4
+    assert not hasattr(quad, "__dict__")
+    assert not hasattr(quad.point1, "__dict__")
+    assert quad.colour is quads[-1].colour
+    with pytest.raises(AttributeError):
+        quad.point1 = quad.point2
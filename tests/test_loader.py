@@ -0,0 +1,143 @@
+"""Tests for loading models."""
+
+import io
+
+import pytest
+
+from ldraw.colour import Colour, direct_colour
+from ldraw.diff import canonical_keys, diff_models
+from ldraw.errors import InvalidColourError, PartError
+from ldraw.figure import Person
+from ldraw.geometry import Identity, Vector, XAxis, YAxis
+from ldraw.loader import load_ldr, load_mpd, split_mpd
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+from ldraw.writer import write_ldr
+
+White = Colour(15, "White", "#FFFFFF", 255, [])
+Brick1X1 = "3005"
+
+MPD = """0 FILE main.ldr
+0 Main model
+1 16 0 0 0 1 0 0 0 1 0 0 0 1 wheel.ldr
+1 15 0 -24 0 1 0 0 0 1 0 0 0 1 3005.dat
+0 NOFILE
+0 FILE wheel.ldr
+1 0 10 0 0 0 0 1 0 1 0 -1 0 0 3641.dat
+1 0 -10 0 0 0 0 -1 0 1 0 1 0 0 3641.dat
+0 NOFILE
+"""
+
+
+@pytest.fixture
+def model_text():
+    model = Group()
+    Person(Vector(0, 0, -10), group=model)
+    for i in range(5):
+        Piece(
+            White,
+            Vector(i * 20, -0.0, 1 / 3),
+            Identity().rotate(90 * i, YAxis).rotate(30, XAxis),
+            Brick1X1,
+            group=model,
+        )
+    out = io.StringIO()
+    write_ldr(model, out)
+    return out.getvalue()
+
+
+def test_round_trip(model_text) -> None:
+    for columnar in (False, True):
+        out = io.StringIO()
+        write_ldr(load_ldr(io.StringIO(model_text), columnar=columnar), out)
+        assert out.getvalue() == model_text
+
+
+def test_direct_colours(tmp_path) -> None:
+    orange = direct_colour("0x2FF8000")
+    model = Group()
+    Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=model)
+    Piece(orange, Vector(20, 0, 0), Identity(), Brick1X1, group=model)
+    path = tmp_path / "model.ldr"
+    write_ldr(model, path)
+    text = path.read_text()
+    assert text.splitlines()[1] == repr(model.pieces[1])
+    assert text.splitlines()[1].startswith("1 0x2FF8000 20.000000 ")
+    for columnar in (False, True):
+        out = io.StringIO()
+        loaded = load_ldr(path, columnar=columnar)
+        write_ldr(loaded, out)
+        assert out.getvalue() == text
+    assert load_ldr(path).pieces[1].colour.rgb == "#FF8000"
+    assert [key[1] for key in canonical_keys(path)] == [15, 0x2FF8000]
+    assert not diff_models(path, model)
+
+
+def test_invalid_colour() -> None:
+    with pytest.raises(InvalidColourError):
+        load_ldr(io.StringIO("1 red 0 0 0 1 0 0 0 1 0 0 0 1 3005.dat\n"))
+
+
+def test_load_shares_values(model_text) -> None:
+    colours = {15: White}
+    model = load_ldr(io.StringIO(model_text), colours=colours)
+    pieces = [piece for piece in model.pieces if piece.part == Brick1X1.upper()]
+    assert len(pieces) == 5
+    assert all(piece.group is model for piece in pieces)
+    assert pieces[0].colour is White
+    assert pieces[0].matrix is not pieces[1].matrix
+    assert pieces[0].part is pieces[1].part
+
+
+def test_loaded_matrices_are_not_shared() -> None:
+    line = "1 15 0 0 0 1 0 0 0 1 0 0 0 1 3005.dat\n"
+    first, second = load_ldr(io.StringIO(line * 2)).pieces
+    first.matrix.rows[0][0] = -1.0
+    assert second.matrix.rows == Identity().rows
+
+
+def test_load_columnar(model_text, tmp_path) -> None:
+    path = tmp_path / "model.ldr"
+    path.write_text(model_text)
+    scene = load_ldr(path, columnar=True)
+    assert isinstance(scene, PieceArray)
+    assert len(scene) == len(model_text.splitlines())
+    assert len(scene.filter(part=Brick1X1)) == 5
+
+
+def test_load_mpd() -> None:
+    models = load_mpd(io.StringIO(MPD))
+    assert list(models) == ["MAIN.LDR", "WHEEL.LDR"]
+    assert [piece.part for piece in models["MAIN.LDR"].pieces] == ["WHEEL.LDR", "3005"]
+    wheel = models["WHEEL.LDR"].pieces
+    assert wheel[0].colour is wheel[1].colour
+    assert wheel[0].matrix.rows == [[0, 0, 1], [0, 1, 0], [-1, 0, 0]]
+
+
+def test_split_mpd_is_lazy() -> None:
+    read = []
+
+    def lines():
+        for line in io.StringIO(MPD):
+            read.append(line)
+            yield line
+
+    sections = split_mpd(lines())
+    assert read == []
+    name, start, section = next(sections)
+    assert (name, start, len(read)) == ("main.ldr", 2, 1)
+    assert next(section) == "0 Main model\n"
+    assert len(read) == 2
+    # The lines left in a section are skipped.
+    name, start, section = next(sections)
+    assert (name, start) == ("wheel.ldr", 7)
+    assert list(section) == MPD.splitlines(keepends=True)[6:8]
+    assert list(sections) == []
+
+
+def test_invalid_line() -> None:
+    with pytest.raises(PartError, match=r"at line 2$"):
+        load_ldr(io.StringIO("0 comment\n1 15 0 0 0 3005.dat\n"))
+    # Lines of MPD files are numbered in the file, not in their section.
+    with pytest.raises(PartError, match=r"in wheel\.ldr in .* at line 8$"):
+        load_mpd(io.StringIO(MPD.replace("1 0 -10 0 0 0 0 -1 0 1 0 1 0 0", "1 0")))
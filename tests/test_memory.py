@@ -0,0 +1,95 @@
+"""Tests for the ldraw.library modules built in memory."""
+
+import os
+import pickle
+import shutil
+from types import SimpleNamespace
+
+import pytest
+from attridict import AttriDict
+
+from ldraw import LibraryImporter
+from ldraw.colour import Colour
+from ldraw.config import Config
+from ldraw.memory import build_index, library_fingerprint, memory_library
+
+
+@pytest.fixture
+def memory_config(tmp_path, monkeypatch):
+    monkeypatch.setattr("ldraw.memory.get_cache_dir", lambda: str(tmp_path))
+    ldraw_library = tmp_path / "ldraw_library"
+    shutil.copytree(os.path.join("tests", "test_ldraw"), ldraw_library)
+    config = Config(
+        ldraw_library_path=str(ldraw_library),
+        generated_path=str(tmp_path / "generated"),
+        in_memory=True,
+    )
+    LibraryImporter.set_config(config)
+    yield config
+    LibraryImporter.clean()
+
+
+def test_memory_import(memory_config, tmp_path) -> None:
+    """Parts are imported without generating files, and the index is cached."""
+    from ldraw.library.parts import Brick2X4, bricks
+
+    assert Brick2X4 == bricks.Brick2X4 == "3001"
+    assert not (tmp_path / "generated").exists()
+    fingerprint = library_fingerprint(memory_config.ldraw_library_path)
+    assert (tmp_path / ("library-%s.pickle" % fingerprint)).exists()
+
+    from ldraw.library import parts
+
+    assert parts.__all__ == ["bricks"]
+
+
+def test_memory_fingerprint_change(memory_config) -> None:
+    """The library is made again when parts.lst changes."""
+    from ldraw.library.parts import Brick2X4
+
+    assert Brick2X4 == "3001"
+    LibraryImporter.clean()
+
+    parts_lst = os.path.join(memory_config.ldraw_library_path, "ldraw", "parts.lst")
+    with open(parts_lst, "a") as f:
+        f.write("\n")
+    from ldraw.library import parts
+
+    assert parts.Brick2X4 == "3001"
+    fingerprint = library_fingerprint(memory_config.ldraw_library_path)
+    assert memory_library(memory_config).fingerprint == fingerprint
+
+
+def test_memory_modules(memory_config, tmp_path) -> None:
+    """The modules have the attributes of the generated ones."""
+    catalog = SimpleNamespace(
+        colours_by_name={
+            "Red": Colour(4, "Red", "#C91A09", 255, []),
+            "Chrome_Silver": Colour(383, "Chrome_Silver", "#E0E0E0", 255, ["CHROME"]),
+        },
+        parts=AttriDict(
+            bricks={"Brick 2 x 4": "3001", "Brick 1 x 1": "3005"},
+            plates={"Plate 2 x 2": "3022", "Brick 1 x 1": "3005a"},
+            minifig=AttriDict(hats={"Minifig Top Hat": "3878"}, heads={}),
+        ),
+    )
+    # The index of the catalog is found in the cache, as made by an earlier run.
+    fingerprint = library_fingerprint(memory_config.ldraw_library_path)
+    with (tmp_path / ("library-%s.pickle" % fingerprint)).open("wb") as f:
+        pickle.dump(build_index(catalog), f)
+
+    from ldraw.library import colours, parts
+    from ldraw.library.parts.minifig import hats
+
+    assert colours.Chrome_Silver.colour_attributes == ["CHROME"]
+    assert colours.ColoursByCode[4] is colours.Red
+    assert colours.ColoursByName["Chrome_Silver"] is colours.Chrome_Silver
+
+    assert parts.__all__ == ["bricks", "plates"]
+    assert parts.Brick2X4 == parts.bricks.Brick2X4 == "3001"
+    assert parts.Brick1X1 == "3005a"
+    assert not hasattr(parts, "MinifigTopHat")
+
+    assert hats.MinifigTopHat == "3878"
+    assert hats.__spec__.origin == "<memory>"
+    assert memory_library(memory_config).is_package("ldraw.library.parts.minifig")
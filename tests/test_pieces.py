@@ -3,8 +3,9 @@
 import pytest
 
 from ldraw.colour import Colour
-from ldraw.figure import Person
-from ldraw.geometry import Identity, Vector
+from ldraw.errors import FigureCountError, GroupCycleError
+from ldraw.figure import FigureTemplate, Person, Pose, place_figures
+from ldraw.geometry import Identity, Quaternion, Vector, YAxis
 from ldraw.pieces import Group, Piece
 
 White = Colour(15, "White", "#FFFFFF", 255, [])
@@ -80,3 +81,143 @@ def test_add_ls_item_nopart(figure, full_figure) -> None:
 def test_add_rs_item_nopart(figure, full_figure) -> None:
     assert full_figure.right_shoe(Black, 10) is None
     assert full_figure.right_shoe(Black, 10, Flipper) is not None
+
+
+def test_piece_accepts_quaternion() -> None:
+    quaternion = Quaternion.from_axis_angle(90, YAxis)
+    piece = Piece(White, Vector(0, 0, 0), quaternion, Brick1X1)
+    assert piece.matrix == quaternion.to_matrix()
+    group = Group(matrix=quaternion)
+    assert group.matrix == quaternion.to_matrix()
+
+
+def test_nested_groups() -> None:
+    outer = Group(Vector(100, 0, 0), Identity().rotate(90, YAxis))
+    inner = Group(Vector(0, -24, 0), group=outer)
+    piece = Piece(White, Vector(20, 0, 0), Identity(), Brick1X1, group=inner)
+    top = Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=outer)
+
+    assert inner in outer.groups
+    assert list(outer.all_pieces()) == [top, piece]
+    assert piece.world_position == outer.position + outer.matrix * Vector(20, -24, 0)
+    assert piece.world_matrix == outer.matrix
+
+    outer.position = Vector(0, 0, 0)
+    assert piece.world_position == outer.matrix * Vector(20, -24, 0)
+    inner.matrix = Identity().rotate(90, YAxis)
+    assert piece.world_matrix == outer.matrix * inner.matrix
+    piece.position = Vector(0, 0, 0)
+    assert piece.world_position == Vector(0, -24, 0)
+    assert repr(outer).splitlines() == [repr(top), repr(piece)]
+
+
+def test_world_transform_cached() -> None:
+    group = Group(Vector(10, 0, 0))
+    piece = Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=group)
+    assert piece.world_transform() is piece.world_transform()
+    cached = piece.world_transform()
+    group.position = Vector(20, 0, 0)
+    assert piece.world_transform() is not cached
+    assert piece.world_position == Vector(20, 0, 0)
+
+
+def test_move_group_between_parents() -> None:
+    first = Group(Vector(10, 0, 0))
+    second = Group(Vector(0, 10, 0))
+    child = Group(group=first)
+    piece = Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=child)
+    assert piece.world_position == Vector(10, 0, 0)
+    second.add_group(child)
+    assert child not in first.groups
+    assert piece.world_position == Vector(0, 10, 0)
+    second.remove_group(child)
+    assert piece.world_position == Vector(0, 0, 0)
+
+
+def test_group_cycle() -> None:
+    outer = Group()
+    inner = Group(group=outer)
+    with pytest.raises(GroupCycleError):
+        inner.add_group(outer)
+    with pytest.raises(GroupCycleError):
+        outer.add_group(outer)
+
+
+def test_identity_group_keeps_negative_zero() -> None:
+    group = Group()
+    piece = Piece(White, Vector(-0.0, 0, 0), Identity(), Brick1X1, group=group)
+    assert group.is_identity
+    assert repr(piece).startswith("1 15 -0.000000 ")
+    group.position = Vector(10, 0, 0)
+    assert not group.is_identity
+    assert piece.world_position == Vector(10, 0, 0)
+
+
+def test_figure_template_matches_person() -> None:
+    pose = Pose(head=20, left_arm=30, left_hand=10, right_arm=-45, left_leg=15)
+    colours = {
+        "head": Yellow,
+        "torso": White,
+        "hips": Black,
+        "left arm": White,
+        "left hand": Yellow,
+        "right arm": White,
+        "right hand": Yellow,
+        "left leg": Black,
+        "right leg": Black,
+    }
+    template = FigureTemplate(colours, pose=pose)
+    matrix = Identity().rotate(30, YAxis)
+    position = Vector(40, -24, 100)
+    placed = template.place(position, matrix)
+
+    person = Person(position, matrix)
+    expected = [
+        person.head(Yellow, 20),
+        person.torso(White),
+        person.hips(Black),
+        person.left_arm(White, 30),
+        person.left_hand(Yellow, 10),
+        person.right_arm(White, -45),
+        person.right_hand(Yellow, 0),
+        person.left_leg(Black, 15),
+        person.right_leg(Black, 0),
+    ]
+    assert [piece.part for piece in placed] == [piece.part for piece in expected]
+    for piece, other in zip(placed, expected, strict=True):
+        assert piece.colour is other.colour
+        assert abs(piece.position - other.position) < 1e-9
+        for row, other_row in zip(piece.matrix.rows, other.matrix.rows, strict=True):
+            assert row == pytest.approx(other_row)
+
+
+def test_place_figures() -> None:
+    group = Group()
+    soldiers = FigureTemplate({"head": Yellow, "torso": Black}, pose=Pose(head=10))
+    hatted = FigureTemplate(
+        {"head": Yellow, "hat": Black, "torso": White},
+        parts={"hat": HelmetClassic},
+    )
+    pieces = place_figures(
+        [soldiers, hatted, soldiers],
+        [Vector(0, 0, 0), Vector(40, 0, 0), Vector(80, 0, 0)],
+        [None, Quaternion.from_axis_angle(90, YAxis), Identity()],
+        group=group,
+    )
+    assert len(pieces) == 7
+    assert group.pieces == pieces
+    assert pieces[3].part == HelmetClassic.upper()
+    assert pieces[3].position == pieces[2].position
+    with pytest.raises(FigureCountError):
+        place_figures(soldiers, [Vector(0, 0, 0)], [None, None])
+
+
+def test_placed_figures_do_not_share_transforms() -> None:
+    soldiers = FigureTemplate({"head": Yellow, "torso": Black})
+    for orientation in (None, Identity().rotate(90, YAxis)):
+        first, second = (
+            soldiers.place(Vector(40 * i, 0, 0), orientation) for i in range(2)
+        )
+        first[0].matrix.rows[0][0] = 2.0
+        assert second[0].matrix.rows[0][0] != 2.0
+        assert soldiers.place(Vector(0, 0, 0), orientation)[0].matrix.rows[0][0] != 2.0
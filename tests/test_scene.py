@@ -0,0 +1,75 @@
+"""Tests for the columnar scene container."""
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.errors import ColourCodeError, ColumnLengthError
+from ldraw.geometry import Identity, Quaternion, Vector, YAxis
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+
+White = Colour(15, "White", "#FFFFFF", 255, [])
+Black = Colour(0, "Black", "#05131D", 255, [])
+Brick1X1 = "3005"
+Plate1X1 = "3024"
+
+
+@pytest.fixture
+def mosaic():
+    scene = PieceArray()
+    scene.bulk_append(
+        [(x * 20, 0, z * 20) for x in range(10) for z in range(10)],
+        [White if (x + z) % 2 else Black for x in range(10) for z in range(10)],
+        Brick1X1,
+    )
+    scene.append(White, Vector(0, -24, 0), Identity().rotate(90, YAxis), Plate1X1)
+    return scene
+
+
+def test_bulk_append(mosaic) -> None:
+    assert len(mosaic) == 101
+    assert mosaic.part_codes == [Brick1X1, Plate1X1]
+    assert len(mosaic.positions) == 3 * 101
+    assert mosaic.position(11) == Vector(20, 0, 20)
+    assert mosaic.matrix(0) == Identity()
+
+
+def test_round_trip_pieces() -> None:
+    group = Group(Vector(100, 0, 0), Quaternion.from_axis_angle(90, YAxis))
+    pieces = [
+        Piece(White, Vector(i * 20, 0, 0), Identity(), Brick1X1, group=group)
+        for i in range(5)
+    ]
+    scene = PieceArray.from_pieces(group)
+    assert [repr(piece) for piece in scene.to_pieces()] == [
+        repr(piece) for piece in pieces
+    ]
+    assert scene[0].colour is White
+    assert scene[-1].colour is scene[0].colour
+
+
+def test_slicing(mosaic) -> None:
+    sliced = mosaic[10:20]
+    assert len(sliced) == 10
+    assert sliced.position(0) == mosaic.position(10)
+    assert repr(mosaic[100]) == repr(mosaic[-1])
+    with pytest.raises(IndexError):
+        mosaic[101]
+
+
+def test_filter(mosaic) -> None:
+    assert len(mosaic.filter(part=Plate1X1)) == 1
+    assert len(mosaic.filter(part="missing")) == 0
+    white = mosaic.filter(colour=White)
+    assert len(white) == 51
+    assert all(piece.colour == White for piece in white)
+    assert len(mosaic.filter(part=Brick1X1, colour=15)) == 50
+
+
+def test_invalid_bulk_append(mosaic) -> None:
+    with pytest.raises(ColumnLengthError):
+        mosaic.bulk_append([(0, 0, 0), (20, 0, 0)], [White], Brick1X1)
+    assert len(mosaic) == 101
+    assert len(mosaic.positions) == 3 * 101
+    with pytest.raises(ColourCodeError):
+        mosaic.append(Colour(rgb="#FFFFFF"), (0, 0, 0), None, Brick1X1)
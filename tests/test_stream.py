@@ -0,0 +1,90 @@
+"""Tests for streaming model generation."""
+
+import gc
+import io
+
+from ldraw.colour import Colour
+from ldraw.figure import Person
+from ldraw.geometry import Identity, Vector, YAxis
+from ldraw.pieces import Group, Piece
+from ldraw.stream import ModelStream
+from ldraw.writer import MATRIX_CACHE_SIZE, NUMBER_CACHE_SIZE, write_ldr
+
+White = Colour(15, "White", "#FFFFFF", 255, [])
+Brick1X1 = "3005"
+
+
+def test_stream_matches_group() -> None:
+    out = io.StringIO()
+    with ModelStream(out) as stream:
+        row = stream.group(Vector(0, -24, 0), Identity().rotate(90, YAxis))
+        Person(Vector(0, 0, -10), group=row)
+        for i in range(3):
+            Piece(White, Vector(i * 20, 0, 0), Identity(), Brick1X1, group=row)
+        assert row.pieces == []
+
+    model = Group(Vector(0, -24, 0), Identity().rotate(90, YAxis))
+    Person(Vector(0, 0, -10), group=model)
+    for i in range(3):
+        Piece(White, Vector(i * 20, 0, 0), Identity(), Brick1X1, group=model)
+    expected = io.StringIO()
+    write_ldr(model, expected)
+    assert out.getvalue() == expected.getvalue()
+
+
+def test_moving_groups() -> None:
+    out = io.StringIO()
+    with ModelStream(out, precision=0) as stream:
+        floor = stream.group()
+        wall = stream.group(Vector(10, 0, 0), parent=floor)
+        for level in range(3):
+            floor.position = Vector(0, -24 * level, 0)
+            stream.add(Piece(White, Vector(0, 0, 0), Identity(), Brick1X1))
+            Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=wall)
+            stream.step()
+    lines = out.getvalue().splitlines()
+    assert lines[:3] == [
+        "1 15 0 0 0 1 0 0 0 1 0 0 0 1 3005.DAT",
+        "1 15 10 0 0 1 0 0 0 1 0 0 0 1 3005.DAT",
+        "0 STEP",
+    ]
+    assert lines[7] == "1 15 10 -48 0 1 0 0 0 1 0 0 0 1 3005.DAT"
+    assert stream.steps == 3
+    assert stream.lines_written == 9
+
+
+def test_plain_groups_are_written_when_added(tmp_path) -> None:
+    path = tmp_path / "model.ldr"
+    with ModelStream(path) as stream:
+        for i in range(100):
+            house = Group(Vector(i * 100, 0, 0))
+            Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=house)
+            stream.root.add_group(house)
+            stream.group(Vector(i * 100, 0, 0))
+        gc.collect()
+        assert len(stream.root.groups) == 0
+    lines = path.read_text().splitlines()
+    assert len(lines) == 100
+    assert lines[-1].startswith("1 15 9900.000000 0.000000 0.000000 ")
+
+
+def test_stream_caches_are_bounded() -> None:
+    out = io.StringIO()
+    count = 2 * MATRIX_CACHE_SIZE
+    with ModelStream(out) as stream:
+        for i in range(count):
+            # A different rotation and position for every piece.
+            matrix = Identity().rotate(i * 360.0 / count, YAxis)
+            stream.add(Piece(White, Vector(i * 0.5, 0, 0), matrix, Brick1X1))
+            assert len(stream._matrices) <= MATRIX_CACHE_SIZE  # noqa: SLF001
+            assert len(stream._numbers) <= NUMBER_CACHE_SIZE  # noqa: SLF001
+    lines = out.getvalue().splitlines()
+    assert len(lines) == count
+    assert lines[-1] == repr(
+        Piece(
+            White,
+            Vector((count - 1) * 0.5, 0, 0),
+            Identity().rotate((count - 1) * 360.0 / count, YAxis),
+            Brick1X1,
+        ),
+    )
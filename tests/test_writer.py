@@ -0,0 +1,130 @@
+"""Tests for the buffered LDraw writer."""
+
+import io
+
+import pytest
+
+from ldraw.colour import Colour
+from ldraw.figure import Person
+from ldraw.geometry import Identity, Vector, YAxis
+from ldraw.loader import load_mpd
+from ldraw.pieces import Group, Piece
+from ldraw.scene import PieceArray
+from ldraw.writer import LDRWriter, write_ldr, write_mpd
+
+White = Colour(15, "White", "#FFFFFF", 255, [])
+Yellow = Colour(14, "Yellow", "#F2CD37", 255, [])
+Brick1X1 = "3005"
+
+
+@pytest.fixture
+def model():
+    group = Group(Vector(0, -24, 0), Identity().rotate(90, YAxis))
+    Person(Vector(0, 0, -10), group=group)
+    for i in range(3):
+        Piece(White, Vector(i * 20, 0, 0), Identity(), Brick1X1, group=group)
+    return group
+
+
+def test_write_matches_repr(model, tmp_path) -> None:
+    path = tmp_path / "model.ldr"
+    count = write_ldr(model, path)
+    assert path.read_text() == repr(model) + "\n"
+    assert count == len(list(model.all_pieces()))
+
+
+def test_write_array_matches_pieces(model) -> None:
+    from_pieces = io.StringIO()
+    from_array = io.StringIO()
+    write_ldr(model, from_pieces)
+    write_ldr(PieceArray.from_pieces(model), from_array)
+    assert from_array.getvalue() == from_pieces.getvalue()
+
+
+def test_precision() -> None:
+    piece = Piece(White, Vector(1 / 3, 0, 0), Identity(), Brick1X1)
+    out = io.StringIO()
+    write_ldr([piece], out, precision=2)
+    assert out.getvalue() == (
+        "1 15 0.33 0.00 0.00 1.00 0.00 0.00 0.00 1.00 0.00 0.00 0.00 1.00 3005.DAT\n"
+    )
+
+
+def test_negative_zero_matches_repr() -> None:
+    pieces = [
+        Piece(White, Vector(0.0, -0.0, 0.0), Identity(), Brick1X1),
+        Piece(White, Vector(-0.0, 0.0, 0.0), Identity().rotate(180, YAxis), Brick1X1),
+        Piece(White, Vector(0.0, 0.0, 0.0), Identity().rotate(-180, YAxis), Brick1X1),
+    ]
+    out = io.StringIO()
+    write_ldr(pieces, out)
+    assert out.getvalue().splitlines() == [repr(piece) for piece in pieces]
+
+
+def test_meta_lines_and_submodel_references() -> None:
+    out = io.StringIO()
+    with LDRWriter(out, precision=0) as writer:
+        writer.write_line("0 STEP")
+        writer.write(Piece(White, Vector(0, 0, 0), Identity(), "wheel.ldr"))
+    assert out.getvalue() == "0 STEP\n1 15 0 0 0 1 0 0 0 1 0 0 0 1 WHEEL.LDR\n"
+
+
+def crowd(count):
+    model = Group()
+    for i in range(count):
+        person = Person(Vector(i * 40, 0, 0), Identity().rotate(90 * i, YAxis))
+        person.group = Group(person.position, person.matrix, group=model)
+        person.position, person.matrix = Vector(0, 0, 0), Identity()
+        person.head(Yellow)
+        person.torso(White)
+        person.hips(White)
+        person.left_leg(White)
+        person.right_leg(White)
+    Piece(White, Vector(0, 8, 0), Identity(), "3811", group=model)
+    return model
+
+
+def expand(models, name, group=None):
+    group = group if group is not None else Group()
+    for piece in models[name].pieces:
+        if piece.part in models:
+            expand(models, piece.part, Group(piece.position, piece.matrix, group))
+        else:
+            Piece(piece.colour, piece.position, piece.matrix, piece.part, group)
+    return group
+
+
+def lines_of(model):
+    out = io.StringIO()
+    write_ldr(model, out, precision=3)
+    return sorted(out.getvalue().replace("-0.000 ", "0.000 ").splitlines())
+
+
+def test_write_mpd_instances_repeated_groups() -> None:
+    model = crowd(6)
+    out = io.StringIO()
+    write_mpd(model, out, name="crowd.ldr")
+    lines = out.getvalue().splitlines()
+    assert lines.count("0 FILE crowd-1.ldr") == 1
+    assert "0 FILE crowd-2.ldr" not in lines
+    assert sum(line.endswith("crowd-1.ldr") for line in lines) == 7
+    assert len(lines) == 4 + 6 + 1 + 5
+
+    models = load_mpd(io.StringIO(out.getvalue()))
+    assert list(models) == ["CROWD.LDR", "CROWD-1.LDR"]
+    assert lines_of(expand(models, "CROWD.LDR")) == lines_of(model)
+
+
+def test_write_mpd_nested_instances() -> None:
+    model = Group()
+    for x in range(3):
+        street = Group(Vector(x * 1000, 0, 0), group=model)
+        for z in range(4):
+            house = Group(Vector(0, 0, z * 100), group=street)
+            Piece(White, Vector(0, 0, 0), Identity(), Brick1X1, group=house)
+            Piece(White, Vector(0, -24, 0), Identity(), Brick1X1, group=house)
+    out = io.StringIO()
+    write_mpd(model, out, precision=0)
+    models = load_mpd(io.StringIO(out.getvalue()))
+    assert [len(group.pieces) for group in models.values()] == [3, 4, 2]
+    assert models["MODEL-2.LDR"].pieces[0].part == Brick1X1